@@ -3,7 +3,7 @@ from __future__ import annotations  # noqa: N999
 import ctypes
 import logging
 import os
-from multiprocessing import Array, Manager, Queue, Value
+from multiprocessing import Array, Queue, Value
 from queue import Empty
 from time import time
 
@@ -12,11 +12,11 @@ from packaging.version import parse as parse_version
 
 import config
 from helperFunctions.process import (
-    ExceptionSafeProcess,
+    PersistentProcess,
+    TaskExceptionError,
     check_worker_exceptions,
     start_single_worker,
     stop_processes,
-    terminate_process_and_children,
 )
 from helperFunctions.tag import TagColor
 from plugins.base import BasePlugin
@@ -87,7 +87,6 @@ class AnalysisBasePlugin(BasePlugin):
         self.workers = []
         self.thread_count = 1 if no_multithread else self._get_thread_count()
         self.active = [Value('i', 0) for _ in range(self.thread_count)]
-        self.manager = Manager()
         self.analysis_stats = Array(ctypes.c_float, self.ANALYSIS_STATS_LIMIT)
         self.analysis_stats_count = Value('i', 0)
         self.analysis_stats_index = Value('i', 0)
@@ -120,7 +119,6 @@ class AnalysisBasePlugin(BasePlugin):
         self.in_queue.close()
         stop_processes(self.workers, timeout=10.0)  # give running analyses some time to finish
         self.out_queue.close()
-        self.manager.shutdown()
 
     def _check_plugin_attributes(self):
         for attribute in ['FILE', 'NAME', 'VERSION']:
@@ -156,7 +154,9 @@ class AnalysisBasePlugin(BasePlugin):
 
     def process_object(self, file_object):
         """
-        This function must be implemented by the plugin
+        This function must be implemented by the plugin.
+        The binary of `file_object` is only read from the disk if ``file_object.binary`` is accessed. Use
+        ``file_object.open_binary()`` to access the contents without reading the whole file into memory.
         """
         return file_object
 
@@ -196,35 +196,26 @@ class AnalysisBasePlugin(BasePlugin):
             result_update.update({'system_version': self.SYSTEM_VERSION})
         return result_update
 
-    def process_next_object(self, task, result):
+    def process_next_object(self, task: FileObject) -> FileObject:
         task.processed_analysis.update({self.NAME: {}})
-        finished_task = self.analyze_file(task)
-        result.append(finished_task)
+        return self.analyze_file(task)
 
-    @staticmethod
-    def timeout_happened(process):
-        return process.is_alive()
-
-    def worker_processing_with_timeout(self, worker_id, next_task: FileObject):
-        result = self.manager.list()
-        process = ExceptionSafeProcess(target=self.process_next_object, args=(next_task, result), reraise=False)
+    def worker_processing_with_timeout(self, worker_id, next_task: FileObject, analysis_process: PersistentProcess):
         start = time()
-        process.start()
-        process.join(timeout=self.TIMEOUT)
+        try:
+            result_fo = analysis_process.run_task(next_task, timeout=self.TIMEOUT)
+            logging.debug(f'Worker {worker_id}: Finished {self.NAME} analysis on {next_task.uid}')
+        except TimeoutError:
+            result_fo = self._handle_failed_analysis(next_task, worker_id, 'Timeout')
+        except ChildProcessError:
+            result_fo = self._handle_failed_analysis(next_task, worker_id, 'Crash')
+        except TaskExceptionError as error:
+            result_fo = self._handle_failed_analysis(next_task, worker_id, 'Exception', trace=error.trace)
         duration = time() - start
         if duration > 120:  # noqa: PLR2004
             logging.info(f'Analysis {self.NAME} on {next_task.uid} is slow: took {duration:.1f} seconds')
         self._update_duration_stats(duration)
 
-        if self.timeout_happened(process):
-            result_fo = self._handle_failed_analysis(next_task, process, worker_id, 'Timeout')
-        elif process.exception:
-            _, trace = process.exception
-            result_fo = self._handle_failed_analysis(next_task, process, worker_id, 'Exception', trace=trace)
-        else:
-            result_fo = result.pop()
-            logging.debug(f'Worker {worker_id}: Finished {self.NAME} analysis on {next_task.uid}')
-
         processed_analysis_entry = result_fo.processed_analysis.pop(self.NAME)
         result_fo.processed_analysis[self.NAME] = sanitize_processed_analysis(processed_analysis_entry)
         self.out_queue.put(result_fo)
@@ -239,10 +230,7 @@ class AnalysisBasePlugin(BasePlugin):
         if self.analysis_stats_count.value < self.ANALYSIS_STATS_LIMIT:
             self.analysis_stats_count.value += 1
 
-    def _handle_failed_analysis(  # noqa: PLR0913
-        self, fw_object, process, worker_id, cause: str, trace: str | None = None
-    ):
-        terminate_process_and_children(process)
+    def _handle_failed_analysis(self, fw_object, worker_id, cause: str, trace: str | None = None):
         fw_object.analysis_exception = (self.NAME, f'{cause} occurred during analysis')
         message = f'Worker {worker_id}: {cause} during analysis {self.NAME} on {fw_object.uid}'
         if trace:
@@ -253,6 +241,8 @@ class AnalysisBasePlugin(BasePlugin):
 
     def worker(self, worker_id):
         logging.debug(f'started {self.NAME} worker {worker_id} (pid={os.getpid()})')
+        # the analysis runs in a separate process (so that it can be killed on timeout) which is reused for all tasks
+        analysis_process = PersistentProcess(self.process_next_object, name=f'{self.NAME} analysis {worker_id}')
         while self.stop_condition.value == 0:
             try:
                 next_task = self.in_queue.get(timeout=float(config.backend.block_delay))
@@ -262,8 +252,9 @@ class AnalysisBasePlugin(BasePlugin):
             else:
                 self.active[worker_id].value = 1
                 next_task.processed_analysis.update({self.NAME: {}})
-                self.worker_processing_with_timeout(worker_id, next_task)
+                self.worker_processing_with_timeout(worker_id, next_task, analysis_process)
 
+        analysis_process.stop()
         logging.debug(f'worker {worker_id} stopped')
 
     def check_exceptions(self):
@@ -3,8 +3,10 @@ from __future__ import annotations  # noqa: N999
 import logging
 import re
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
+import yara
 import yaml
 from yaml.parser import ParserError
 
@@ -37,28 +39,38 @@ class YaraBasePlugin(AnalysisBasePlugin):
         super().__init__(view_updater=view_updater)
 
     def get_yara_system_version(self):
-        with subprocess.Popen(['yara', '--version'], stdout=subprocess.PIPE) as process:
-            yara_version = process.stdout.readline().decode().strip()
+        if _load_rules(self.signature_path) is not None:
+            # the version of the YARA engine (not of yara-python) -> same as the output of "yara --version"
+            yara_version = yara.YARA_VERSION
+        else:
+            with subprocess.Popen(['yara', '--version'], stdout=subprocess.PIPE) as process:
+                yara_version = process.stdout.readline().decode().strip()
 
         access_time = int(Path(self.signature_path).stat().st_mtime)
         return f'{yara_version}-{access_time}'
 
     def process_object(self, file_object):
         if self.signature_path is not None:
-            compiled_flag = '-C' if Path(self.signature_path).read_bytes().startswith(b'YARA') else ''
-            command = f'yara {compiled_flag} --print-meta --print-strings {self.signature_path} {file_object.file_path}'
-            with subprocess.Popen(command, shell=True, stdout=subprocess.PIPE) as process:
-                output = process.stdout.read().decode()
+            rules = _load_rules(self.signature_path)
             try:
-                result = self._parse_yara_output(output)
+                if rules is not None:
+                    result = _convert_matches(rules.match(file_object.file_path))
+                else:
+                    result = self._parse_yara_output(self._run_yara_cli(file_object.file_path))
                 file_object.processed_analysis[self.NAME] = result
                 file_object.processed_analysis[self.NAME]['summary'] = list(result.keys())
-            except (ValueError, TypeError):
+            except (ValueError, TypeError, yara.Error):
                 file_object.processed_analysis[self.NAME] = {'failed': 'Processing corrupted. Likely bad call to yara.'}
         else:
             file_object.processed_analysis[self.NAME] = {'failed': 'Signature path not set'}
         return file_object
 
+    def _run_yara_cli(self, file_path: str) -> str:
+        compiled_flag = '-C' if Path(self.signature_path).read_bytes().startswith(b'YARA') else ''
+        command = f'yara {compiled_flag} --print-meta --print-strings {self.signature_path} {file_path}'
+        with subprocess.Popen(command, shell=True, stdout=subprocess.PIPE) as process:
+            return process.stdout.read().decode()
+
     @staticmethod
     def _get_signature_file_name(plugin_path):
         return plugin_path.split('/')[-3] + '.yc'
@@ -81,6 +93,57 @@ class YaraBasePlugin(AnalysisBasePlugin):
         return resulting_matches
 
 
+@lru_cache(maxsize=None)
+def _load_rules(signature_path: str) -> yara.Rules | None:
+    """
+    Load the (compiled) YARA rules from `signature_path` once per process. Returns ``None`` if the rules cannot be
+    loaded with yara-python (e.g. because they use a module like "magic" that yara-python was built without). In this
+    case, the yara command line tool is used instead.
+    """
+    try:
+        if Path(signature_path).read_bytes().startswith(b'YARA'):
+            return yara.load(signature_path)
+        return yara.compile(filepath=signature_path)
+    except yara.Error as error:
+        logging.warning(f'Could not load YARA rules {signature_path} with yara-python (using CLI instead): {error}')
+        return None
+
+
+def _convert_matches(matches: list[yara.Match]) -> dict[str, dict]:
+    """
+    Convert the matches of yara-python to the same format that is generated from the output of the yara CLI. The only
+    difference are matches of hex strings: The CLI shows them as hex bytes ("AA BB ..."), but yara-python does not
+    expose the string type, so they are escaped like text strings.
+    """
+    return {
+        match.rule: {
+            'rule': match.rule,
+            'matches': True,
+            'strings': [
+                (instance.offset, string_match.identifier, _escape_matched_data(instance.matched_data))
+                for string_match in match.strings  # type: yara.StringMatch
+                for instance in string_match.instances  # type: yara.StringMatchInstance
+            ],
+            'meta': dict(match.meta),
+        }
+        for match in matches
+    }
+
+
+def _escape_matched_data(data: bytes) -> str:
+    # same as the yara CLI: quotes and backslashes are escaped with a backslash, other printable characters are kept
+    # and everything else is hex escaped
+    return ''.join(_escape_byte(byte) for byte in data)
+
+
+def _escape_byte(byte: int) -> str:
+    if chr(byte) in '"\'\\':
+        return f'\\{chr(byte)}'
+    if 32 <= byte <= 126:  # noqa: PLR2004
+        return chr(byte)
+    return f'\\x{byte:02X}'
+
+
 def _split_output_in_rules_and_matches(output):
     split_regex = re.compile(r'\n*.*\[.*\]\s/.+\n*')
     match_blocks = split_regex.split(output)
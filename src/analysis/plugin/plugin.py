@@ -112,7 +112,9 @@ class AnalysisPluginV0(metaclass=abc.ABCMeta):
         """Analyze a file.
         May return None if nothing was found.
 
-        :param file_handle: :py:class:`io.FileIO` instance of the file to be analyzed
+        :param file_handle: :py:class:`io.FileIO` instance of the file to be analyzed.
+            To access the contents without reading the whole file into memory, use
+            :py:func:`helperFunctions.fileSystem.map_file`.
         :param virtual_file_path: The virtual file paths, see :py:class:`~objects.file.FileObject`
         :param analyses: A dictionary of dependent analysis
 
@@ -85,6 +85,8 @@ class Common(BaseModel):
 
     temp_dir_path: str = '/tmp'
     docker_mount_base_dir: str
+    docker_container_pool_size: int = 1
+    docker_container_pool_max_tasks: int = 100
 
 
 class Frontend(Common):
@@ -134,6 +136,11 @@ class Backend(Common):
 
     scheduling_worker_count: int = 4
     collector_worker_count: int = 2
+    collector_batch_size: int = 100
+    collector_max_delay: float = 1.0
+    binary_search_processes: int = 4
+    tar_repack_cache_size: int = 1024
+    ssdeep_comparison_processes: int = 4
 
     unpacking: Backend.Unpacking
 
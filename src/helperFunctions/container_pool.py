@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import logging
+import os
+import shlex
+import shutil
+import socket
+from contextlib import suppress
+from multiprocessing import util
+from pathlib import Path
+from tempfile import mkdtemp
+from threading import BoundedSemaphore, Lock
+from time import sleep, time
+from typing import TYPE_CHECKING
+
+import docker
+import psutil
+from docker.errors import DockerException
+from docker.types import Mount
+from requests.exceptions import ReadTimeout
+
+import config
+from helperFunctions.fileSystem import get_src_dir
+
+if TYPE_CHECKING:
+    from docker.models.containers import Container
+
+POOL_LABEL = 'fact.container_pool'
+OWNER_LABEL = 'fact.container_pool.owner'
+INSTANCE_LABEL = 'fact.container_pool.instance'
+WORK_DIR_LABEL = 'fact.container_pool.work_dir'
+BOOT_ID_FILE = Path('/proc/sys/kernel/random/boot_id')
+# keeps the container running without doing anything (the tasks are executed with `docker exec`)
+IDLE_ENTRYPOINT = ['sh', '-c', 'while true; do sleep 3600; done']
+# mount target of the directory in the private work dir of a container that contains the output of the tasks
+OUTPUT_DIR = '/fact_container_pool'
+# values of the `User` of an image that mean that the container runs as root
+ROOT_USERS = {'', 'root', '0', 'root:root', '0:0'}
+POLL_INTERVAL = 0.05
+# arguments of `run_docker_container` that are supported for tasks in pooled containers
+POOLED_RUN_ARGUMENTS = {'command', 'mounts', 'environment', 'mem_limit', 'memswap_limit'}
+
+_POOLS: dict[tuple, ContainerPool | None] = {}
+_POOLS_LOCK = Lock()
+
+
+class ContainerStartError(DockerException):
+    """A container of a pool could not be started (e.g. because the image does not contain ``sh``)."""
+
+
+class PooledContainer:
+    def __init__(self, container: Container, work_dir: Path):
+        self.container = container
+        self.work_dir = work_dir
+        self.task_count = 0
+
+
+class ContainerPool:
+    """
+    A pool of long-lived containers of a docker image. Instead of starting a new container for each task, a container
+    is started once (with an idle entrypoint) and the tasks are executed in it with ``docker exec``. Each container
+    only runs one task at a time.
+
+    Each container has a private work dir in the mount base dir. Nothing else of the host is mounted. The mount targets
+    of the tasks (see :py:func:`get_mount_spec`) are fixed for a pool: They are mounted from the work dir when the
+    container is started. Before each task, the sources of its mounts are copied into the work dir. Afterwards, the
+    content of writable directory mounts is copied back to their sources (files are only used as input) and the work
+    dir is cleared. The output of the task is redirected to files in the work dir.
+
+    A container is replaced if it is not running anymore (e.g. after a crash), if a task timed out or failed with a
+    docker error and after ``docker-container-pool-max-tasks`` tasks.
+
+    :param image: The name of the docker image.
+    :param mount_spec: The mount targets of the tasks (see :py:func:`get_mount_spec`).
+    :param size: The maximum number of containers in the pool.
+    :param container_kwargs: Additional arguments for ``docker.containers.run`` (e.g. the memory limit).
+    """
+
+    def __init__(self, image: str, mount_spec: tuple[tuple[str, bool, bool], ...], size: int, **container_kwargs):
+        self.image = image
+        self.mount_spec = mount_spec
+        self.container_kwargs = container_kwargs
+        self._client = docker.from_env()
+        self._idle_containers: list[PooledContainer] = []
+        self._semaphore = BoundedSemaphore(size)
+        self._lock = Lock()
+        self._closed = False
+        image_config = self._client.images.get(image).attrs['Config']
+        self._entrypoint = image_config.get('Entrypoint') or []
+        self._default_command = image_config.get('Cmd') or []
+
+    def run(  # noqa: PLR0913
+        self,
+        command: str | list[str] | None = None,
+        mounts: list[Mount] | None = None,
+        environment: dict | list | None = None,
+        timeout: int = 300,
+        combine_stderr_stdout: bool = False,
+    ) -> tuple[int, str, str | None]:
+        """
+        Run a task in one of the containers of the pool.
+
+        :param command: The command (like the ``command`` of the container: it is passed to the entrypoint).
+        :param mounts: The bind mounts of the task (they must match the mount spec of the pool).
+        :param environment: Environment variables of the task.
+        :param timeout: Timeout after which the task is canceled (and the container is replaced).
+        :param combine_stderr_stdout: Whether to combine stderr and stdout or not.
+        :return: A tuple with the exit code, stdout and stderr (``None`` if it is combined with stdout).
+
+        :raises requests.exceptions.ReadTimeout: If the timeout was reached
+        :raises docker.errors.APIError: If the communication with docker fails
+        :raises ContainerStartError: If no container could be started
+        """
+        mounts = mounts or []
+        if get_mount_spec(mounts) != self.mount_spec:
+            raise ValueError(f'Mounts {mounts} do not match the mounts of the container pool of {self.image}')
+        with self._semaphore:
+            pooled_container = self._get_container()
+            try:
+                result = self._run_in_container(
+                    pooled_container, command, mounts, environment, timeout, combine_stderr_stdout
+                )
+            except BaseException:
+                self._remove_container(pooled_container)
+                raise
+            self._release_container(pooled_container)
+            return result
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True  # containers that are currently in use are removed when they are released
+            for pooled_container in self._idle_containers:
+                self._remove_container(pooled_container)
+            self._idle_containers = []
+
+    def _get_container(self) -> PooledContainer:
+        with self._lock:
+            while self._idle_containers:
+                pooled_container = self._idle_containers.pop()
+                with suppress(DockerException):
+                    pooled_container.container.reload()
+                    if pooled_container.container.status == 'running':
+                        return pooled_container
+                logging.warning(f'Pooled container of {self.image} is not running anymore -> replacing it')
+                self._remove_container(pooled_container)
+        return self._start_container()
+
+    def _release_container(self, pooled_container: PooledContainer):
+        with self._lock:
+            pooled_container.task_count += 1
+            if self._closed or pooled_container.task_count >= config.common.docker_container_pool_max_tasks:
+                self._remove_container(pooled_container)
+            else:
+                self._idle_containers.append(pooled_container)
+
+    def _start_container(self) -> PooledContainer:
+        work_dir = Path(mkdtemp(prefix='container_pool_', dir=config.common.docker_mount_base_dir))
+        (work_dir / 'output').mkdir()
+        mounts = [Mount(OUTPUT_DIR, str(work_dir / 'output'), type='bind')]
+        for index, (target, is_dir, read_only) in enumerate(self.mount_spec):
+            source = _get_mount_path(work_dir, index)
+            if is_dir:
+                source.mkdir()
+            else:
+                source.touch()
+            mounts.append(Mount(target, str(source), type='bind', read_only=read_only))
+        labels = {
+            POOL_LABEL: self.image,
+            OWNER_LABEL: str(os.getpid()),
+            INSTANCE_LABEL: _get_instance_id(),
+            WORK_DIR_LABEL: str(work_dir),
+        }
+        container = None
+        try:
+            container = self._client.containers.create(
+                self.image, entrypoint=IDLE_ENTRYPOINT, mounts=mounts, labels=labels, **self.container_kwargs
+            )
+            container.start()
+        except DockerException as error:
+            self._remove_failed_container(container, work_dir)
+            raise ContainerStartError(f'Could not start pooled container of {self.image}: {error}') from error
+        except BaseException:
+            self._remove_failed_container(container, work_dir)
+            raise
+        return PooledContainer(container, work_dir)
+
+    @staticmethod
+    def _remove_failed_container(container: Container | None, work_dir: Path):
+        if container is not None:
+            with suppress(DockerException):
+                container.remove(force=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _remove_container(self, pooled_container: PooledContainer):
+        with suppress(DockerException):
+            # a canceled task may have left files that belong to root in the work dir
+            self._reset_ownership(pooled_container)
+        with suppress(DockerException):
+            pooled_container.container.remove(force=True)
+        shutil.rmtree(pooled_container.work_dir, ignore_errors=True)
+
+    def _run_in_container(  # noqa: PLR0913
+        self,
+        pooled_container: PooledContainer,
+        command: str | list[str] | None,
+        mounts: list[Mount],
+        environment: dict | list | None,
+        timeout: int,
+        combine_stderr_stdout: bool,
+    ) -> tuple[int, str, str | None]:
+        if command is None:
+            command = self._default_command
+        elif isinstance(command, str):
+            command = shlex.split(command)
+        work_dir = pooled_container.work_dir
+        for index, mount in enumerate(mounts):
+            _copy(Path(mount['Source']), _get_mount_path(work_dir, index))
+        script = _get_task_script([*self._entrypoint, *command], combine_stderr_stdout)
+        exec_id = self._client.api.exec_create(
+            pooled_container.container.id, ['sh', '-c', script], environment=environment
+        )['Id']
+        self._client.api.exec_start(exec_id, detach=True)
+        exit_code = self._wait_for_exec(exec_id, timeout)
+        self._reset_ownership(pooled_container)
+        stdout = _read_output(work_dir / 'output' / 'stdout')
+        stderr = _read_output(work_dir / 'output' / 'stderr') if not combine_stderr_stdout else None
+        for index, (mount, (_, is_dir, read_only)) in enumerate(zip(mounts, self.mount_spec)):
+            if is_dir and not read_only:
+                _copy(_get_mount_path(work_dir, index), Path(mount['Source']))
+        self._clear_work_dir(work_dir)
+        return exit_code, stdout, stderr
+
+    def _wait_for_exec(self, exec_id: str, timeout: int) -> int:
+        deadline = time() + timeout
+        while (state := self._client.api.exec_inspect(exec_id))['Running']:
+            if time() > deadline:
+                raise ReadTimeout(f'Task in pooled container of {self.image} did not finish within {timeout} seconds')
+            sleep(POLL_INTERVAL)
+        return state['ExitCode']
+
+    def _reset_ownership(self, pooled_container: PooledContainer):
+        # the files that the task created in the work dir belong to root (in the container) -> give them back
+        writable_dirs = [target for target, is_dir, read_only in self.mount_spec if is_dir and not read_only]
+        pooled_container.container.exec_run(
+            ['chown', '-R', f'{os.getuid()}:{os.getgid()}', OUTPUT_DIR, *writable_dirs], user='root'
+        )
+
+    def _clear_work_dir(self, work_dir: Path):
+        _clear_directory(work_dir / 'output')
+        for index, (_, is_dir, _) in enumerate(self.mount_spec):
+            path = _get_mount_path(work_dir, index)
+            if is_dir:
+                _clear_directory(path)
+            else:
+                path.write_bytes(b'')  # the mounted file must not be replaced (the mount would still show the old one)
+
+
+def get_container_pool(image: str, mounts: list[Mount], **container_kwargs) -> ContainerPool | None:
+    """
+    Get the container pool for `image`, the mount targets of `mounts` and `container_kwargs` of this process. The pool
+    is created on first use. Pooled containers of processes that do not exist anymore are removed when a new pool is
+    created.
+
+    :return: The container pool or ``None`` if the image does not support pooling (because it does not run as root,
+        which is needed to make the output of the tasks accessible).
+    """
+    mount_spec = get_mount_spec(mounts)
+    key = _get_pool_key(image, mount_spec, container_kwargs)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            if not _POOLS:
+                # the pools of a process are shut down when it exits (this also works for `multiprocessing` children)
+                util.Finalize(None, shutdown_container_pools, exitpriority=0)
+            _remove_orphaned_containers()
+            if _runs_as_root(image):
+                size = config.common.docker_container_pool_size
+                _POOLS[key] = ContainerPool(image, mount_spec, size, **container_kwargs)
+            else:
+                logging.debug(f'Image {image} does not run as root -> not using pooled containers')
+                _POOLS[key] = None
+        return _POOLS[key]
+
+
+def disable_container_pool(image: str, mounts: list[Mount], **container_kwargs):
+    """
+    Shut down the container pool for `image`, the mount targets of `mounts` and `container_kwargs` of this process and
+    do not use pooled containers for them anymore (e.g. because the containers cannot be started).
+    """
+    key = _get_pool_key(image, get_mount_spec(mounts), container_kwargs)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is not None:
+            pool.shutdown()
+        _POOLS[key] = None
+
+
+def shutdown_container_pools():
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            if pool is not None:
+                pool.shutdown()
+        _POOLS.clear()
+
+
+def can_be_pooled(run_kwargs: dict) -> bool:
+    """
+    Check if a task with the arguments `run_kwargs` (see :py:func:`helperFunctions.docker.run_docker_container`) can
+    be run in a pooled container: Pooling must be enabled, only the arguments in :py:data:`POOLED_RUN_ARGUMENTS` are
+    supported and all mounts must be bind mounts with an existing source.
+    """
+    if config.common.docker_container_pool_size <= 0 or not set(run_kwargs).issubset(POOLED_RUN_ARGUMENTS):
+        return False
+    return all(mount['Type'] == 'bind' and Path(mount['Source']).exists() for mount in run_kwargs.get('mounts') or [])
+
+
+def get_mount_spec(mounts: list[Mount]) -> tuple[tuple[str, bool, bool], ...]:
+    """
+    Get the mount targets of `mounts` as tuples of the target, whether the source is a directory and whether the
+    mount is read-only.
+    """
+    return tuple((mount['Target'], Path(mount['Source']).is_dir(), bool(mount['ReadOnly'])) for mount in mounts)
+
+
+def _get_pool_key(image: str, mount_spec: tuple[tuple[str, bool, bool], ...], container_kwargs: dict) -> tuple:
+    return image, mount_spec, tuple(sorted(container_kwargs.items()))
+
+
+def _get_instance_id() -> str:
+    # identifies this FACT instance: other instances may use the same docker daemon (e.g. on another host or in
+    # another container with its own PID namespace), so the owner PID alone is not enough to find orphaned containers
+    boot_id = ''
+    with suppress(OSError):
+        boot_id = BOOT_ID_FILE.read_text().strip()
+    return f'{socket.gethostname()}:{boot_id}:{get_src_dir()}'
+
+
+def _runs_as_root(image: str) -> bool:
+    return (docker.from_env().images.get(image).attrs['Config'].get('User') or '') in ROOT_USERS
+
+
+def _get_mount_path(work_dir: Path, index: int) -> Path:
+    return work_dir / f'mount_{index}'
+
+
+def _get_task_script(args: list[str], combine_stderr_stdout: bool) -> str:
+    redirect_stderr = '2>&1' if combine_stderr_stdout else f'2> {OUTPUT_DIR}/stderr'
+    return f'exec {shlex.join(args)} > {OUTPUT_DIR}/stdout {redirect_stderr}'
+
+
+def _copy(source: Path, target: Path):
+    if source.is_dir():
+        shutil.copytree(source, target, symlinks=True, dirs_exist_ok=True)
+    else:
+        # the target is written in place (a mounted file must not be replaced)
+        shutil.copyfile(source, target)
+
+
+def _clear_directory(path: Path):
+    for child in path.iterdir():
+        if child.is_dir() and not child.is_symlink():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+
+
+def _read_output(output_file: Path) -> str:
+    return output_file.read_bytes().decode(errors='replace') if output_file.is_file() else ''
+
+
+def _remove_orphaned_containers():
+    # containers of processes that were killed (e.g. after an analysis timeout) are not removed on exit
+    instance_id = _get_instance_id()
+    with suppress(DockerException):
+        for container in docker.from_env().containers.list(
+            all=True, filters={'label': f'{INSTANCE_LABEL}={instance_id}'}
+        ):
+            if container.labels.get(INSTANCE_LABEL) != instance_id:
+                continue  # the owner PID is only meaningful for containers of this instance
+            owner = int(container.labels.get(OWNER_LABEL, 0))
+            if owner != os.getpid() and not psutil.pid_exists(owner):
+                logging.debug(f'Removing orphaned pooled container {container.short_id}')
+                with suppress(DockerException):
+                    container.remove(force=True)
+                if WORK_DIR_LABEL in container.labels:
+                    shutil.rmtree(container.labels[WORK_DIR_LABEL], ignore_errors=True)
+
+
+def _reset_pools_after_fork():
+    # the containers belong to the parent process -> the child process must create its own pools
+    global _POOLS_LOCK  # noqa: PLW0603
+    _POOLS_LOCK = Lock()
+    _POOLS.clear()
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import logging
 from contextlib import suppress
 from subprocess import CompletedProcess
@@ -6,9 +8,21 @@ import docker
 from docker.errors import APIError, DockerException, ImageNotFound
 from requests.exceptions import ReadTimeout, RequestException
 
+from helperFunctions.container_pool import (
+    ContainerStartError,
+    can_be_pooled,
+    disable_container_pool,
+    get_container_pool,
+)
+
 
 def run_docker_container(
-    image: str, logging_label: str = 'Docker', timeout: int = 300, combine_stderr_stdout: bool = False, **kwargs
+    image: str,
+    logging_label: str = 'Docker',
+    timeout: int = 300,
+    combine_stderr_stdout: bool = False,
+    pooled: bool = False,
+    **kwargs,
 ) -> CompletedProcess:
     """
     This is a convenience function that runs a docker container and returns a
@@ -19,6 +33,11 @@ def run_docker_container(
     :param logging_label: Label used for logging
     :param timeout: Timeout after which the execution is canceled
     :param combine_stderr_stdout: Whether to combine stderr and stdout or not
+    :param pooled: Run the command in a long-lived container of a
+        :py:class:`~helperFunctions.container_pool.ContainerPool` instead of
+        starting a new container (only if the arguments and the image allow it,
+        see :py:func:`~helperFunctions.container_pool.can_be_pooled` and
+        :py:func:`~helperFunctions.container_pool.get_container_pool`)
 
     :return: A subprocess.CompletedProcess instance for the command ran in the
         container.
@@ -30,6 +49,11 @@ def run_docker_container(
     # TODO verify that bind mounts in kwargs["mounts"] only contain files in docker-mount-base-dir
     # If they don't just copy them to docker-mount-base-dir and change the mounts
 
+    if pooled and can_be_pooled(kwargs):
+        result = _run_in_pooled_container(image, logging_label, timeout, combine_stderr_stdout, **kwargs)
+        if result is not None:
+            return result
+
     client = docker.client.from_env()
     kwargs.setdefault('detach', True)
 
@@ -62,13 +86,48 @@ def run_docker_container(
             container.stop()
             container.remove()
 
+    return CompletedProcess(args=_get_args(kwargs.get('command')), returncode=exit_code, stdout=stdout, stderr=stderr)
+
+
+def _run_in_pooled_container(
+    image: str, logging_label: str, timeout: int, combine_stderr_stdout: bool, **kwargs
+) -> CompletedProcess | None:
+    # returns None if the image does not support pooling
+    mounts = kwargs.get('mounts') or []
+    pool_kwargs = {'mem_limit': kwargs.get('mem_limit'), 'memswap_limit': kwargs.get('memswap_limit')}
+    try:
+        pool = get_container_pool(image, mounts, **pool_kwargs)
+        if pool is None:
+            return None
+        exit_code, stdout, stderr = pool.run(
+            command=kwargs.get('command'),
+            mounts=mounts,
+            environment=kwargs.get('environment'),
+            timeout=timeout,
+            combine_stderr_stdout=combine_stderr_stdout,
+        )
+    except ContainerStartError as error:
+        logging.warning(f'[{logging_label}]: {error} -> not using pooled containers')
+        disable_container_pool(image, mounts, **pool_kwargs)
+        return None
+    except (ImageNotFound, APIError):
+        logging.warning(f'[{logging_label}]: encountered docker error while processing')
+        raise
+    except ReadTimeout:
+        logging.warning(f'[{logging_label}]: timeout while processing')
+        raise
+    except RequestException:
+        logging.warning(f'[{logging_label}]: connection error while processing')
+        raise
+    return CompletedProcess(args=_get_args(kwargs.get('command')), returncode=exit_code, stdout=stdout, stderr=stderr)
+
+
+def _get_args(command: str | list[str] | None) -> str | list[str]:
     # We do not know the docker entrypoint so we just insert a generic "entrypoint"
-    command = kwargs.get('command', None)
     if isinstance(command, str):
         args = 'entrypoint' + command
     elif isinstance(command, list):
         args = ['entrypoint', *command]
     else:
         args = ['entrypoint']
-
-    return CompletedProcess(args=args, returncode=exit_code, stdout=stdout, stderr=stderr)
+    return args
@@ -1,6 +1,14 @@
-import logging  # noqa: N999
-from contextlib import suppress
+from __future__ import annotations  # noqa: N999
+
+import logging
+import mmap
+import os
+from contextlib import contextmanager, suppress
 from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
 
 def get_src_dir() -> str:
@@ -59,3 +67,22 @@ def get_config_dir():
     Returns the absolute path of the config directory
     """
     return f'{get_src_dir()}/config'
+
+
+@contextmanager
+def map_file(file: str | Path | IO) -> Iterator[mmap.mmap | bytes]:
+    """
+    Memory-map a file read-only. In contrast to reading the file, the contents are not copied into the memory of the
+    process: pages are loaded on demand and are shared between all processes that map the same file.
+
+    :param file: The path of the file or an open file handle.
+    :return: A read-only ``mmap`` of the file (or ``b''`` for empty files which can't be mapped).
+    """
+    if isinstance(file, (str, Path)):
+        with Path(file).open('rb') as file_handle, map_file(file_handle) as mapped_file:
+            yield mapped_file
+    elif os.fstat(file.fileno()).st_size == 0:
+        yield b''
+    else:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            yield mapped_file
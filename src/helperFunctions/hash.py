@@ -13,6 +13,8 @@ import tlsh
 from helperFunctions.data_conversion import make_bytes
 
 if TYPE_CHECKING:
+    from mmap import mmap
+
     from objects.file import FileObject
 
 ELF_MIME_TYPES = [
@@ -21,6 +23,7 @@ ELF_MIME_TYPES = [
     'application/x-pie-executable',
     'application/x-sharedlib',
 ]
+HASH_CHUNK_SIZE = 1024 * 1024
 
 
 def get_hash(hash_function, binary):
@@ -57,6 +60,37 @@ def get_tlsh(code):
     return tlsh_hash if tlsh_hash != 'TNULL' else ''
 
 
+def get_hashes(binary: bytes | mmap, hash_functions: list[str], chunk_size: int = HASH_CHUNK_SIZE) -> dict[str, str]:
+    """
+    Compute several hashes of `binary` in a single pass: All hash functions (see hashlib), ssdeep and TLSH are fed
+    with the same chunks of `chunk_size` bytes. If `binary` is a memory-mapped file, at most one chunk is copied into
+    memory at any time.
+
+    :param binary: The data to hash (e.g. from :py:func:`objects.file.FileObject.open_binary`).
+    :param hash_functions: The names of the hashlib hash functions to use.
+    :param chunk_size: The number of bytes that are hashed at once.
+    :return: A dict with the hashes as hex strings. TLSH is only included if the data is suitable (e.g. long enough).
+    """
+    hashes = {name: new(name) for name in hash_functions}
+    ssdeep_hash = ssdeep.Hash()
+    tlsh_hash = tlsh.Tlsh()
+    for offset in range(0, len(binary), chunk_size):
+        chunk = binary[offset : offset + chunk_size]
+        for hash_ in hashes.values():
+            hash_.update(chunk)
+        ssdeep_hash.update(chunk)
+        tlsh_hash.update(chunk)
+
+    result = {name: hash_.hexdigest() for name, hash_ in hashes.items()}
+    result['ssdeep'] = ssdeep_hash.digest()
+    with contextlib.suppress(ValueError):  # raised if the data is not suitable for TLSH
+        tlsh_hash.final()
+        tlsh_digest = tlsh_hash.hexdigest()
+        if tlsh_digest and tlsh_digest != 'TNULL':
+            result['tlsh'] = tlsh_digest
+    return result
+
+
 def get_tlsh_comparison(first, second):
     return tlsh.diff(first, second)
 
@@ -6,7 +6,7 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from multiprocessing import Pipe, Process
-from signal import SIGTERM
+from signal import SIG_DFL, SIGTERM, signal
 from threading import Thread
 
 import psutil
@@ -17,6 +17,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from multiprocessing.connection import Connection
 
 
 def complete_shutdown(message: str | None = None) -> None:
@@ -105,6 +106,132 @@ class ExceptionSafeProcess(Process):
         return self._exception
 
 
+class TaskExceptionError(Exception):
+    """
+    Raised by :py:func:`PersistentProcess.run_task` if the task raised an exception in the child process.
+
+    :param trace: The formatted stack trace of the exception in the child process.
+    """
+
+    def __init__(self, trace: str):
+        super().__init__(trace)
+        self.trace = trace
+
+
+class PersistentProcess:
+    """
+    Runs tasks in a long-lived child process. In contrast to starting a new process for each task, the process is
+    reused for many tasks and only restarted if a task exceeds its timeout (in which case the process is killed) or
+    if the process crashes. The process is started lazily with the first task.
+
+    The object itself must only be used by the process that created it.
+
+    :param function: The function that is called in the child process for each task.
+    :param name: The name of the child process.
+    """
+
+    def __init__(self, function: Callable, name: str | None = None):
+        self._function = function
+        self._name = name
+        self._process: Process | None = None
+        self._connection: Connection | None = None
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process is not None else None
+
+    def run_task(self, *args, timeout: float):
+        """
+        Call the function with `args` in the child process and return the result.
+
+        :param args: The arguments of the function. They must be picklable.
+        :param timeout: Timeout in seconds after which the child process is killed.
+        :return: The return value of the function.
+        :raises TimeoutError: If the task did not finish before the timeout.
+        :raises ChildProcessError: If the child process crashed during the task.
+        :raises TaskExceptionError: If an exception occurred in the function.
+        """
+        if self._process is None or not self._process.is_alive():
+            self._start()
+        try:
+            self._connection.send(args)
+            if not self._connection.poll(timeout):
+                raise TimeoutError(timeout)
+            success, result = self._connection.recv()
+        except TimeoutError:
+            self.kill()
+            raise
+        except (EOFError, OSError) as error:
+            self.kill()
+            raise ChildProcessError(f'Process {self._name} crashed') from error
+        if not success:
+            raise TaskExceptionError(result)
+        return result
+
+    def poll(self, timeout: float) -> bool:
+        """
+        Wait until the result of the current task is available (without retrieving it).
+
+        :param timeout: Time in seconds to wait.
+        :return: ``True`` if the result is available (or the process crashed) and ``False`` otherwise.
+        """
+        if self._connection is None:
+            return True
+        return self._connection.poll(timeout)
+
+    def _start(self):
+        self.kill()
+        self._connection, child_connection = Pipe()
+        self._process = Process(
+            target=_persistent_process_loop, args=(self._function, child_connection), name=self._name
+        )
+        self._process.start()
+        # close our copy of the child's end so that we get an EOF if the child dies
+        child_connection.close()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the child process gracefully. If it does not stop until `timeout` is reached, kill it."""
+        if self._process is None:
+            return
+        with suppress(OSError):
+            self._connection.send(None)
+        self._process.join(timeout=timeout)
+        self.kill()
+
+    def kill(self):
+        """Kill the child process (and its children)."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            with suppress(psutil.NoSuchProcess):
+                for child in psutil.Process(self._process.pid).children(recursive=True):
+                    child.kill()
+            self._process.kill()
+        self._process.join()
+        self._connection.close()
+        self._process, self._connection = None, None
+
+
+def _persistent_process_loop(function: Callable, connection: Connection):
+    # the process may have inherited signal handlers of the parent, but it should simply terminate on SIGTERM
+    signal(SIGTERM, SIG_DFL)
+    while True:
+        try:
+            args = connection.recv()
+        except EOFError:  # the parent process is gone
+            return
+        if args is None:
+            return
+        try:
+            result = (True, function(*args))
+        except Exception:
+            result = (False, traceback.format_exc())
+        try:
+            connection.send(result)
+        except Exception:
+            connection.send((False, traceback.format_exc()))
+
+
 def terminate_process_and_children(process: Process) -> None:
     """
     Terminate a process and all of its child processes.
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import subprocess
-from os.path import basename
+import logging
+from io import BytesIO
+from multiprocessing import Pool
 from pathlib import Path
-from subprocess import PIPE, STDOUT, CalledProcessError
-from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING
 
 import yara
 
@@ -12,6 +12,15 @@ import config
 from storage.db_interface_common import DbInterfaceCommon
 from storage.fsorganizer import FSOrganizer
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# number of files that a worker process scans at once (results and progress are reported after each chunk)
+CHUNK_SIZE = 100
+CANCELLED_MESSAGE = 'The binary search was cancelled'
+
+_worker_rules: yara.Rules | None = None
+
 
 class YaraBinarySearchScanner:
     """
@@ -19,47 +28,56 @@ class YaraBinarySearchScanner:
     either match a given set of patterns on all files in the database or focus only on files included in a single
     firmware.
 
-    :param config: The FACT configuration.
+    The files are split into chunks which are scanned by a pool of worker processes (with yara-python). After each
+    chunk, the (partial) results can be reported with a callback and the search can be cancelled.
+
+    :param progress_callback: An optional function that is called with the (partial) results, the number of scanned
+        files and the total number of files after each scanned chunk.
+    :param cancel_callback: An optional function that is called after each scanned chunk. If it returns ``True``, the
+        search is cancelled.
     """
 
-    def __init__(self):
-        self.matches = []
+    def __init__(
+        self,
+        progress_callback: Callable[[dict[str, list[str]], int, int], None] | None = None,
+        cancel_callback: Callable[[], bool] | None = None,
+    ):
         self.db_path = config.backend.firmware_file_storage_directory
         self.db = DbInterfaceCommon()
         self.fs_organizer = FSOrganizer()
+        self.progress_callback = progress_callback
+        self.cancel_callback = cancel_callback
 
-    def _execute_yara_search(self, rule_file_path: str, target_path: str | None = None) -> str:
-        """
-        Scans the (whole) db directory with the provided rule file and returns the (raw) results.
-        Yara-python cannot be used, because it (currently) supports single-file scanning only.
-
-        :param rule_file_path: The file path to the yara rule file.
-        :return: The output from the yara scan.
-        """
-        compiled_flag = '-C' if Path(rule_file_path).read_bytes().startswith(b'YARA') else ''
-        command = f'yara -r {compiled_flag} {rule_file_path} {target_path or self.db_path}'
-        yara_process = subprocess.run(command, shell=True, stdout=PIPE, stderr=STDOUT, text=True)
-        return yara_process.stdout
-
-    def _execute_yara_search_for_single_firmware(self, rule_file_path: str, firmware_uid: str) -> str:
-        file_paths = self._get_file_paths_of_files_included_in_fw(firmware_uid)
-        result = (self._execute_yara_search(rule_file_path, path) for path in file_paths)
-        return '\n'.join(result)
+    def _get_file_paths_of_all_files(self) -> list[str]:
+        return [str(path) for path in Path(self.db_path).rglob('*') if path.is_file()]
 
     def _get_file_paths_of_files_included_in_fw(self, fw_uid: str) -> list[str]:
         return [self.fs_organizer.generate_path_from_uid(uid) for uid in self.db.get_all_files_in_fw(fw_uid)]
 
-    @staticmethod
-    def _parse_raw_result(raw_result: str) -> dict[str, list[str]]:
+    def _execute_yara_search(self, compiled_rules: bytes, file_paths: list[str]) -> dict[str, list[str]] | None:
         """
-        :param raw_result: raw yara scan result
-        :return: dict of matching rules with lists of matched UIDs as values
+        Scans the files with the compiled rules in parallel.
+
+        :param compiled_rules: The compiled yara rules.
+        :param file_paths: The paths of the files that should be scanned.
+        :return: dict of matching rules with lists of (unique) matched UIDs as values or ``None`` if the search was
+            cancelled.
         """
         results = {}
-        for line in raw_result.split('\n'):
-            if line and 'warning' not in line:
-                rule, match = line.split(' ')
-                results.setdefault(rule, []).append(basename(match))  # noqa: PTH119
+        chunks = [file_paths[index : index + CHUNK_SIZE] for index in range(0, len(file_paths), CHUNK_SIZE)]
+        scanned = 0
+        with Pool(config.backend.binary_search_processes, initializer=_init_worker, initargs=(compiled_rules,)) as pool:
+            for chunk_result, chunk_size in pool.imap_unordered(_scan_files, chunks):
+                scanned += chunk_size
+                for rule, uids in chunk_result.items():
+                    results.setdefault(rule, []).extend(uids)
+                self._eliminate_duplicates(results)
+                if self.progress_callback is not None:
+                    self.progress_callback(results, scanned, len(file_paths))
+                if self.cancel_callback is not None and self.cancel_callback():
+                    logging.info(f'Binary search cancelled after {scanned} of {len(file_paths)} files')
+                    pool.terminate()
+                    return None
         return results
 
     @staticmethod
@@ -75,31 +93,42 @@ class YaraBinarySearchScanner:
             optionally a firmware uid if only the contents of a single firmware are to be scanned.
         :return: dict of matching rules with lists of (unique) matched UIDs as values or an error message.
         """
-        with NamedTemporaryFile() as temp_rule_file:
-            yara_rules, firmware_uid = task
-            try:
-                self._prepare_temp_rule_file(temp_rule_file, yara_rules)
-                raw_result = self._get_raw_result(firmware_uid, temp_rule_file)
-                results = self._parse_raw_result(raw_result)
-                self._eliminate_duplicates(results)
-                return results
-            except yara.SyntaxError as yara_error:
-                return f'There seems to be an error in the rule file:\n{yara_error}'
-            except CalledProcessError as process_error:
-                return f'Error when calling YARA:\n{process_error.output.decode()}'
-
-    def _get_raw_result(self, firmware_uid: str | None, temp_rule_file: NamedTemporaryFile) -> str:
+        yara_rules, firmware_uid = task
+        try:
+            compiled_rules = _compile_rules(yara_rules)
+        except yara.SyntaxError as yara_error:
+            return f'There seems to be an error in the rule file:\n{yara_error}'
         if firmware_uid is None:
-            raw_result = self._execute_yara_search(temp_rule_file.name)
+            file_paths = self._get_file_paths_of_all_files()
         else:
-            raw_result = self._execute_yara_search_for_single_firmware(temp_rule_file.name, firmware_uid)
-        return raw_result
-
-    @staticmethod
-    def _prepare_temp_rule_file(temp_rule_file: NamedTemporaryFile, yara_rules: bytes):
-        compiled_rules = yara.compile(source=yara_rules.decode())
-        compiled_rules.save(file=temp_rule_file)
-        temp_rule_file.flush()
+            file_paths = self._get_file_paths_of_files_included_in_fw(firmware_uid)
+        results = self._execute_yara_search(compiled_rules, file_paths)
+        return results if results is not None else CANCELLED_MESSAGE
+
+
+def _compile_rules(yara_rules: bytes) -> bytes:
+    # compiled rules can't be pickled -> we pass them to the worker processes in serialized form
+    buffer = BytesIO()
+    yara.compile(source=yara_rules.decode()).save(file=buffer)
+    return buffer.getvalue()
+
+
+def _init_worker(compiled_rules: bytes):
+    global _worker_rules  # noqa: PLW0603
+    _worker_rules = yara.load(file=BytesIO(compiled_rules))
+
+
+def _scan_files(file_paths: list[str]) -> tuple[dict[str, list[str]], int]:
+    results = {}
+    for file_path in file_paths:
+        try:
+            matches = _worker_rules.match(file_path)
+        except yara.Error as error:
+            logging.warning(f'Binary search: could not scan file {file_path}: {error}')
+            continue
+        for match in matches:
+            results.setdefault(match.rule, []).append(Path(file_path).name)
+    return results, len(file_paths)
 
 
 def is_valid_yara_rule_file(yara_rules: str | bytes) -> bool:
@@ -5,12 +5,18 @@ import logging
 import os
 from multiprocessing import Process, Value
 from pathlib import Path
-from time import sleep
 
 import config
 from helperFunctions.process import stop_processes
 from helperFunctions.yara_binary_search import YaraBinarySearchScanner
-from intercom.common_redis_binding import InterComListener, InterComListenerAndResponder, InterComRedisInterface
+from intercom.common_redis_binding import (
+    CANCEL_KEY_SUFFIX,
+    PROGRESS_KEY_SUFFIX,
+    RESPONSE_EXPIRY,
+    InterComListener,
+    InterComListenerAndResponder,
+    InterComRedisInterface,
+)
 from storage.binary_service import BinaryService
 from storage.db_interface_common import DbInterfaceCommon
 from storage.fsorganizer import FSOrganizer
@@ -52,6 +58,7 @@ class InterComBackEndBinding:
         self._start_listener(InterComBackEndRawDownloadTask)
         self._start_listener(InterComBackEndFileDiffTask)
         self._start_listener(InterComBackEndTarRepackTask)
+        self._start_listener(InterComBackEndTarRepackPathTask)
         self._start_listener(InterComBackEndBinarySearchTask)
         self._start_listener(InterComBackEndUpdateTask, self.analysis_service.update_analysis_of_object_and_children)
 
@@ -79,10 +86,8 @@ class InterComBackEndBinding:
         interface = listener(**additional_args)
         logging.debug(f'{listener.__name__} listener started (pid={os.getpid()})')
         while self.stop_condition.value == 0:
-            task = interface.get_next_task()
-            if task is None:
-                sleep(self.poll_delay)
-            elif do_after_function is not None:
+            task = interface.get_next_task(timeout=self.poll_delay)
+            if task is not None and do_after_function is not None:
                 do_after_function(task)
         logging.debug(f'{listener.__name__} listener stopped')
 
@@ -193,14 +198,42 @@ class InterComBackEndTarRepackTask(InterComListenerAndResponder):
         return self.binary_service.get_repacked_binary_and_file_name(task)
 
 
+class InterComBackEndTarRepackPathTask(InterComListenerAndResponder):
+    CONNECTION_TYPE = 'tar_repack_path_task'
+    OUTGOING_CONNECTION_TYPE = 'tar_repack_path_task_resp'
+
+    def __init__(self):
+        super().__init__()
+        self.binary_service = BinaryService()
+
+    def get_response(self, task: str) -> str | None:
+        return self.binary_service.get_repacked_archive_file_name(task)
+
+
 class InterComBackEndBinarySearchTask(InterComListenerAndResponder):
     CONNECTION_TYPE = 'binary_search_task'
     OUTGOING_CONNECTION_TYPE = 'binary_search_task_resp'
 
-    def get_response(self, task):
-        yara_binary_searcher = YaraBinarySearchScanner()
+    def post_processing(self, task, task_id):
+        logging.debug(f'request received: {self.CONNECTION_TYPE} -> {task_id}')
+        progress_key, cancel_key = f'{task_id}{PROGRESS_KEY_SUFFIX}', f'{task_id}{CANCEL_KEY_SUFFIX}'
+
+        def _store_progress(partial_result: dict[str, list[str]], scanned: int, total: int):
+            progress = {'partial_result': partial_result, 'scanned': scanned, 'total': total}
+            self.redis.set(progress_key, progress, expire=RESPONSE_EXPIRY)
+
+        def _is_cancelled() -> bool:
+            return bool(self.redis.get(cancel_key, delete=False))
+
+        yara_binary_searcher = YaraBinarySearchScanner(progress_callback=_store_progress, cancel_callback=_is_cancelled)
         uid_list = yara_binary_searcher.get_binary_search_result(task)
-        return uid_list, task
+        # the search is no longer running without the progress entry -> it can't be cancelled after this point
+        # (get with delete=True removes the entry)
+        self.redis.get(progress_key)
+        self.redis.queue_put(task_id, (uid_list, task), expire=RESPONSE_EXPIRY)
+        self.redis.get(cancel_key)  # a cancel request that arrived in the meantime would expire eventually
+        logging.debug(f'response send: {self.OUTGOING_CONNECTION_TYPE} -> {task_id}')
+        return task
 
 
 class InterComBackEndDeleteFile(InterComListenerAndResponder):
@@ -1,6 +1,8 @@
+from __future__ import annotations
+
 import logging
 import pickle
-from time import time
+from time import sleep, time
 from typing import Any
 
 from redis.exceptions import RedisError
@@ -8,6 +10,14 @@ from redis.exceptions import RedisError
 from helperFunctions.hash import get_sha256
 from storage.redis_interface import RedisInterface
 
+# suffixes of the keys of additional values that are stored during the processing of a (long-running) task
+PROGRESS_KEY_SUFFIX = '_progress'
+CANCEL_KEY_SUFFIX = '_cancel'
+# time in seconds after which a response is deleted if the requester did not pick it up (e.g. after a timeout)
+RESPONSE_EXPIRY = 3600
+# time in seconds a listener waits after a Redis error before it tries again (so that it does not run in a busy loop)
+REDIS_ERROR_DELAY = 1
+
 
 def generate_task_id(input_data: Any) -> str:
     serialized_data = pickle.dumps(input_data)
@@ -26,11 +36,18 @@ class InterComListener(InterComRedisInterface):
 
     CONNECTION_TYPE = 'test'  # unique for each listener
 
-    def get_next_task(self):
+    def get_next_task(self, timeout: float | None = None):
+        """
+        Get the next task from the queue of this listener.
+
+        :param timeout: If set, wait at most ``timeout`` seconds for a task if the queue is empty.
+        :return: The (post-processed) task or ``None`` if there was none.
+        """
         try:
-            task_obj = self.redis.queue_get(self.CONNECTION_TYPE)
+            task_obj = self.redis.queue_get(self.CONNECTION_TYPE, timeout=timeout)
         except RedisError as exc:
             logging.error(f'Could not get next task: {exc!s}', exc_info=True)
+            sleep(REDIS_ERROR_DELAY)
             return None
         if task_obj is not None:
             task, task_id = task_obj
@@ -57,7 +74,8 @@ class InterComListenerAndResponder(InterComListener):
     def post_processing(self, task, task_id):
         logging.debug(f'request received: {self.CONNECTION_TYPE} -> {task_id}')
         response = self.get_response(task)
-        self.redis.set(task_id, response)
+        # the response is put in a list (named after the task ID) so that the requester can wait for it with BLPOP
+        self.redis.queue_put(task_id, response, expire=RESPONSE_EXPIRY)
         logging.debug(f'response send: {self.OUTGOING_CONNECTION_TYPE} -> {task_id}')
         return task
 
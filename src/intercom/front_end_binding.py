@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 import logging
-from time import sleep, time
-from typing import Any
+import os
+from time import time
+from typing import TYPE_CHECKING, Any
 
 import config
-from intercom.common_redis_binding import InterComRedisInterface, generate_task_id
+from intercom.common_redis_binding import (
+    CANCEL_KEY_SUFFIX,
+    PROGRESS_KEY_SUFFIX,
+    RESPONSE_EXPIRY,
+    InterComRedisInterface,
+    generate_task_id,
+)
+from storage.fsorganizer import get_readable_repacked_archive_path, get_tar_repack_cache_dir
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 class InterComFrontEndBinding(InterComRedisInterface):
@@ -49,8 +60,26 @@ class InterComFrontEndBinding(InterComRedisInterface):
     def get_repacked_binary_and_file_name(self, uid: str):
         return self._request_response_listener(uid, 'tar_repack_task', 'tar_repack_task_resp')
 
+    def get_readable_repacked_archive(self, uid: str) -> tuple[Path | None, str | None]:
+        """
+        Let the backend repack the file with UID ``uid`` into its archive cache and get the path of the cached archive
+        and its file name for the download. This only works if this process can read the cache directory (e.g. if the
+        frontend runs on the same host as the backend). Otherwise, ``(None, None)`` is returned and the archive must be
+        fetched with :py:func:`get_repacked_binary_and_file_name` instead.
+        """
+        if not os.access(get_tar_repack_cache_dir(), os.R_OK | os.X_OK):
+            return None, None
+        file_name = self._request_response_listener(uid, 'tar_repack_path_task', 'tar_repack_path_task_resp')
+        archive_path = get_readable_repacked_archive_path(uid)
+        if file_name is None or archive_path is None:
+            return None, None
+        return archive_path, file_name
+
     def add_binary_search_request(self, yara_rule_binary: bytes, firmware_uid: str | None = None):
         request_id = generate_task_id(yara_rule_binary)
+        # the progress entry marks the search as running until it is finished (the total is unknown until it starts)
+        initial_progress = {'partial_result': {}, 'scanned': 0, 'total': None}
+        self.redis.set(f'{request_id}{PROGRESS_KEY_SUFFIX}', initial_progress, expire=RESPONSE_EXPIRY)
         self._add_to_redis_queue('binary_search_task', (yara_rule_binary, firmware_uid), request_id)
         return request_id
 
@@ -58,6 +87,24 @@ class InterComFrontEndBinding(InterComRedisInterface):
         result = self._response_listener('binary_search_task_resp', request_id, timeout=time() + 10)
         return result if result is not None else (None, None)
 
+    def get_binary_search_progress(self, request_id: str) -> dict | None:
+        """
+        Get the progress of a running binary search: a dict with the partial results (``partial_result``), the number
+        of scanned files (``scanned``) and the total number of files (``total``, ``None`` while the search is queued) or
+        ``None`` if there is no running search with this ID.
+        """
+        return self.redis.get(f'{request_id}{PROGRESS_KEY_SUFFIX}', delete=False)
+
+    def cancel_binary_search(self, request_id: str) -> bool:
+        """
+        Cancel a running binary search. Returns ``False`` if there is no running search with this ID (e.g. because it
+        is already finished).
+        """
+        if self.get_binary_search_progress(request_id) is None:
+            return False
+        self.redis.set(f'{request_id}{CANCEL_KEY_SUFFIX}', True, expire=RESPONSE_EXPIRY)
+        return True
+
     def get_backend_logs(self):
         return self._request_response_listener(None, 'logs_task', 'logs_task_resp')
 
@@ -68,16 +115,16 @@ class InterComFrontEndBinding(InterComRedisInterface):
         return self._response_listener(response_connection, request_id)
 
     def _response_listener(self, response_connection, request_id, timeout=None):
-        output_data = None
         if timeout is None:
             timeout = time() + int(config.frontend.communication_timeout)
-        while timeout > time():
-            output_data = self.redis.get(request_id)
-            if output_data:
-                logging.debug(f'Response received: {response_connection} -> {request_id}')
-                break
-            logging.debug(f'No response yet: {response_connection} -> {request_id}')
-            sleep(0.1)
+        remaining_time = timeout - time()
+        if remaining_time <= 0:
+            return None
+        output_data = self.redis.queue_get(request_id, timeout=remaining_time)
+        if output_data is not None:
+            logging.debug(f'Response received: {response_connection} -> {request_id}')
+        else:
+            logging.debug(f'No response: {response_connection} -> {request_id}')
         return output_data
 
     def _add_to_redis_queue(self, key: str, data: Any, task_id: str | None = None):
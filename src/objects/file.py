@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import logging
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from common_helper_files import get_binary_from_file
 
 from helperFunctions.data_conversion import make_bytes, make_unicode_string
+from helperFunctions.fileSystem import map_file
 from helperFunctions.hash import get_sha256
 from helperFunctions.uid import create_uid
 from helperFunctions.virtual_file_path import get_some_vfp
-from typing import Optional
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from mmap import mmap
 
 
 class FileObject:
@@ -31,6 +37,9 @@ class FileObject:
         scheduled_analysis: Optional[list[str]] = None,
     ):
         self._uid = None
+        self._binary = None
+        #: Path from which the binary is loaded lazily after it was unloaded (see :py:func:`unload_binary`)
+        self._binary_path = None
 
         #: The set of files included in this file. This is usually true for archives.
         #: Only lists the next layer, not recursively included files on lower extraction layers.
@@ -99,9 +108,6 @@ class FileObject:
         if binary is not None:
             self.set_binary(binary)
         else:
-            #: Binary representation of this file in bytes.
-            self.binary = None
-
             #: SHA256 hash of this file.
             self.sha256 = None
 
@@ -134,6 +140,47 @@ class FileObject:
         self.size = len(self.binary)
         self._uid = create_uid(binary)
 
+    @property
+    def binary(self) -> bytes | None:
+        """
+        Binary representation of this file in bytes.
+        If the binary was unloaded (see :py:func:`unload_binary`), it is read from the file again on first access.
+        """
+        if self._binary is None and self._binary_path is not None:
+            self._binary = get_binary_from_file(self._binary_path)
+            self._binary_path = None
+        return self._binary
+
+    @binary.setter
+    def binary(self, binary: bytes | None):
+        self._binary = binary
+        self._binary_path = None
+
+    def unload_binary(self, binary_path: str) -> None:
+        """
+        Free the memory of the binary. The binary is read from `binary_path` again if it is accessed later. To access
+        the contents without copying them into memory, use :py:func:`open_binary`.
+
+        :param binary_path: The path of the file (e.g. the path generated by the FSOrganizer).
+        """
+        self._binary = None
+        self._binary_path = binary_path
+
+    @contextmanager
+    def open_binary(self) -> Iterator[bytes | mmap]:
+        """
+        Access the contents of the file without loading them into memory: If the binary was unloaded, a read-only
+        memory map of the file is returned (see :py:func:`helperFunctions.fileSystem.map_file`). Otherwise, the
+        binary is returned.
+
+        :return: The contents of the file as ``bytes`` or ``mmap``.
+        """
+        if self._binary is None and self._binary_path is not None:
+            with map_file(self._binary_path) as mapped_file:
+                yield mapped_file
+        else:
+            yield self.binary
+
     def create_binary_from_path(self) -> None:
         if self.file_path is not None:
             if self.binary is None:
@@ -5,5 +5,5 @@ class AnalysisPlugin(YaraBasePlugin):
     NAME = 'crypto_hints'
     DESCRIPTION = 'find indicators of specific crypto algorithms'
     DEPENDENCIES = []  # noqa: RUF012
-    VERSION = '0.1.1'
+    VERSION = '0.1.2'
     FILE = __file__
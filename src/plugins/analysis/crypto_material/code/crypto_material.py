@@ -25,7 +25,7 @@ class AnalysisPlugin(YaraBasePlugin):
 
     NAME = 'crypto_material'
     DESCRIPTION = 'detects crypto material like SSH keys and SSL certificates'
-    VERSION = '0.5.2'
+    VERSION = '0.5.3'
     MIME_BLACKLIST = ['filesystem']  # noqa: RUF012
     FILE = __file__
 
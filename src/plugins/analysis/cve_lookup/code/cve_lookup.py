@@ -34,18 +34,26 @@ class AnalysisPlugin(AnalysisBasePlugin):
     VERSION = '0.1.0'
     FILE = __file__
 
+    def additional_setup(self):
+        self._lookup: Lookup | None = None
+
+    def _get_lookup(self) -> Lookup:
+        # the lookup is created on first use (i.e. in the analysis process) and then reused for all files
+        if self._lookup is None:
+            self._lookup = Lookup(DbConnection(f'sqlite:///{DB_PATH}'))
+        return self._lookup
+
     def process_object(self, file_object: FileObject) -> FileObject:
         """
         Process the given file object and look up vulnerabilities for each software component.
         """
         cves = {'cve_results': {}}
-        connection = DbConnection(f'sqlite:///{DB_PATH}')
-        lookup = Lookup(file_object, connection)
+        lookup = self._get_lookup()
         for _key, value in file_object.processed_analysis['software_components']['result'].items():
             product = value['meta']['software_name']
             version = value['meta']['version'][0]
             if product and version:
-                vulnerabilities = lookup.lookup_vulnerabilities(product, version)
+                vulnerabilities = lookup.lookup_vulnerabilities(product, version, file_object)
                 if vulnerabilities:
                     component = f'{product} {version}'
                     cves['cve_results'][component] = vulnerabilities
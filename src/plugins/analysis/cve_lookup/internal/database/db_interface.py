@@ -7,6 +7,8 @@ from ..database.schema import Association, Cve, Cpe
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from sqlalchemy import Row
+
     from ..database.db_connection import DbConnection
 
 
@@ -24,6 +26,15 @@ class DbInterface:
         cpe_matches = self.session.query(Cpe).filter(Cpe.product.in_(products)).all()
         return {cpe.cpe_id: cpe for cpe in cpe_matches}
 
+    def get_cpes_by_product(self) -> dict[str, list[Row]]:
+        """
+        Retrieve all CPEs (ID and version) grouped by product.
+        """
+        cpes_by_product = defaultdict(list)
+        for cpe in self.session.query(Cpe.cpe_id, Cpe.product, Cpe.version):
+            cpes_by_product[cpe.product].append(cpe)
+        return dict(cpes_by_product)
+
     def get_associations(self, cpe_ids: list[str]) -> dict[str, list[Association]]:
         """
         Retrieve a dictionary of Association objects for the given Cpe IDs.
@@ -1,6 +1,20 @@
+from __future__ import annotations
+
+import logging
+import operator
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from packaging.version import InvalidVersion
 from sqlalchemy import Column, String, ForeignKey
 from sqlalchemy.orm import declarative_base, relationship
 
+from ..helper_functions import coerce_version
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from packaging.version import Version
+
 Base = declarative_base()
 
 
@@ -20,6 +34,29 @@ class Association(Base):
     def __repr__(self) -> str:
         return f'Association({self.cve_id, self.cpe_id})'
 
+    @cached_property
+    def version_boundaries(self) -> list[tuple[Version, Callable]] | None:
+        """
+        The version boundaries of this association (parsed only once per row). A list of tuples ``(version,
+        operator)``: a version ``v`` is within the boundaries if ``operator(version, v)`` is true for all entries.
+        The list is empty if the association has no boundaries and ``None`` if a boundary is not a valid version.
+        """
+        boundaries = []
+        for version_boundary, comp_operator in [
+            (self.version_start_including, operator.le),
+            (self.version_start_excluding, operator.lt),
+            (self.version_end_including, operator.ge),
+            (self.version_end_excluding, operator.gt),
+        ]:
+            if not version_boundary:
+                continue
+            try:
+                boundaries.append((coerce_version(version_boundary), comp_operator))
+            except InvalidVersion as error:
+                logging.debug(f'Error while parsing software version: {error}')
+                return None
+        return boundaries
+
 
 class Cve(Base):
     __tablename__ = 'cves'
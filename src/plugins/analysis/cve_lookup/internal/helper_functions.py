@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import re
 from typing import NamedTuple
 
+from packaging.version import InvalidVersion, Version
+from packaging.version import parse as parse_version
+
+VALID_VERSION_REGEX = re.compile(r'v?(\d+!)?\d+(\.\d+)*([.-]?(a(lpha)?|b(eta)?|c|dev|post|pre(view)?|r|rc)?\d+)?')
+
 
 class CveEntry(NamedTuple):
     """
@@ -24,3 +30,26 @@ def replace_wildcards(attributes: list[str]) -> list[str]:
         elif attribute == '-':
             attributes[index] = 'N/A'
     return attributes
+
+
+def coerce_version(version: str) -> Version:
+    """
+    The version may not be PEP 440 compliant -> try to convert it to something that we can use for comparison
+
+    :raises InvalidVersion: if the version could not be converted.
+    """
+    try:
+        return parse_version(version)
+    except InvalidVersion:
+        # try to convert other conventions (e.g. debian policy) to PEP 440
+        fixed_version = version.lower().replace('~', '-').replace(':', '!', 1).replace('_', '-')
+    try:
+        return parse_version(fixed_version)
+    except InvalidVersion:
+        match = VALID_VERSION_REGEX.match(fixed_version)
+        if match:
+            valid_version = match.group()
+            rest = re.sub(r'[^\w.-]', '', fixed_version[len(valid_version) :]).lstrip('._-')
+            return parse_version(f'{valid_version}+{rest}')
+        # try to throw away revisions and other stuff at the end as a final measure
+        return parse_version(re.split(r'[^v.\d]', fixed_version)[0])
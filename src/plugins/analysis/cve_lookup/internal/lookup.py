@@ -1,53 +1,68 @@
 from __future__ import annotations
 
-import re
 import logging
-import operator
+from functools import lru_cache
 from itertools import combinations
-from packaging.version import parse as parse_version
-from packaging.version import InvalidVersion, Version
+from packaging.version import InvalidVersion
 
 from .busybox_cve_filter import filter_busybox_cves
 from .database.db_interface import DbInterface
-from .helper_functions import replace_wildcards
+from .helper_functions import coerce_version, replace_wildcards
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from packaging.version import Version
     from .database.db_connection import DbConnection
-    from .database.schema import Association, Cpe
-    from collections.abc import Callable
+    from .database.schema import Association, Cpe, Cve
     from objects.file import FileObject
 
-VALID_VERSION_REGEX = re.compile(r'v?(\d+!)?\d+(\.\d+)*([.-]?(a(lpha)?|b(eta)?|c|dev|post|pre(view)?|r|rc)?\d+)?')
+#: The number of (product, version) combinations for which the vulnerabilities are cached
+LOOKUP_CACHE_SIZE = 4096
 
 
 class Lookup:
-    def __init__(self, file_object: FileObject, connection: DbConnection):
-        self.file_object = file_object
+    """
+    Looks up vulnerabilities of software components in the CVE database. A lookup object is meant to be reused for
+    many files: All CPEs are indexed by product when the object is created and the vulnerabilities are cached for
+    each combination of product and version.
+    """
+
+    def __init__(self, connection: DbConnection, cache_size: int = LOOKUP_CACHE_SIZE):
         self.db_interface = DbInterface(connection)
+        self._cpes_by_product = self.db_interface.get_cpes_by_product()
+        self._find_vulnerabilities = lru_cache(maxsize=cache_size)(self._find_vulnerabilities_uncached)
 
     def lookup_vulnerabilities(
         self,
         product_name: str,
         requested_version: str,
+        file_object: FileObject,
     ) -> dict:
         """
         Look up vulnerabilities for a given product and requested version.
         """
+        vulnerabilities, cves = self._find_vulnerabilities(product_name, requested_version)
+        if cves and 'busybox' in self._generate_search_terms(product_name):
+            cves = filter_busybox_cves(file_object, cves)
+        # copy the entries so that the cached results can't be modified
+        return {cve_id: dict(entry) for cve_id, entry in vulnerabilities.items() if cve_id in cves}
+
+    def _find_vulnerabilities_uncached(
+        self, product_name: str, requested_version: str
+    ) -> tuple[dict[str, dict], dict[str, Cve]]:
         vulnerabilities = {}
+        cves = {}
         product_terms, version = (
             self._generate_search_terms(product_name),
             replace_wildcards([requested_version])[0],
         )
-        cpe_matches = self.db_interface.match_cpes(product_terms)
+        cpe_matches = self._match_cpes(product_terms)
         if len(cpe_matches) == 0:
             logging.debug(f'No CPEs were found for product {product_name}')
         else:
             association_matches = self._find_matching_associations(cpe_matches, version)
             cve_ids = [association.cve_id for association in association_matches]
             cves = self.db_interface.get_cves(cve_ids)
-            if 'busybox' in product_terms:
-                cves = filter_busybox_cves(self.file_object, cves)
             for association in association_matches:
                 cve = cves.get(association.cve_id)
                 if cve:
@@ -58,7 +73,10 @@ class Lookup:
                         'cpe_version': self._build_version_string(association, cpe),
                     }
 
-        return vulnerabilities
+        return vulnerabilities, cves
+
+    def _match_cpes(self, product_terms: list[str]) -> dict[str, Cpe]:
+        return {cpe.cpe_id: cpe for term in product_terms for cpe in self._cpes_by_product.get(term, [])}
 
     @staticmethod
     def _generate_search_terms(product_name: str) -> list[str]:
@@ -77,6 +95,12 @@ class Lookup:
         if requested_version in {'ANY', 'N/A'}:
             return association_matches
 
+        try:
+            parsed_version = coerce_version(requested_version)
+        except InvalidVersion as error:
+            logging.debug(f'Error while parsing software version: {error}')
+            parsed_version = None
+
         cpe_ids = [cpe.cpe_id for cpe in cpe_matches.values()]
         associations_dict = self.db_interface.get_associations(cpe_ids)
 
@@ -84,75 +108,24 @@ class Lookup:
             associations = associations_dict.get(cpe.cpe_id, [])
             if cpe.version == requested_version:
                 association_matches += associations
-            else:
-                association_matches += self._version_in_boundaries(associations, requested_version)
+            elif parsed_version is not None:
+                association_matches += self._version_in_boundaries(associations, parsed_version)
         return association_matches
 
-    def _version_in_boundaries(self, associations: list[Association], requested_version: str) -> list[Association]:
-        """
-        Find and return the CVE and CPE associations where the requested version is within the version boundaries.
-        """
-        association_matches = []
-        if requested_version == 'ANY, N/A':
-            return association_matches
-        for association in associations:
-            if not any(
-                [
-                    association.version_start_including,
-                    association.version_start_excluding,
-                    association.version_end_including,
-                    association.version_end_excluding,
-                ]
-            ):
-                continue
-            if self._is_version_in_boundaries(association, requested_version):
-                association_matches.append(association)
-        return association_matches
-
-    def _is_version_in_boundaries(self, association: Association, requested_version: str) -> bool:
-        """
-        Check if the requested version is within the boundaries of the given CVE and CPE association.
-        """
-        for version_boundary, comp_operator in [
-            (association.version_start_including, operator.le),
-            (association.version_start_excluding, operator.lt),
-            (association.version_end_including, operator.ge),
-            (association.version_end_excluding, operator.gt),
-        ]:
-            if version_boundary and not self._compare_version(version_boundary, requested_version, comp_operator):
-                return False
-        return True
-
-    def _compare_version(self, version1: str, version2: str, comp_operator: Callable) -> bool:
-        """
-        Compare two software versions using the specified comparison operator.
-        """
-        try:
-            return comp_operator(self._coerce_version(version1), self._coerce_version(version2))
-        except InvalidVersion as error:
-            logging.debug(f'Error while parsing software version: {error}')
-        return False
-
     @staticmethod
-    def _coerce_version(version: str) -> Version:
+    def _version_in_boundaries(associations: list[Association], requested_version: Version) -> list[Association]:
         """
-        The version may not be PEP 440 compliant -> try to convert it to something that we can use for comparison
+        Find and return the CVE and CPE associations where the requested version is within the version boundaries.
         """
-        try:
-            return parse_version(version)
-        except InvalidVersion:
-            # try to convert other conventions (e.g. debian policy) to PEP 440
-            fixed_version = version.lower().replace('~', '-').replace(':', '!', 1).replace('_', '-')
-        try:
-            return parse_version(fixed_version)
-        except InvalidVersion:
-            match = VALID_VERSION_REGEX.match(fixed_version)
-            if match:
-                valid_version = match.group()
-                rest = re.sub(r'[^\w.-]', '', fixed_version[len(valid_version) :]).lstrip('._-')
-                return parse_version(f'{valid_version}+{rest}')
-            # try to throw away revisions and other stuff at the end as a final measure
-            return parse_version(re.split(r'[^v.\d]', fixed_version)[0])
+        return [
+            association
+            for association in associations
+            # associations without (valid) boundaries are skipped
+            if association.version_boundaries
+            and all(
+                comp_operator(boundary, requested_version) for boundary, comp_operator in association.version_boundaries
+            )
+        ]
 
     def _build_version_string(self, association: Association, cpe: Cpe) -> str:
         """
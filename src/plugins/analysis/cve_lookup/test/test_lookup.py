@@ -1,6 +1,26 @@
 import pytest
+
+from ..internal.database.db_connection import DbConnection
+from ..internal.database.db_setup import DbSetup
+from ..internal.database.schema import Association
+from ..internal.helper_functions import CveEntry
 from ..internal.lookup import Lookup
 
+CVE_ENTRY = CveEntry(
+    cve_id='CVE-2013-0198',
+    summary='Dnsmasq before 2.66test2 [...]',
+    impact={'cvssMetricV2': 5.0},
+    cpe_entries=[('cpe:2.3:a:thekelleys:dnsmasq:*:*:*:*:*:*:*:*', '', '', '2.65', '')],
+)
+
+
+@pytest.fixture
+def lookup():
+    connection = DbConnection('sqlite:///:memory:')
+    DbSetup(connection).add_cve_items([CVE_ENTRY])
+    yield Lookup(connection)
+    connection.drop_tables()
+
 
 @pytest.mark.parametrize(
     ('software_name', 'expected_output'),
@@ -12,3 +32,48 @@ from ..internal.lookup import Lookup
 def test_generate_search_terms(software_name, expected_output):
     result = Lookup._generate_search_terms(software_name)
     assert result == expected_output
+
+
+@pytest.mark.parametrize(
+    ('product', 'version', 'expected_result'),
+    [
+        ('Dnsmasq', '2.40', {'CVE-2013-0198': {'score2': '5.0', 'score3': 'N/A', 'cpe_version': 'version ≤ 2.65'}}),
+        ('Dnsmasq', '2.65', {'CVE-2013-0198': {'score2': '5.0', 'score3': 'N/A', 'cpe_version': 'version ≤ 2.65'}}),
+        ('Dnsmasq', '2.66', {}),
+        ('Dnsmasq', 'foobar', {}),
+        ('unknown product', '2.40', {}),
+    ],
+)
+def test_lookup_vulnerabilities(lookup, product, version, expected_result):
+    assert lookup.lookup_vulnerabilities(product, version, None) == expected_result
+
+
+def test_lookup_vulnerabilities_is_cached(lookup, monkeypatch):
+    result = lookup.lookup_vulnerabilities('Dnsmasq', '2.40', None)
+    assert result != {}
+
+    def _fail(*_):
+        raise AssertionError('should not be called')
+
+    monkeypatch.setattr(lookup.db_interface, 'get_associations', _fail)
+    monkeypatch.setattr(lookup.db_interface, 'get_cves', _fail)
+    result['CVE-2013-0198']['score2'] = 'modified'
+    assert lookup.lookup_vulnerabilities('Dnsmasq', '2.40', None)['CVE-2013-0198']['score2'] == '5.0'
+
+
+@pytest.mark.parametrize(
+    ('boundaries', 'expected_result'),
+    [
+        ({}, []),
+        ({'version_start_including': '1.0', 'version_end_excluding': '2.0'}, [('1.0', 'le'), ('2.0', 'gt')]),
+        ({'version_end_including': '1:2.3~rc1'}, [('1!2.3rc1', 'ge')]),
+        ({'version_start_excluding': '1.0', 'version_end_excluding': 'invalid'}, None),
+    ],
+)
+def test_version_boundaries(boundaries, expected_result):
+    association = Association(cve_id='CVE-1', cpe_id='cpe:1', **boundaries)
+    result = association.version_boundaries
+    if expected_result is None:
+        assert result is None
+    else:
+        assert [(str(version), operator.__name__) for version, operator in result] == expected_result
@@ -76,6 +76,7 @@ class AnalysisPlugin(AnalysisBasePlugin):
             DOCKER_IMAGE,
             combine_stderr_stdout=True,
             timeout=self.TIMEOUT - 30,
+            pooled=True,
             command='/input --json --quiet',
             mounts=[
                 Mount('/input', file_object.file_path, type='bind'),
@@ -3,7 +3,7 @@ from hashlib import algorithms_guaranteed
 
 import config
 from analysis.PluginBase import AnalysisBasePlugin
-from helperFunctions.hash import get_hash, get_imphash, get_ssdeep, get_tlsh
+from helperFunctions.hash import get_hashes, get_imphash
 
 
 class AnalysisPlugin(AnalysisBasePlugin):
@@ -27,17 +27,13 @@ class AnalysisPlugin(AnalysisBasePlugin):
         Analysis result must be a dict stored in file_object.processed_analysis[self.NAME]
         If you want to propagate results to parent objects store a list of strings 'summary' entry of your result dict
         """
-        file_object.processed_analysis[self.NAME] = {}
+        hash_functions = []
         for hash_ in self.hashes_to_create:
             if hash_ in algorithms_guaranteed:
-                file_object.processed_analysis[self.NAME][hash_] = get_hash(hash_, file_object.binary)
+                hash_functions.append(hash_)
             else:
                 logging.debug(f'algorithm {hash_} not available')
-        file_object.processed_analysis[self.NAME]['ssdeep'] = get_ssdeep(file_object.binary)
+        with file_object.open_binary() as binary:
+            file_object.processed_analysis[self.NAME] = get_hashes(binary, hash_functions)
         file_object.processed_analysis[self.NAME]['imphash'] = get_imphash(file_object)
-
-        tlsh_hash = get_tlsh(file_object.binary)
-        if tlsh_hash:
-            file_object.processed_analysis[self.NAME]['tlsh'] = get_tlsh(file_object.binary)
-
         return file_object
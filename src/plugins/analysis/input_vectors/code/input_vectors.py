@@ -44,6 +44,7 @@ class AnalysisPlugin(AnalysisBasePlugin):
                     combine_stderr_stdout=False,
                     logging_label=self.NAME,
                     timeout=TIMEOUT_IN_SECONDS,
+                    pooled=True,
                     command=CONTAINER_TARGET_PATH,
                     mounts=[
                         Mount(CONTAINER_TARGET_PATH, str(file_path), type='bind'),
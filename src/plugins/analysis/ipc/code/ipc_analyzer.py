@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import shutil
 import tempfile
 from pathlib import Path
 
@@ -40,16 +41,21 @@ class AnalysisPlugin(AnalysisBasePlugin):
             mount = f'/input/{file_object.file_name}'
             if not folder.exists():
                 folder.mkdir()
+            # the input dir (instead of the file) is mounted so that the mount target does not depend on the file name
+            input_dir = Path(tmp_dir) / 'input'
+            input_dir.mkdir()
+            shutil.copyfile(file_object.file_path, input_dir / file_object.file_name)
             output = folder / f'{file_object.file_name}.json'
             output.write_text(json.dumps({'ipcCalls': {}}))
             run_docker_container(
                 DOCKER_IMAGE,
                 combine_stderr_stdout=True,
                 timeout=self.TIMEOUT,
+                pooled=True,
                 command=f'{mount} /results/',
                 mounts=[
                     Mount('/results/', str(folder.resolve()), type='bind'),
-                    Mount(mount, file_object.file_path, type='bind'),
+                    Mount('/input', str(input_dir.resolve()), type='bind', read_only=True),
                 ],
             )
             return json.loads(output.read_text())
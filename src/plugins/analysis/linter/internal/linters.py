@@ -157,6 +157,7 @@ def run_rubocop(file_path: str) -> list[dict]:
     process = run_docker_container(
         'pipelinecomponents/rubocop:latest',
         combine_stderr_stdout=False,
+        pooled=True,
         mounts=[
             Mount(container_path, file_path, type='bind', read_only=True),
         ],
@@ -185,6 +186,7 @@ def run_phpstan(file_path):
     phpstan_p = run_docker_container(
         'ghcr.io/phpstan/phpstan',
         combine_stderr_stdout=False,
+        pooled=True,
         mounts=[
             Mount(container_path, file_path, type='bind', read_only=True),
         ],
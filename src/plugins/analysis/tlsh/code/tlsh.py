@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 
 from analysis.PluginBase import AnalysisBasePlugin
 from helperFunctions.hash import get_tlsh_comparison
 from storage.db_interface_base import ReadOnlyDbInterface
-from storage.schema import AnalysisEntry
+from storage.schema import TLSH_HEADER, AnalysisEntry
+
+#: Files with a TLSH distance up to this value are considered similar
+MAX_DISTANCE = 150
+#: The length value is an 8 bit value and the quartile ratios are 4 bit values (all with wraparound)
+LVALUE_RANGE, Q_RATIO_RANGE = 256, 16
 
 
 class AnalysisPlugin(AnalysisBasePlugin):
@@ -26,21 +31,116 @@ class AnalysisPlugin(AnalysisBasePlugin):
     def process_object(self, file_object):
         comparisons_dict = {}
         if 'tlsh' in file_object.processed_analysis['file_hashes']['result']:
-            for uid, tlsh_hash in self.db.get_all_tlsh_hashes():
-                value = get_tlsh_comparison(file_object.processed_analysis['file_hashes']['result']['tlsh'], tlsh_hash)
-                if value <= 150 and uid != file_object.uid:  # noqa: PLR2004
+            tlsh_hash = file_object.processed_analysis['file_hashes']['result']['tlsh']
+            header_ranges = get_similar_tlsh_header_ranges(tlsh_hash)
+            for uid, other_hash in self.db.get_tlsh_hashes_in_header_ranges(header_ranges):
+                value = get_tlsh_comparison(tlsh_hash, other_hash)
+                if value <= MAX_DISTANCE and uid != file_object.uid:
                     comparisons_dict[uid] = value
 
         file_object.processed_analysis[self.NAME] = comparisons_dict
         return file_object
 
 
+def get_similar_tlsh_header_ranges(tlsh_hash: str) -> list[tuple[str, str]]:
+    """
+    The TLSH distance is the sum of the distance of the headers and the distance of the bodies of the hashes. Therefore,
+    the distance of the headers alone is a lower bound for the distance of the hashes. This function returns the
+    headers (in the format of :py:data:`storage.schema.TLSH_HEADER`) with a distance of at most ``MAX_DISTANCE`` to the
+    header of `tlsh_hash` as ranges ``(first, last)``. Only files with a header in one of these ranges can be similar
+    to the file with hash `tlsh_hash`.
+
+    The distance budget is split between the length value and the quartile ratios: For each length value and Q1 ratio,
+    the remaining budget determines how far the Q2 ratio may differ. These Q2 ratios are contiguous (with wraparound),
+    so the headers form a few ranges (which are merged if they are adjacent) instead of thousands of single headers.
+    """
+    if len(tlsh_hash) < 70:  # noqa: PLR2004
+        return []  # the hash is empty (e.g. the file is too small) or invalid
+    lvalue, q1_ratio, q2_ratio = _parse_tlsh_header(tlsh_hash)
+    max_lvalue_diff = MAX_DISTANCE // 12
+    ranges: list[tuple[int, int]] = []
+    for other_lvalue in range(lvalue - max_lvalue_diff, lvalue + max_lvalue_diff + 1):
+        lvalue_distance = _get_lvalue_distance(lvalue, other_lvalue % LVALUE_RANGE)
+        for other_q1_ratio in range(Q_RATIO_RANGE):
+            budget = MAX_DISTANCE - lvalue_distance - _get_q_ratio_distance(q1_ratio, other_q1_ratio)
+            if budget < 0:
+                continue
+            prefix = (_swap_nibbles(other_lvalue % LVALUE_RANGE) << 8) | (other_q1_ratio << 4)
+            ranges.extend(
+                (prefix | first, prefix | last)
+                for first, last in _get_q_ratio_ranges(q2_ratio, _get_max_q_diff(budget))
+            )
+    return [(f'{first:04X}', f'{last:04X}') for first, last in _merge_ranges(ranges)]
+
+
+def _get_max_q_diff(budget: int) -> int:
+    # the largest difference of a quartile ratio with a distance (see _get_q_ratio_distance) within the budget
+    if budget < 12:  # noqa: PLR2004
+        return min(budget, 1)
+    return min(budget // 12 + 1, Q_RATIO_RANGE // 2)
+
+
+def _get_q_ratio_ranges(q_ratio: int, max_diff: int) -> list[tuple[int, int]]:
+    first, last = q_ratio - max_diff, q_ratio + max_diff
+    if last - first + 1 >= Q_RATIO_RANGE:
+        return [(0, Q_RATIO_RANGE - 1)]
+    if first < 0:
+        return [(0, last), (first + Q_RATIO_RANGE, Q_RATIO_RANGE - 1)]
+    if last >= Q_RATIO_RANGE:
+        return [(first, Q_RATIO_RANGE - 1), (0, last - Q_RATIO_RANGE)]
+    return [(first, last)]
+
+
+def _merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(last, merged[-1][1]))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _parse_tlsh_header(tlsh_hash: str) -> tuple[int, int, int]:
+    # the header is located before the 64 hex digits of the body and after the checksum (and the optional version
+    # prefix). Bytes are hex encoded with swapped nibbles.
+    header = tlsh_hash[-68:-64]
+    return _swap_nibbles(int(header[:2], 16)), int(header[2], 16), int(header[3], 16)
+
+
+def _swap_nibbles(byte: int) -> int:
+    return ((byte & 0x0F) << 4) | (byte >> 4)
+
+
+def _mod_diff(first: int, second: int, value_range: int) -> int:
+    diff = abs(first - second)
+    return min(diff, value_range - diff)
+
+
+def _get_lvalue_distance(first: int, second: int) -> int:
+    diff = _mod_diff(first, second, LVALUE_RANGE)
+    return diff if diff <= 1 else diff * 12
+
+
+def _get_q_ratio_distance(first: int, second: int) -> int:
+    diff = _mod_diff(first, second, Q_RATIO_RANGE)
+    return diff if diff <= 1 else (diff - 1) * 12
+
+
 class TLSHInterface(ReadOnlyDbInterface):
-    def get_all_tlsh_hashes(self) -> list[tuple[str, str]]:
+    def get_tlsh_hashes_in_header_ranges(self, header_ranges: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """
+        Get the TLSH hashes (and the UIDs of the corresponding files) with a header (see
+        :py:data:`storage.schema.TLSH_HEADER`) in one of the ranges `header_ranges`. The query uses the index on the
+        hash header (one range scan per range), so only the matching hashes need to be fetched instead of all hashes in
+        the database.
+        """
+        if not header_ranges:
+            return []
         with self.get_read_only_session() as session:
             query = (
                 select(AnalysisEntry.uid, AnalysisEntry.result['tlsh'])
                 .filter(AnalysisEntry.plugin == 'file_hashes')
-                .filter(AnalysisEntry.result['tlsh'] != None)  # noqa: E711
+                .filter(or_(*(TLSH_HEADER.between(first, last) for first, last in header_ranges)))
             )
             return list(session.execute(query))
@@ -1,6 +1,15 @@
+from itertools import product
+
 import pytest
 
-from plugins.analysis.tlsh.code.tlsh import AnalysisPlugin
+from plugins.analysis.tlsh.code.tlsh import (
+    MAX_DISTANCE,
+    AnalysisPlugin,
+    _get_lvalue_distance,
+    _get_q_ratio_distance,
+    _parse_tlsh_header,
+    get_similar_tlsh_header_ranges,
+)
 from test.common_helper import create_test_file_object
 from test.mock import mock_patch
 
@@ -8,9 +17,13 @@ HASH_0 = '9A355C07B5A614FDC5A2847046EF92B7693174A642327DBF3C88D6303F42E746B1ABE1
 HASH_1 = '0CC34B06B1B258BCC16689308A67D671AB747E5053223B3E3684F7342F56E6F1F0DAB1'
 
 
+def _in_ranges(header: str, header_ranges: list[tuple[str, str]]) -> bool:
+    return any(first <= header <= last for first, last in header_ranges)
+
+
 class MockDb:
-    def get_all_tlsh_hashes(self):
-        return [('test_uid', HASH_1)]
+    def get_tlsh_hashes_in_header_ranges(self, header_ranges):
+        return [('test_uid', HASH_1)] if _in_ranges('C34B', header_ranges) else []
 
 
 @pytest.fixture
@@ -52,7 +65,7 @@ class TestTlsh:
         assert result.processed_analysis[tlsh_plugin.NAME] == {}
 
     def test_no_files_in_database(self, test_object, tlsh_plugin):
-        with mock_patch(tlsh_plugin.db, 'get_all_tlsh_hashes', list):
+        with mock_patch(tlsh_plugin.db, 'get_tlsh_hashes_in_header_ranges', lambda _: []):
             result = tlsh_plugin.process_object(test_object)
 
         assert result.processed_analysis[tlsh_plugin.NAME] == {}
@@ -61,3 +74,38 @@ class TestTlsh:
         with pytest.raises(KeyError):  # noqa: PT012
             test_object.processed_analysis.pop('file_hashes')
             tlsh_plugin.process_object(test_object)
+
+
+@pytest.mark.parametrize(
+    ('tlsh_hash', 'header', 'expected_result'),
+    [
+        (HASH_1, 'C34B', True),  # same header
+        (HASH_1, 'C346', True),  # different q2 ratio
+        (f'T1{HASH_1}', 'C34B', True),  # hash with version prefix
+        (HASH_1, '355C', False),  # different length value
+        (HASH_0, 'C34B', False),
+        ('', 'C34B', False),
+    ],
+)
+def test_get_similar_tlsh_header_ranges(tlsh_hash, header, expected_result):
+    assert _in_ranges(header, get_similar_tlsh_header_ranges(tlsh_hash)) == expected_result
+
+
+@pytest.mark.parametrize('tlsh_hash', [HASH_0, HASH_1])
+def test_header_ranges_match_distance_budget(tlsh_hash):
+    lvalue, q1_ratio, q2_ratio = _parse_tlsh_header(tlsh_hash)
+    expected = {
+        f'{(other_lvalue & 0x0F) << 4 | other_lvalue >> 4:02X}{other_q1:X}{other_q2:X}'
+        for other_lvalue, other_q1, other_q2 in product(range(256), range(16), range(16))
+        if _get_lvalue_distance(lvalue, other_lvalue)
+        + _get_q_ratio_distance(q1_ratio, other_q1)
+        + _get_q_ratio_distance(q2_ratio, other_q2)
+        <= MAX_DISTANCE
+    }
+    header_ranges = get_similar_tlsh_header_ranges(tlsh_hash)
+    assert {f'{value:04X}' for value in range(0x10000) if _in_ranges(f'{value:04X}', header_ranges)} == expected
+
+
+def test_header_range_count():
+    # 3287 headers are within the distance budget of a typical hash, but they form far fewer ranges
+    assert len(get_similar_tlsh_header_ranges(HASH_1)) == 226  # noqa: PLR2004
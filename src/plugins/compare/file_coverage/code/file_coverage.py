@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import re
 from itertools import combinations
+from multiprocessing import Pool
 
 import networkx
 import ssdeep
@@ -15,6 +17,14 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from objects.file import FileObject
 
+# ssdeep only assigns a score > 0 to signatures that have a common substring of this length
+SSDEEP_ROLLING_WINDOW = 7
+# ssdeep removes sequences of more than 3 identical characters before signatures are compared
+SSDEEP_SEQUENCE_REGEX = re.compile(r'(.)\1{3,}')
+# minimum number of hash pairs for which the comparison is done in multiple processes
+PARALLEL_COMPARISON_THRESHOLD = 10_000
+COMPARISON_CHUNK_SIZE = 1_000
+
 
 class ComparePlugin(CompareBasePlugin):
     """
@@ -98,26 +108,37 @@ class ComparePlugin(CompareBasePlugin):
     def _get_similar_files(
         self, fo_list: list[FileObject], exclusive_files: dict[str, list[str]]
     ) -> tuple[list[list], dict]:
+        uids = {uid for file_object in fo_list for uid in exclusive_files[file_object.uid]}
+        uids.update(uid for file_object in fo_list for uid in file_object.files_included)
+        ssdeep_hashes = self.database.get_ssdeep_hashes(list(uids))  # fetch all hashes at once
+        candidates = []
+        for parent_one, parent_two in combinations(fo_list, 2):
+            hashes_one = _get_hashes(exclusive_files[parent_one.uid], ssdeep_hashes)
+            hashes_two = _get_hashes(parent_two.files_included, ssdeep_hashes)
+            for file_one, file_two in get_candidate_pairs(hashes_one, hashes_two):
+                id_pair = (
+                    self._get_similar_file_id(file_one, parent_one.uid),
+                    self._get_similar_file_id(file_two, parent_two.uid),
+                )
+                candidates.append((id_pair, (hashes_one[file_one], hashes_two[file_two])))
+
         similar_files = []
         similarity = {}
-        for parent_one, parent_two in combinations(fo_list, 2):
-            for file_one in exclusive_files[parent_one.uid]:
-                for similar_file_pair, value in self._find_similar_file_for(file_one, parent_one.uid, parent_two):
-                    similar_files.append(similar_file_pair)
-                    similarity[convert_uid_list_to_compare_id(similar_file_pair)] = value
+        hash_pairs = [hash_pair for _, hash_pair in candidates]
+        for (id_pair, _), ssdeep_similarity in zip(candidates, self._compare_hashes(hash_pairs)):
+            if ssdeep_similarity > self.ssdeep_ignore_threshold:
+                similar_files.append(id_pair)
+                similarity[convert_uid_list_to_compare_id(id_pair)] = ssdeep_similarity
         similarity_sets = generate_similarity_sets(remove_duplicates_from_list(similar_files))
         return similarity_sets, similarity
 
-    def _find_similar_file_for(self, file_uid: str, parent_uid: str, comparison_fo: FileObject):
-        hash_one = self.database.get_ssdeep_hash(file_uid)
-        if hash_one:
-            id1 = self._get_similar_file_id(file_uid, parent_uid)
-            for potential_match in comparison_fo.files_included:
-                id2 = self._get_similar_file_id(potential_match, comparison_fo.uid)
-                hash_two = self.database.get_ssdeep_hash(potential_match)
-                ssdeep_similarity = ssdeep.compare(hash_one, hash_two)
-                if hash_two and ssdeep_similarity > self.ssdeep_ignore_threshold:
-                    yield (id1, id2), ssdeep_similarity
+    @staticmethod
+    def _compare_hashes(hash_pairs: list[tuple[str, str]]) -> list[int]:
+        processes = config.backend.ssdeep_comparison_processes
+        if len(hash_pairs) < PARALLEL_COMPARISON_THRESHOLD or processes <= 1:
+            return [ssdeep.compare(hash_one, hash_two) for hash_one, hash_two in hash_pairs]
+        with Pool(processes) as pool:
+            return pool.starmap(ssdeep.compare, hash_pairs, chunksize=COMPARISON_CHUNK_SIZE)
 
     def combine_similarity_results(self, similar_files: list[list[str]], fo_list: list[FileObject], similarity: dict):
         result_dict = {}
@@ -203,3 +224,52 @@ def generate_similarity_sets(list_of_pairs: list[tuple[str, str]]) -> list[list[
     for file1, file2 in list_of_pairs:
         graph.add_edge(file1, file2)
     return [sorted(c) for c in networkx.algorithms.clique.find_cliques(graph)]
+
+
+def _get_hashes(uid_list: list[str] | set[str], ssdeep_hashes: dict[str, str]) -> dict[str, str]:
+    return {uid: ssdeep_hashes[uid] for uid in uid_list if uid in ssdeep_hashes}
+
+
+def get_candidate_pairs(hashes_one: dict[str, str], hashes_two: dict[str, str]) -> list[tuple[str, str]]:
+    """
+    Find the pairs of files whose ssdeep hashes could be similar (i.e. ``ssdeep.compare`` could return a score > 0):
+    ssdeep only compares signatures with the same (or double) block size and only if they have a common substring
+    of length :py:data:`SSDEEP_ROLLING_WINDOW`. Identical hashes are always similar.
+
+    :param hashes_one: The ssdeep hashes of the first set of files (UID -> hash).
+    :param hashes_two: The ssdeep hashes of the second set of files (UID -> hash).
+    :return: A list of UID pairs (the first UID from `hashes_one`, the second from `hashes_two`).
+    """
+    index = {}
+    for uid, ssdeep_hash in hashes_two.items():
+        for key in get_ssdeep_comparison_keys(ssdeep_hash):
+            index.setdefault(key, []).append(uid)
+    candidates = []
+    for uid, ssdeep_hash in hashes_one.items():
+        matching_uids = {
+            matching_uid for key in get_ssdeep_comparison_keys(ssdeep_hash) for matching_uid in index.get(key, [])
+        }
+        candidates.extend((uid, matching_uid) for matching_uid in sorted(matching_uids))
+    return candidates
+
+
+def get_ssdeep_comparison_keys(ssdeep_hash: str) -> set[tuple]:
+    """
+    Get the keys of an ssdeep hash that are used to find potentially similar hashes: Two hashes can only be similar if
+    they share at least one key. A key is either a substring of one of the signatures together with its block size or
+    the complete hash.
+
+    :param ssdeep_hash: The ssdeep hash (``<block size>:<signature>:<signature with double block size>``).
+    :return: The set of keys (empty if the hash is invalid).
+    """
+    try:
+        block_size, signature, double_signature = ssdeep_hash.split(':', 2)
+        block_size = int(block_size)
+    except ValueError:
+        return set()
+    signature = SSDEEP_SEQUENCE_REGEX.sub(r'\1\1\1', signature)
+    double_signature = SSDEEP_SEQUENCE_REGEX.sub(r'\1\1\1', double_signature)
+    keys = {(block_size, signature, double_signature)}
+    for size, sig in [(block_size, signature), (block_size * 2, double_signature)]:
+        keys.update((size, sig[i : i + SSDEEP_ROLLING_WINDOW]) for i in range(len(sig) - SSDEEP_ROLLING_WINDOW + 1))
+    return keys
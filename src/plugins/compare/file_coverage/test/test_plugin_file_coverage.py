@@ -1,6 +1,11 @@
 import pytest
 
-from plugins.compare.file_coverage.code.file_coverage import ComparePlugin, generate_similarity_sets
+from plugins.compare.file_coverage.code.file_coverage import (
+    ComparePlugin,
+    generate_similarity_sets,
+    get_candidate_pairs,
+    get_ssdeep_comparison_keys,
+)
 from test.common_helper import CommonDatabaseMock
 from test.unit.compare.compare_plugin_test_class import ComparePluginTest
 
@@ -12,6 +17,9 @@ class DbMock:
     def get_ssdeep_hash(self, uid):
         return '42'
 
+    def get_ssdeep_hashes(self, uid_list):
+        return {uid: '42' for uid in uid_list}
+
     def get_vfp_of_included_text_files(self, root_uid, blacklist=None):
         if root_uid == '418a54d78550e8584291c96e5d6168133621f352bfc1d43cf84e81187fef4962_787':
             return {'/foo': {'uid_1'}, '/bar': {'uid_2', 'uid_3'}}
@@ -111,3 +119,29 @@ def test_get_similarity_value(similar_files, similarity_dict, expected_output):
 )
 def test_generate_similarity_sets(test_input, expected_output):
     assert generate_similarity_sets(test_input) == expected_output
+
+
+def test_get_ssdeep_comparison_keys():
+    keys = get_ssdeep_comparison_keys('3:abcdefgh:xaaaaaaay')
+    assert keys == {
+        (3, 'abcdefgh', 'xaaay'),  # sequences of more than 3 identical characters are shortened
+        (3, 'abcdefg'),
+        (3, 'bcdefgh'),
+    }, 'signatures shorter than 7 characters should have no substring keys'
+    assert get_ssdeep_comparison_keys('42') == set()
+
+
+def test_get_candidate_pairs():
+    hashes_one = {'a': '3:abcdefghij:klm', 'b': '6:qrstuvwxyz:zzzzzzzzz', 'c': '3:uvw:xyz'}
+    hashes_two = {
+        'same_block_size': '3:xxabcdefgxx:foo',
+        'double_block_size': '6:defghij:bar',
+        'half_block_size': '3:foo:zzzqrstuvw',
+        'other_block_size': '12:abcdefghij:qrstuvwxyz',
+        'identical': '3:uvw:xyz',
+    }
+    assert get_candidate_pairs(hashes_one, hashes_two) == [
+        ('a', 'same_block_size'),
+        ('b', 'half_block_size'),
+        ('c', 'identical'),
+    ]
@@ -2,19 +2,17 @@ import ctypes
 import io
 import logging
 import multiprocessing as mp
-import multiprocessing.connection
 import queue
 import signal
 import time
-import traceback
 import typing
 
-import psutil
 import pydantic
 from pydantic import BaseModel, ConfigDict
 
 import config
 from analysis.plugin import AnalysisPluginV0
+from helperFunctions.process import PersistentProcess, TaskExceptionError
 from objects.file import FileObject
 from statistic.analysis_stats import ANALYSIS_STATS_LIMIT
 from storage.fsorganizer import FSOrganizer
@@ -31,6 +29,8 @@ class PluginRunner:
     class Task(BaseModel):
         """Contains all information a :py:class:`PluginWorker` needs to analyze a file."""
 
+        #: The UID of the file that is analyzed
+        uid: str
         #: The virtual file path of the file object
         #: See :py:class:`FileObject`.
         virtual_file_path: typing.Dict
@@ -38,17 +38,30 @@ class PluginRunner:
         path: str
         #: A dictionary containing plugin names as keys and their analysis as value.
         dependencies: typing.Dict
-        #: The schedulers state associated with the file that is analyzed.
-        #: Here it is just the whole FileObject
-        # We need this because the scheduler is using multiple processes which
-        # communicate via multiprocessing.Queue's.
-        # Our implementation has no "master" process which contains all the
-        # state but rather the state is passed through the queues,
-        # even if a process (like PluginRunner) does not need all state (e.g.
-        # FileObject.scheduled_analysis)
-        scheduler_state: FileObject
+        #: The handle of the schedulers state associated with the file that is analyzed.
+        #: The state (the whole FileObject) is not passed through the queues but kept in the
+        #: :py:class:`~scheduler.analysis.task_store.TaskStateStore` of the scheduler.
+        handle: str
         model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    class Result(BaseModel):
+        """The result of a :py:class:`PluginRunner.Task` that workers put in the out_queue."""
+
+        #: The handle of the task (see :py:attr:`PluginRunner.Task.handle`)
+        handle: str
+        #: The analysis as returned by :py:func:`AnalysisPluginV0.get_analysis` if the analysis was successful
+        analysis: typing.Optional[typing.Dict] = None
+        #: A tuple ``(<plugin name>, <error message>)`` if the analysis failed
+        #: See :py:attr:`FileObject.analysis_exception`.
+        exception: typing.Optional[typing.Tuple[str, str]] = None
+
+        def write_to_file_object(self, file_object: FileObject, plugin_name: str):
+            """Sets the fields of ``file_object`` that correspond to this result."""
+            if self.analysis is not None:
+                file_object.processed_analysis[plugin_name] = self.analysis
+            elif self.exception is not None:
+                file_object.analysis_exception = self.exception
+
     def __init__(
         self,
         plugin: AnalysisPluginV0,
@@ -60,7 +73,7 @@ class PluginRunner:
         self._schemata = schemata
 
         self._in_queue: mp.Queue = mp.Queue()
-        #: Workers put the ``Task.scheduler_state`` and the finished analysis in the out_queue
+        #: Workers put a :py:class:`PluginRunner.Result` for each finished task in the out_queue
         self.out_queue: mp.Queue = mp.Queue()
 
         self.stats = mp.Array(ctypes.c_float, ANALYSIS_STATS_LIMIT)
@@ -102,9 +115,12 @@ class PluginRunner:
                 continue
             worker.terminate()
 
-    def queue_analysis(self, file_object: FileObject):
+    def queue_analysis(self, file_object: FileObject, handle: str):
         """Queues the analysis of ``file_object`` with ``self._plugin``.
         The caller of this method has to ensure that the dependencies are fulfilled.
+
+        :param file_object: The file object that shall be analyzed.
+        :param handle: The handle of the file object in the task state store of the scheduler.
         """
         dependencies = {}
         for dependency in self._plugin.metadata.dependencies:
@@ -116,10 +132,11 @@ class PluginRunner:
         logging.debug(f'Queueing analysis for {file_object.uid}')
         self._in_queue.put(
             PluginRunner.Task(
+                uid=file_object.uid,
                 virtual_file_path=file_object.virtual_file_path,
                 path=self._fsorganizer.generate_path(file_object),
                 dependencies=dependencies,
-                scheduler_state=file_object,
+                handle=handle,
             )
         )
 
@@ -135,9 +152,6 @@ class Worker(mp.Process):
         def __init__(self, timeout: float):
             self.timeout = timeout
 
-    class CrashedError(Exception):
-        pass
-
     class Config(BaseModel):
         """A class containing all parameters of the worker"""
 
@@ -172,31 +186,24 @@ class Worker(mp.Process):
     def is_working(self):
         return self._is_working.value != 0
 
-    def run(self):  # noqa: C901, PLR0912, PLR0915
+    def run(self):  # noqa: C901, PLR0915
         run = True
-        result = None
-        recv_conn, send_conn = mp.Pipe(duplex=False)
-
-        child_process = None
+        # The analysis runs in a separate process so that it can be killed if it exceeds the timeout.
+        # The process is reused for all tasks and is only restarted after a timeout or a crash.
+        analysis_process = PersistentProcess(self._analyze, name=f'{self._plugin.metadata.name} analysis')
 
         def _handle_sigterm(signum, frame):
             del signum, frame
             logging.info(f'{self} received SIGTERM. Shutting down.')
             nonlocal run
-            nonlocal result
             run = False
 
-            if child_process is None:
-                return
-
-            if not child_process.is_alive():
+            if not self.is_working():
                 return
 
-            if not recv_conn.poll(Worker.SIGTERM_TIMEOUT):
+            if not analysis_process.poll(Worker.SIGTERM_TIMEOUT):
                 raise Worker.TimeoutError(Worker.SIGTERM_TIMEOUT)
 
-            result = recv_conn.recv()
-
         signal.signal(signal.SIGTERM, _handle_sigterm)
 
         while run:
@@ -206,7 +213,7 @@ class Worker(mp.Process):
             except queue.Empty:
                 continue
 
-            analysis_description = f'{self._plugin.metadata.name} analysis on {task.scheduler_state.uid}'
+            analysis_description = f'{self._plugin.metadata.name} analysis on {task.uid}'
 
             entry = {}
             try:
@@ -214,19 +221,7 @@ class Worker(mp.Process):
                 logging.debug(f'{self}: Beginning {analysis_description}')
                 start_time = time.time()
 
-                child_process = mp.Process(
-                    target=self._child_entrypoint,
-                    args=(self._plugin, task, send_conn),
-                )
-                child_process.start()
-                # If process crashes without an exception (e.g. SEGFAULT) we will report a timeout
-                if not recv_conn.poll(self._worker_config.timeout):
-                    raise Worker.TimeoutError(self._worker_config.timeout)
-
-                result = recv_conn.recv()
-
-                if isinstance(result, str):
-                    raise AnalysisExceptionError(result)
+                result = analysis_process.run_task(task, timeout=self._worker_config.timeout)
 
                 duration = time.time() - start_time
 
@@ -235,54 +230,34 @@ class Worker(mp.Process):
                 if duration > 120:  # noqa: PLR2004
                     logging.info(f'{analysis_description} is slow: took {duration:.1f} seconds')
                 self._update_duration_stats(duration)
+            except TimeoutError:
+                logging.warning(f'{analysis_description} timed out after {self._worker_config.timeout} seconds.')
+                entry['exception'] = (self._plugin.metadata.name, 'Analysis timed out')
             except Worker.TimeoutError as err:
-                logging.warning(f'{analysis_description} timed out after {err.timeout} seconds.')
-                entry['timeout'] = (self._plugin.metadata.name, 'Analysis timed out')
-            except Worker.CrashedError:
+                logging.warning(f'{analysis_description} did not finish {err.timeout} seconds after SIGTERM.')
+                entry['exception'] = (self._plugin.metadata.name, 'Analysis timed out')
+                analysis_process.kill()
+            except ChildProcessError:
                 logging.warning(f'{analysis_description} crashed.')
                 entry['exception'] = (self._plugin.metadata.name, 'Analysis crashed')
-            except AnalysisExceptionError as exc:
-                logging.error(f'{self} got an exception during {analysis_description}: {exc}')
+            except TaskExceptionError as exc:
+                logging.error(f'{self} got an exception during {analysis_description}: {exc.trace}')
                 entry['exception'] = (self._plugin.metadata.name, 'Exception occurred during analysis')
             except Exception as error:
                 logging.exception(f'An unexpected exception occurred during {analysis_description}: {error}')
                 entry['exception'] = (self._plugin.metadata.name, 'An unexpected exception occurred')
+                analysis_process.kill()
             finally:
-                # Don't kill another process if it uses the same PID as our dead worker
-                if child_process.is_alive():
-                    child = psutil.Process(pid=child_process.pid)
-                    for grandchild in child.children(recursive=True):
-                        grandchild.kill()
-                    child.kill()
                 self._is_working.value = 0
 
-            fw = task.scheduler_state
-            self._write_result_in_file_object(entry, fw)
-            self._out_queue.put(fw)
+            self._out_queue.put(PluginRunner.Result(handle=task.handle, **entry))
 
-    def _write_result_in_file_object(self, entry: dict, file_object: FileObject):
-        """Takes a file_object and an entry as it is returned by :py:func:`Worker.run`
-        and returns a FileObject with the corresponding fileds set.
-        """
-        if 'analysis' in entry:
-            file_object.processed_analysis[self._plugin.metadata.name] = entry['analysis']
-        elif 'timeout' in entry:
-            file_object.analysis_exception = entry['timeout']
-        elif 'exception' in entry:
-            file_object.analysis_exception = entry['exception']
-
-    @staticmethod
-    def _child_entrypoint(plugin: AnalysisPluginV0, task: PluginRunner.Task, conn: mp.connection.Connection):
-        """Processes a single task then returns.
-        The result is written to ``conn``.
-        Exceptions and formatted tracebacks are also written to ``conn``.
-        """
-        try:
-            result = plugin.get_analysis(io.FileIO(task.path), task.virtual_file_path, task.dependencies)
-        except Exception as exc:
-            result = f'{exc}: {traceback.format_exc()}'
+        analysis_process.stop(timeout=Worker.SIGTERM_TIMEOUT)
 
-        conn.send(result)
+    def _analyze(self, task: PluginRunner.Task) -> dict:
+        """Processes a single task in the analysis process and returns the result."""
+        with io.FileIO(task.path) as file_handle:
+            return self._plugin.get_analysis(file_handle, task.virtual_file_path, task.dependencies)
 
     def _update_duration_stats(self, duration):
         with self._stats.get_lock():
@@ -293,7 +268,3 @@ class Worker(mp.Process):
             self._stats_idx.value = 0
         if self._stats_count.value < ANALYSIS_STATS_LIMIT:
             self._stats_count.value += 1
-
-
-class AnalysisExceptionError(Exception):
-    pass
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import logging
+from math import inf
+from multiprocessing import Array
+from time import time
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+AnalysisResult = Tuple[str, str, dict]  # (uid, plugin, analysis_dict)
+
+
+class AnalysisResultBuffer:
+    """
+    A write-behind buffer for analysis results. Instead of storing each result in the database as soon as it arrives,
+    results are accumulated and stored in batches. A batch is stored when ``batch_size`` results are buffered or when
+    the oldest buffered result is older than ``max_delay`` seconds. If there are multiple results for the same file
+    and plugin in the buffer, only the newest one is stored.
+
+    Every process has its own copy of the buffer. Processes that add results must therefore call
+    :py:func:`flush_if_due` regularly and :py:func:`flush` before they stop. To find out if the results of other
+    processes are already stored (see :py:func:`results_are_stored`), the time of the oldest result in the buffer is
+    shared between the processes: each process must call :py:func:`register_process` with its own index first.
+
+    :param store_function: A function that stores a list of ``(uid, plugin, analysis_dict)`` tuples.
+    :param batch_size: The maximum number of results that are buffered before they are stored.
+    :param max_delay: The maximum time in seconds a result is buffered before it is stored.
+    :param process_count: The number of processes that add results to the buffer.
+    """
+
+    def __init__(
+        self,
+        store_function: Callable[[list[AnalysisResult]], None],
+        batch_size: int,
+        max_delay: float,
+        process_count: int = 0,
+    ):
+        self._store_function = store_function
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._results: dict[tuple[str, str], dict] = {}
+        self._oldest_result_time: float | None = None
+        self._shared_oldest_result_times = Array('d', [inf] * process_count)
+        self._process_index: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def register_process(self, index: int):
+        self._process_index = index
+
+    def add(self, uid: str, plugin: str, analysis_dict: dict):
+        if not self._results:
+            self._set_oldest_result_time(time())
+        self._results[(uid, plugin)] = analysis_dict
+        if len(self._results) >= self._batch_size:
+            self.flush()
+
+    def get(self, uid: str, plugin: str) -> dict | None:
+        """
+        Get a result from the buffer of this process (or ``None`` if it is not in the buffer).
+        """
+        return self._results.get((uid, plugin))
+
+    def results_are_stored(self, timestamp: float) -> bool:
+        """
+        Check if all results that were added to the buffer (of any process) until `timestamp` are stored.
+        """
+        if self._oldest_result_time is not None and self._oldest_result_time <= timestamp:
+            return False
+        return all(oldest_result_time > timestamp for oldest_result_time in self._shared_oldest_result_times)
+
+    def flush_if_due(self):
+        if self._results and time() - self._oldest_result_time >= self._max_delay:
+            self.flush()
+
+    def flush(self):
+        if not self._results:
+            return
+        batch = [(uid, plugin, analysis_dict) for (uid, plugin), analysis_dict in self._results.items()]
+        self._results = {}
+        logging.debug(f'Storing batch of {len(batch)} analysis results')
+        try:
+            self._store_function(batch)
+        finally:
+            # the results are only marked as stored afterwards (if storing fails, they are lost in any case)
+            self._set_oldest_result_time(None)
+
+    def _set_oldest_result_time(self, oldest_result_time: float | None):
+        self._oldest_result_time = oldest_result_time
+        if self._process_index is not None:
+            self._shared_oldest_result_times[self._process_index] = (
+                oldest_result_time if oldest_result_time is not None else inf
+            )
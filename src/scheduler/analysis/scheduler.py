@@ -4,9 +4,10 @@ import logging
 import os
 import time
 from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from multiprocessing import Lock, Queue, Value
+from multiprocessing.connection import wait
 from queue import Empty
-from time import sleep
 
 from packaging.version import InvalidVersion
 from packaging.version import parse as parse_version
@@ -21,11 +22,14 @@ from helperFunctions.process import ExceptionSafeProcess, check_worker_exception
 from scheduler.analysis_status import AnalysisStatus
 from scheduler.task_scheduler import MANDATORY_PLUGINS, AnalysisTaskScheduler
 from statistic.analysis_stats import get_plugin_stats
+from statistic.update import update_firmware_stats
 from storage.db_interface_backend import BackendDbInterface
 from storage.fsorganizer import FSOrganizer
 from pathlib import Path
 
 from .plugin import PluginRunner, Worker
+from .result_buffer import AnalysisResultBuffer
+from .task_store import TaskStateStore
 from storage.db_interface_view_sync import ViewUpdater
 from typing import TYPE_CHECKING, Optional
 
@@ -34,6 +38,15 @@ if TYPE_CHECKING:
     from objects.file import FileObject
     from collections.abc import Callable
 
+#: Key in ``FileObject.temporary_data`` under which the metadata of the analyses in the DB is cached
+ANALYSIS_METADATA_KEY = 'analysis_metadata'
+#: Key in ``FileObject.temporary_data`` under which the task state store handle is passed to legacy plugins
+TASK_HANDLE_KEY = 'task_handle'
+#: Key in ``FileObject.temporary_data`` under which the time when the last result was added to the buffer is stored
+LAST_RESULT_TIME_KEY = 'last_result_time'
+#: Time in seconds that the scheduling and collector processes get for storing the buffered results during shutdown
+RESULT_FLUSH_TIMEOUT = 30
+
 
 class AnalysisScheduler:
     """
@@ -89,8 +102,18 @@ class AnalysisScheduler:
 
     Running the analysis tasks is achieved through (multiprocessing.Queue)s. Each plugin has an in-queue, triggered
     by the scheduler using the `add_job` function, and an out-queue that is processed by the result collector. The
+    result collector waits on all out-queues at once and wakes up as soon as a result is available. It sends the
+    result back to the scheduling worker that started the task, which handles it. The
     actual analysis process is out of scope. Database interaction happens before (pre_analysis) and after
     (post_analysis) the running of a task, to store intermediate results for live updates, and final results.
+    By default, results are not stored one by one but collected in a write-behind buffer and stored in batches (see
+    :py:class:`~scheduler.analysis.result_buffer.AnalysisResultBuffer`). An object is only marked as completed when all
+    its results are stored.
+
+    While a file object is analyzed by a plugin, it is kept in the
+    :py:class:`~scheduler.analysis.task_store.TaskStateStore` of the scheduling worker. Only a handle and the data that
+    the plugin needs (e.g. the results of its dependencies) are passed through the queues of the plugin. Only the
+    result of the plugin is sent back to the worker, which uses the handle to retrieve the file object from its store.
 
     :param pre_analysis: A database callback to execute before running an analysis task.
     :param post_analysis: A database callback to execute after running an analysis task.
@@ -113,14 +136,26 @@ class AnalysisScheduler:
         self.unpacking_locks = unpacking_locks
         self.scheduling_lock = Lock()
 
-        self.status = AnalysisStatus()
+        # the architecture stats of a firmware are stored when its analysis is completed (see statistic.update)
+        self.status = AnalysisStatus(on_firmware_completed=update_firmware_stats)
         self.task_scheduler = AnalysisTaskScheduler(self.analysis_plugins)
         self.schedule_processes = []
         self.result_collector_processes = []
 
         self.fs_organizer = FSOrganizer()
+        self._task_store = TaskStateStore()
+        # the collected results are sent back to the scheduling worker that owns the file object (one queue per worker)
+        self._result_queues = [Queue() for _ in range(config.backend.scheduling_worker_count)]
         self.db_backend_service = db_interface if db_interface else BackendDbInterface()
-        self.post_analysis = post_analysis if post_analysis else self.db_backend_service.add_analysis
+        self._result_buffer = AnalysisResultBuffer(
+            store_function=self._store_analysis_results,
+            batch_size=config.backend.collector_batch_size,
+            max_delay=config.backend.collector_max_delay,
+            process_count=config.backend.scheduling_worker_count,
+        )
+        # objects whose analysis is complete but whose results are not stored yet (per process)
+        self._pending_completions: list[FileObject] = []
+        self.post_analysis = post_analysis if post_analysis else self._result_buffer.add
 
     def start(self):
         self.status.start()
@@ -139,7 +174,8 @@ class AnalysisScheduler:
         self.stop_condition.value = 1
         futures = []
         # first shut down scheduling, then analysis plugins and lastly the result collector
-        stop_processes(self.schedule_processes, config.backend.block_delay + 1)
+        # the processes store their buffered results before they stop
+        stop_processes(self.schedule_processes, config.backend.block_delay + RESULT_FLUSH_TIMEOUT)
 
         for runner in self._plugin_runners.values():
             runner.shutdown()
@@ -157,6 +193,8 @@ class AnalysisScheduler:
                 future.result()  # call result to make sure all threads are finished and there are no exceptions
         stop_processes(self.result_collector_processes, config.backend.block_delay + 1)
         self.process_queue.close()
+        for result_queue in self._result_queues:
+            result_queue.close()
         self.status.shutdown()
         logging.info('Analysis scheduler offline')
 
@@ -171,11 +209,15 @@ class AnalysisScheduler:
         self.db_backend_service.update_object(fo)  # metadata of FW could have changed -> update in DB
         self.unpacking_locks.release_unpacking_lock(fo.uid)
         self.status.add_update(fo, included_files)
+        # load the metadata needed for deciding if analyses can be skipped for all files at once
+        analysis_metadata = self.db_backend_service.get_analysis_metadata_for_uid_list([fo.uid, *included_files])
         for child_fo in self.db_backend_service.get_objects_by_uid_list(included_files):
             child_fo.root_uid = fo.uid  # set correct root_uid so that "current analysis stats" work correctly
             child_fo.force_update = getattr(fo, 'force_update', False)  # propagate forced update to children
+            child_fo.temporary_data[ANALYSIS_METADATA_KEY] = analysis_metadata.get(child_fo.uid, {})
             self.task_scheduler.schedule_analysis_tasks(child_fo, fo.scheduled_analysis)
             self._check_further_process_or_complete(child_fo)
+        fo.temporary_data[ANALYSIS_METADATA_KEY] = analysis_metadata.get(fo.uid, {})
         self._check_further_process_or_complete(fo)
 
     def start_analysis_of_object(self, fo: FileObject):
@@ -323,13 +365,27 @@ class AnalysisScheduler:
 
     def _task_runner(self, index: int = 0):
         logging.debug(f'Started analysis scheduling worker {index} (pid={os.getpid()})')
-        while self.stop_condition.value == 0:
-            try:
-                task = self.process_queue.get(timeout=config.backend.block_delay)
-            except Empty:
-                pass
-            else:
-                self._process_next_analysis_task(task)
+        self._result_buffer.register_process(index)
+        self._task_store.register_process(index)
+        result_queue = self._result_queues[index]
+        try:
+            while self.stop_condition.value == 0:
+                # wait for new tasks and for the results of the tasks that this worker started at the same time
+                ready = wait([self.process_queue._reader, result_queue._reader], timeout=config.backend.block_delay)
+                if result_queue._reader in ready:
+                    self._handle_returned_results(result_queue)
+                if self.process_queue._reader in ready:
+                    try:
+                        task = self.process_queue.get_nowait()
+                    except (Empty, ValueError):
+                        pass  # another worker was faster or the queue was closed in the meantime
+                    else:
+                        self._process_next_analysis_task(task)
+                self._result_buffer.flush_if_due()
+                self._complete_pending_analyses()
+        finally:
+            self._result_buffer.flush()
+            self._task_store.shutdown()
         logging.debug(f'Stopped analysis scheduling worker {index}')
 
     def _process_next_analysis_task(self, fw_object: FileObject):
@@ -343,7 +399,7 @@ class AnalysisScheduler:
 
     def _start_or_skip_analysis(self, analysis_to_do: str, file_object: FileObject):
         if not self._is_forced_update(file_object) and self._analysis_is_already_in_db_and_up_to_date(
-            analysis_to_do, file_object.uid
+            analysis_to_do, file_object
         ):
             logging.debug(f'Skipping analysis "{analysis_to_do}" for {file_object.uid} (analysis already in DB)')
             if analysis_to_do in self.task_scheduler.get_cumulative_remaining_dependencies(
@@ -356,14 +412,12 @@ class AnalysisScheduler:
             analysis_to_do, file_object
         ):
             logging.debug(f'Skipping analysis "{analysis_to_do}" for {file_object.uid} (blacklisted file type)')
-            analysis_result = self._get_skipped_analysis_result(analysis_to_do)
-            file_object.processed_analysis[analysis_to_do] = analysis_result
+            file_object.processed_analysis[analysis_to_do] = self._get_skipped_analysis_result(analysis_to_do)
             self.status.add_analysis(file_object, analysis_to_do)
-            self.post_analysis(file_object.uid, analysis_to_do, analysis_result)
+            self._add_analysis_result(file_object, analysis_to_do)
             self._check_further_process_or_complete(file_object)
         else:
-            if file_object.binary is None:
-                self._set_binary(file_object)
+            self._unload_binary(file_object)
             plugin = self.analysis_plugins[analysis_to_do]
             if isinstance(plugin, AnalysisPluginV0):
                 runner = self._plugin_runners[plugin.metadata.name]
@@ -373,15 +427,32 @@ class AnalysisScheduler:
                     self._check_further_process_or_complete(file_object)
                     return
 
-                runner.queue_analysis(file_object)
+                runner.queue_analysis(file_object, self._task_store.put(file_object))
             elif isinstance(plugin, AnalysisBasePlugin):
-                plugin.add_job(file_object)
+                plugin.add_job(self._create_legacy_plugin_task(file_object, plugin))
+
+    def _create_legacy_plugin_task(self, file_object: FileObject, plugin: AnalysisBasePlugin) -> FileObject:
+        """
+        Legacy plugins expect a file object as input. Instead of the complete file object, they get a copy that only
+        contains the analysis results they depend on. The complete file object is kept in the task store. The binary
+        is not part of the copy: it is only read from the file storage if the plugin accesses it (see
+        :py:func:`~objects.file.FileObject.open_binary` for access without copying the file into memory).
+        """
+        task = copy(file_object)
+        task.processed_analysis = {
+            plugin_name: analysis
+            for plugin_name, analysis in file_object.processed_analysis.items()
+            if plugin_name in plugin.DEPENDENCIES or plugin_name in MANDATORY_PLUGINS
+        }
+        task.temporary_data = {TASK_HANDLE_KEY: self._task_store.put(file_object)}
+        return task
 
-    def _set_binary(self, file_object: FileObject):
-        # the file_object.binary may be missing in case of an update
+    def _unload_binary(self, file_object: FileObject):
+        # plugins can access the file on the disk, so there is no need to keep (and pass on) the binary
+        # the file_object.file_path may be missing in case of an update
         if file_object.file_path is None:
             file_object.file_path = self.fs_organizer.generate_path(file_object)
-        file_object.create_binary_from_path()
+        file_object.unload_binary(file_object.file_path)
 
     # ---- 1. Is forced update ----
 
@@ -394,16 +465,30 @@ class AnalysisScheduler:
 
     # ---- 2. Analysis present and plugin version unchanged ----
 
-    def _analysis_is_already_in_db_and_up_to_date(self, analysis_to_do: str, uid: str) -> bool:
-        db_entry = self.db_backend_service.get_analysis(uid, analysis_to_do)
-        if db_entry is None or 'failed' in db_entry['result']:
+    def _get_analysis_metadata(self, file_object: FileObject) -> dict[str, dict]:
+        """
+        Get the metadata (versions, analysis date and failed flag) of all analyses of `file_object` that are stored in
+        the DB. The metadata is loaded once per file and then cached in the file object. It is kept up to date when
+        new results are collected. This way, the decision whether an analysis can be skipped does not need to fetch
+        complete analysis results from the DB.
+        """
+        if ANALYSIS_METADATA_KEY not in file_object.temporary_data:
+            metadata = self.db_backend_service.get_analysis_metadata_for_uid_list([file_object.uid])
+            file_object.temporary_data[ANALYSIS_METADATA_KEY] = metadata.get(file_object.uid, {})
+        return file_object.temporary_data[ANALYSIS_METADATA_KEY]
+
+    def _analysis_is_already_in_db_and_up_to_date(self, analysis_to_do: str, file_object: FileObject) -> bool:
+        db_entry = self._get_analysis_metadata(file_object).get(analysis_to_do)
+        if db_entry is None or db_entry['failed']:
             return False
         if db_entry['plugin_version'] is None:
-            logging.error(f'Plugin Version missing: UID: {uid}, Plugin: {analysis_to_do}')
+            logging.error(f'Plugin Version missing: UID: {file_object.uid}, Plugin: {analysis_to_do}')
             return False
-        return self._analysis_is_up_to_date(db_entry, self.analysis_plugins[analysis_to_do], uid)
+        return self._analysis_is_up_to_date(db_entry, self.analysis_plugins[analysis_to_do], file_object)
 
-    def _analysis_is_up_to_date(self, db_entry: dict, analysis_plugin: AnalysisBasePlugin, uid: str) -> bool:
+    def _analysis_is_up_to_date(
+        self, db_entry: dict, analysis_plugin: AnalysisBasePlugin, file_object: FileObject
+    ) -> bool:
         try:
             current_system_version = analysis_plugin.SYSTEM_VERSION
         except AttributeError:
@@ -419,7 +504,7 @@ class AnalysisScheduler:
             logging.exception(f'Error while parsing plugin version: {error}')
             return False
 
-        return self._dependencies_are_up_to_date(db_entry, analysis_plugin, uid)
+        return self._dependencies_are_up_to_date(db_entry, analysis_plugin, file_object)
 
     @staticmethod
     def _current_version_is_newer(
@@ -431,20 +516,28 @@ class AnalysisScheduler:
         )
         return plugin_version_is_newer or system_version_is_newer
 
-    def _dependencies_are_up_to_date(self, db_entry: dict, analysis_plugin: AnalysisBasePlugin, uid: str) -> bool:
+    def _dependencies_are_up_to_date(
+        self, db_entry: dict, analysis_plugin: AnalysisBasePlugin, file_object: FileObject
+    ) -> bool:
         """
         If there is dependency result that is newer than this analysis, it may be different from the dependency result
         that was the basis of this analysis, and therefore this analysis should run again.
         """
+        analysis_metadata = self._get_analysis_metadata(file_object)
         for dependency in analysis_plugin.DEPENDENCIES:
-            dependency_entry = self.db_backend_service.get_analysis(uid, dependency)
+            dependency_entry = analysis_metadata.get(dependency)
             if dependency_entry is None or db_entry['analysis_date'] < dependency_entry['analysis_date']:
                 return False
         return True
 
     def _add_completed_analysis_results_to_file_object(self, analysis_to_do: str, fw_object: FileObject):
-        db_entry = self.db_backend_service.get_analysis(fw_object.uid, analysis_to_do)
-        fw_object.processed_analysis[analysis_to_do] = db_entry
+        # results of the current analysis are in the file object (and may not be stored yet)
+        if analysis_to_do in fw_object.processed_analysis:
+            return
+        analysis = self._result_buffer.get(fw_object.uid, analysis_to_do)
+        if analysis is None:
+            analysis = self.db_backend_service.get_analysis(fw_object.uid, analysis_to_do)
+        fw_object.processed_analysis[analysis_to_do] = analysis
 
     # ---- 3. blacklist and whitelist ----
 
@@ -513,43 +606,126 @@ class AnalysisScheduler:
             process.start()
 
     def _result_collector(self, index: int = 0):
-        # Collects the results form plugins and writes them in FileObject.processed_analysis
+        # Collects the results form plugins and sends them back to the scheduling worker that started the task
         logging.debug(f'Started analysis result collector worker {index} (pid={os.getpid()})')
+        out_queues = self._get_plugin_out_queues()
+        # map the read end of each out queue to the plugin it belongs to so that we can wait on all of them at once
+        readers = {out_queue._reader: (plugin_name, out_queue) for plugin_name, out_queue in out_queues.items()}
         while self.stop_condition.value == 0:
-            nop = True
-            for plugin_name, plugin in self.analysis_plugins.items():
-                if isinstance(plugin, AnalysisPluginV0):
-                    runner = self._plugin_runners[plugin.metadata.name]
-                    out_queue = runner.out_queue
-                elif isinstance(plugin, AnalysisBasePlugin):
-                    out_queue = plugin.out_queue
-
+            # the timeout is only needed to regularly check the stop condition: the collector wakes up as soon as a
+            # result is available in any of the queues
+            for reader in wait(list(readers), timeout=config.backend.block_delay):
+                plugin_name, out_queue = readers[reader]
                 try:
-                    fw = out_queue.get_nowait()
+                    result = out_queue.get_nowait()
                 except (Empty, ValueError):
-                    pass
-                else:
-                    nop = False
-                    self._handle_collected_result(fw, plugin_name)
-            if nop:
-                sleep(config.backend.block_delay)
+                    continue  # another collector was faster or the queue was closed in the meantime
+                self._return_result(result, plugin_name)
+        for result_queue in self._result_queues:
+            # the scheduling workers are already stopped -> do not wait for the results to be sent on exit
+            result_queue.cancel_join_thread()
         logging.debug(f'Stopped analysis result collector worker {index}')
 
+    def _get_plugin_out_queues(self) -> dict[str, Queue]:
+        out_queues = {}
+        for plugin_name, plugin in self.analysis_plugins.items():
+            if isinstance(plugin, AnalysisPluginV0):
+                out_queues[plugin_name] = self._plugin_runners[plugin.metadata.name].out_queue
+            elif isinstance(plugin, AnalysisBasePlugin):
+                out_queues[plugin_name] = plugin.out_queue
+        return out_queues
+
+    def _return_result(self, result: PluginRunner.Result | FileObject, plugin_name: str):
+        """
+        Send the result of a finished task back to the scheduling worker that owns the file object.
+
+        :param result: A ``PluginRunner.Result`` (for V0 plugins) or the file object that was returned by a legacy
+            plugin (see :py:func:`_create_legacy_plugin_task`). Of the latter, only the result of the plugin and the
+            exception are sent.
+        :param plugin_name: The name of the plugin that produced the result.
+        """
+        if isinstance(result, PluginRunner.Result):
+            handle = result.handle
+        else:
+            handle = result.temporary_data[TASK_HANDLE_KEY]
+            result = (result.processed_analysis.get(plugin_name), result.analysis_exception)
+        self._result_queues[TaskStateStore.get_owner(handle)].put((handle, plugin_name, result))
+
+    def _handle_returned_results(self, result_queue: Queue):
+        while True:
+            try:
+                handle, plugin_name, result = result_queue.get_nowait()
+            except (Empty, ValueError):
+                return
+            self._handle_collected_result(self._restore_file_object(handle, plugin_name, result), plugin_name)
+
+    def _restore_file_object(
+        self, handle: str, plugin_name: str, result: PluginRunner.Result | tuple[dict | None, tuple | None]
+    ) -> FileObject:
+        """
+        Get the file object of a finished task from the task store and add the result of the plugin.
+
+        :param handle: The handle of the file object in the task store.
+        :param plugin_name: The name of the plugin that produced the result.
+        :param result: A ``PluginRunner.Result`` or the result and the exception of a legacy plugin (see
+            :py:func:`_return_result`).
+        :return: The complete file object including the result of the plugin.
+        """
+        file_object = self._task_store.pop(handle)
+        if isinstance(result, PluginRunner.Result):
+            result.write_to_file_object(file_object, plugin_name)
+            return file_object
+        analysis, file_object.analysis_exception = result
+        if analysis is not None:
+            file_object.processed_analysis[plugin_name] = analysis
+        return file_object
+
     def _handle_collected_result(self, fo: FileObject, plugin_name: str):
         if plugin_name in fo.processed_analysis:
             if fo.analysis_exception:
                 self.task_scheduler.reschedule_failed_analysis_task(fo)
             self.status.add_analysis(fo, plugin_name)
-            self.post_analysis(fo.uid, plugin_name, fo.processed_analysis[plugin_name])
+            self._add_analysis_result(fo, plugin_name)
         self._check_further_process_or_complete(fo)
 
+    def _add_analysis_result(self, fo: FileObject, plugin_name: str):
+        self.post_analysis(fo.uid, plugin_name, fo.processed_analysis[plugin_name])
+        fo.temporary_data[LAST_RESULT_TIME_KEY] = time.time()
+        _update_analysis_metadata(fo, plugin_name)
+
+    def _store_analysis_results(self, results: list[tuple[str, str, dict]]):
+        self.db_backend_service.add_analyses(results)
+
     def _check_further_process_or_complete(self, fw_object):
         if not fw_object.scheduled_analysis:
-            logging.info(f'Analysis Completed: {fw_object.uid}')
-            self.status.remove_object(fw_object)
+            self._complete_analysis(fw_object)
         else:
             self.process_queue.put(fw_object)
 
+    def _complete_analysis(self, fw_object: FileObject):
+        """
+        Mark the analysis of the object as completed. This must not happen before all results of the object are stored.
+        Results that are still in the buffer of this process are stored right away. If results are still in the buffers
+        of other processes, the object is completed later (see :py:func:`_complete_pending_analyses`).
+        """
+        last_result_time = fw_object.temporary_data.get(LAST_RESULT_TIME_KEY)
+        if last_result_time is not None and not self._result_buffer.results_are_stored(last_result_time):
+            self._result_buffer.flush()
+            if not self._result_buffer.results_are_stored(last_result_time):
+                self._pending_completions.append(fw_object)
+                return
+        logging.info(f'Analysis Completed: {fw_object.uid}')
+        self.status.remove_object(fw_object)
+
+    def _complete_pending_analyses(self):
+        pending_completions, self._pending_completions = self._pending_completions, []
+        for fw_object in pending_completions:
+            if self._result_buffer.results_are_stored(fw_object.temporary_data[LAST_RESULT_TIME_KEY]):
+                logging.info(f'Analysis Completed: {fw_object.uid}')
+                self.status.remove_object(fw_object)
+            else:
+                self._pending_completions.append(fw_object)
+
     # ---- miscellaneous functions ----
 
     def get_combined_analysis_workload(self):
@@ -624,6 +800,19 @@ def _fix_system_version(system_version: str | None) -> str:
     return system_version.replace('_', '-') if system_version else '0'
 
 
+def _update_analysis_metadata(file_object: FileObject, plugin: str):
+    # keep the cached analysis metadata in sync with the new result that is stored in the DB
+    if ANALYSIS_METADATA_KEY not in file_object.temporary_data:
+        return
+    analysis_result = file_object.processed_analysis[plugin]
+    file_object.temporary_data[ANALYSIS_METADATA_KEY][plugin] = {
+        'plugin_version': analysis_result.get('plugin_version'),
+        'system_version': analysis_result.get('system_version'),
+        'analysis_date': analysis_result.get('analysis_date'),
+        'failed': 'failed' in (analysis_result.get('result') or {}),
+    }
+
+
 def _dependencies_are_unfulfilled(plugin: AnalysisPluginV0, fw_object: FileObject):
     # FIXME plugins can be in processed_analysis and could still be skipped, etc. -> need a way to verify that
     # FIXME the analysis ran successfully
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+if TYPE_CHECKING:
+    from objects.file import FileObject
+
+
+class TaskStateStore:
+    """
+    Holds the scheduler state (i.e. the :py:class:`~objects.file.FileObject`) of files while they are analyzed by a
+    plugin. Instead of passing the whole file object with all its analysis results through the queues of the plugins
+    and back, the scheduler puts the file object in this store and only passes a small handle along with the data the
+    plugin actually needs. When the result is collected, the file object is taken out of the store again using the
+    handle.
+
+    The file objects never leave the process that put them in the store: every scheduling worker process has its own
+    store. The handle contains the index of the process that owns the file object (see :py:func:`get_owner`), so that
+    the result of the plugin can be sent back to this process.
+    """
+
+    def __init__(self):
+        self._state: dict[str, FileObject] = {}
+        self._owner = 0
+
+    def register_process(self, index: int):
+        """
+        Set the index of the process that uses the store (it is part of the handles).
+        """
+        self._owner = index
+
+    def shutdown(self):
+        if len(self._state) > 0:
+            logging.warning(f'Shutting down task state store with {len(self._state)} unfinished tasks')
+        self._state.clear()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def put(self, file_object: FileObject) -> str:
+        """
+        Store the state of `file_object`.
+
+        :param file_object: The file object that is about to be analyzed.
+        :return: The handle that can be used to retrieve the file object again.
+        """
+        handle = f'{self._owner}:{file_object.uid}:{uuid4().hex}'
+        self._state[handle] = file_object
+        return handle
+
+    def pop(self, handle: str) -> FileObject:
+        """
+        Retrieve the state for `handle` and remove it from the store.
+
+        :param handle: The handle returned by :py:func:`put`.
+        :return: The stored file object.
+        """
+        return self._state.pop(handle)
+
+    @staticmethod
+    def get_owner(handle: str) -> int:
+        """
+        Get the index of the process that owns the file object of `handle`.
+        """
+        return int(handle.split(':', 1)[0])
@@ -15,6 +15,8 @@ from storage.redis_status_interface import RedisStatusInterface
 import contextlib
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from objects.file import FileObject
 
 UPDATE_INTERVAL = 4.5  # a bit less than the update interval on the system health page, FixMe: -> configuration
@@ -30,8 +32,12 @@ class _UpdateType(Enum):
 
 
 class AnalysisStatus:
-    def __init__(self):
-        self._worker = AnalysisStatusWorker()
+    def __init__(self, on_firmware_completed: Callable[[str], None] | None = None):
+        """
+        :param on_firmware_completed: Optional function that is called (in the worker process) with the UID of a
+            firmware after its analysis is completed.
+        """
+        self._worker = AnalysisStatusWorker(on_firmware_completed=on_firmware_completed)
 
     def start(self):
         self._worker.start()
@@ -86,7 +92,8 @@ class FwAnalysisStatus:
 
 
 class AnalysisStatusWorker:
-    def __init__(self):
+    def __init__(self, on_firmware_completed: Callable[[str], None] | None = None):
+        self.on_firmware_completed = on_firmware_completed
         self.recently_finished = {}
         self.currently_running: Dict[str, FwAnalysisStatus] = {}
         self._worker_process = None
@@ -191,6 +198,11 @@ class AnalysisStatusWorker:
             self.recently_finished[root_uid] = self._init_recently_finished(status)
             del self.currently_running[root_uid]
             logging.info(f'Analysis of firmware {root_uid} completed')
+            if self.on_firmware_completed is not None:
+                try:
+                    self.on_firmware_completed(root_uid)
+                except Exception:
+                    logging.exception(f'Error in post-processing of firmware {root_uid}')
 
     @staticmethod
     def _init_recently_finished(analysis_status: FwAnalysisStatus) -> dict:
@@ -5,9 +5,10 @@ import os
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager, suppress
 from multiprocessing import Manager, Queue, Value
-from queue import Empty
+from queue import Empty, Full
+from queue import Queue as ThreadQueue
 from tempfile import TemporaryDirectory
-from threading import Thread
+from threading import Semaphore, Thread
 from time import sleep
 
 from docker.errors import DockerException
@@ -32,16 +33,24 @@ if TYPE_CHECKING:
     from objects.file import FileObject
 
 
-class NoFreeWorker(RuntimeError):  # noqa: N818
-    pass
-
-
 THROTTLE_INTERVAL = 2
+# number of tasks that are staged (i.e. copied into the extraction directory) for each container in advance (in
+# addition to the task that is currently extracted by the container)
+PREFETCH_SIZE = 1
 
 
 class UnpackingScheduler:
     """
     This scheduler performs unpacking on firmware objects
+
+    Unpacking is a pipeline of three stages that run in separate threads and are connected by bounded queues:
+
+    1. staging: the file is copied into an extraction directory of a container (at most ``PREFETCH_SIZE`` tasks per
+       container are staged while the container is busy so that it has its next task ready)
+    2. extraction: the file is extracted by the container
+    3. post-processing: the extracted files are stored and added to the DB and are scheduled for unpacking
+
+    This way the containers don't have to wait for the post-processing of the previous task.
     """
 
     def __init__(  # noqa: PLR0913
@@ -58,7 +67,6 @@ class UnpackingScheduler:
         self.in_queue = Queue()
         self.work_load_counter = 25
         self.worker_tmp_dirs = []  # type: list[TemporaryDirectory]
-        self.pending_tasks: dict[int, Thread] = {}
         self.post_unpack = post_unpack
         self.unpacking_locks = unpacking_locks
         self.unpacker = Unpacker(fs_organizer=fs_organizer, unpacking_locks=unpacking_locks)
@@ -132,7 +140,7 @@ class UnpackingScheduler:
     def create_containers(self):
         for id_ in range(config.backend.unpacking.processes):
             tmp_dir = TemporaryDirectory(dir=config.backend.docker_mount_base_dir)
-            container = ExtractionContainer(id_=id_, tmp_dir=tmp_dir, value=self.manager.Value('i', 0))
+            container = ExtractionContainer(id_=id_, tmp_dir=tmp_dir)
             container.start()
             self.workers.append(container)
             self.worker_tmp_dirs.append(tmp_dir)
@@ -143,77 +151,129 @@ class UnpackingScheduler:
 
     def extraction_loop(self):
         logging.debug(f'Starting unpacking scheduler loop (pid={os.getpid()})')
+        post_processing_queue = ThreadQueue(maxsize=len(self.workers))
+        threads = [
+            Thread(target=self._post_processing_loop, args=(post_processing_queue,)) for _ in range(len(self.workers))
+        ]
+        for container_id in range(len(self.workers)):
+            staging_queue = ThreadQueue()
+            free_slots = Semaphore(PREFETCH_SIZE)
+            for target in (self._staging_loop, self._extraction_loop):
+                threads.append(
+                    Thread(target=target, args=(container_id, staging_queue, free_slots, post_processing_queue))
+                )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logging.debug('Stopped unpacking scheduler loop')
+
+    def _staging_loop(
+        self, container_id: int, staging_queue: ThreadQueue, free_slots: Semaphore, post_processing_queue: ThreadQueue
+    ):
+        tmp_dir_base = self.workers[container_id].tmp_dir.name
         while self.stop_condition.value == 0:
-            self.check_pending()
+            # a slot is freed when the container starts the extraction of a staged task -> the next task is only taken
+            # from the queue if the container needs one (so that other containers can take it in the meantime)
+            if not free_slots.acquire(timeout=1):
+                continue
             try:
-                container = self.get_free_worker()
                 task = self.in_queue.get(timeout=1)
-                task_thread = Thread(
-                    target=self._work_thread_wrapper,
-                    kwargs={'task': task, 'container': container},
-                )
-                task_thread.start()
-                logging.debug(f'Started Worker on {task.uid} ({container.tmp_dir})')
-                self.pending_tasks[container.id_] = task_thread
-            except NoFreeWorker:
-                logging.debug('No free worker. Sleeping...')
-                sleep(0.2)
             except Empty:
-                pass
-        logging.debug('Stopped unpacking scheduler loop')
-
-    def check_pending(self):
-        for container_id, thread in list(self.pending_tasks.items()):
-            if not thread.is_alive():
-                thread.join()
-                container = self.workers[container_id]
-                if container.exception_occurred():
-                    container.restart()
-                    self.workers[container_id] = container  # force update of manager
-                self.pending_tasks.pop(container_id)
-
-    def get_free_worker(self) -> ExtractionContainer:
-        for container in self.workers:
-            if container.id_ not in self.pending_tasks:
-                return container
-        raise NoFreeWorker()
-
-    def _work_thread_wrapper(self, task: FileObject, container: ExtractionContainer):
-        """
-        Exceptions in Threads will simply disappear when the thread is joined. We wrap everything in a
-        try-except block and log exceptions so that no exception occurs unnoticed.
-        """
+                free_slots.release()
+                continue
+            tmp_dir = TemporaryDirectory(dir=tmp_dir_base)
+            if self._stage(task, tmp_dir.name):
+                staging_queue.put((task, tmp_dir))
+            else:  # nothing to extract -> skip the extraction stage
+                free_slots.release()
+                self._put_unless_stopped(post_processing_queue, (task, tmp_dir, False))
+
+    def _stage(self, task: FileObject, tmp_dir: str) -> bool:
         try:
-            self.work_thread(task, container)
-        except Exception:
-            logging.exception(f'Exception occurred during unpacking of {task.uid}')
-
-    def work_thread(self, task: FileObject, container: ExtractionContainer):
-        if isinstance(task, Firmware):
-            self._init_currently_unpacked(task)
-
-        with TemporaryDirectory(dir=container.tmp_dir.name) as tmp_dir:
+            if isinstance(task, Firmware):
+                self._init_currently_unpacked(task)
+            return self.unpacker.stage(task, tmp_dir)
+        except ExtractionError as error:  # the error was already stored in the unpacker result of the task
+            logging.error(f'Could not stage {task.uid} for extraction: {error}')
+        except Exception as error:
+            # exceptions in threads would disappear unnoticed and stop the staging for this container -> log them and
+            # mark the task as failed so that it is still post-processed and does not block its firmware
+            logging.exception(f'Exception occurred during staging of {task.uid}')
+            self.unpacker.store_unpacking_error_skip_info(task, error=error)
+        return False
+
+    def _extraction_loop(
+        self, container_id: int, staging_queue: ThreadQueue, free_slots: Semaphore, post_processing_queue: ThreadQueue
+    ):
+        while self.stop_condition.value == 0:
             try:
-                extracted_objects = self.unpacker.unpack(task, tmp_dir, container)
+                task, tmp_dir = staging_queue.get(timeout=1)
+            except Empty:
+                continue
+            free_slots.release()
+            container = self.workers[container_id]
+            logging.debug(f'Started extraction of {task.uid} ({container.tmp_dir.name})')
+            try:
+                self.unpacker.extract(task, tmp_dir.name, container)
+                extraction_successful = True
             except ExtractionError as error:
                 docker_logs = self._fetch_logs(container)
                 logging.exception(f'Exception happened during extraction of {task.uid}.{docker_logs}: {error}')
-                container.set_exception()
-                extracted_objects = []
+                extraction_successful = False
+                container.restart()
+                self.workers[container_id] = container  # force update of manager
+            self._put_unless_stopped(post_processing_queue, (task, tmp_dir, extraction_successful))
+
+    def _post_processing_loop(self, post_processing_queue: ThreadQueue):
+        # each worker needs its own interface because connections are not thread-safe
+        db_interface = self.db_interface()
+        while self.stop_condition.value == 0:
+            try:
+                task, tmp_dir, extraction_successful = post_processing_queue.get(timeout=1)
+            except Empty:
+                continue
+            try:
+                self.post_process(task, tmp_dir.name, extraction_successful, db_interface)
+            except Exception:
+                # exceptions in threads would disappear unnoticed -> log them and continue with the next task
+                logging.exception(f'Exception occurred during unpacking of {task.uid}')
+            finally:
+                tmp_dir.cleanup()
+
+    def _put_unless_stopped(self, queue: ThreadQueue, item: tuple):
+        while self.stop_condition.value == 0:
+            try:
+                queue.put(item, timeout=1)
+                return
+            except Full:
+                continue
 
+    def post_process(
+        self, task: FileObject, tmp_dir: str, extraction_successful: bool, db_interface: BackendDbInterface
+    ):
+        if extraction_successful:
             sleep(config.backend.unpacking.delay)  # unpacking may be too fast for the FS to keep up
+            extracted_objects = self.unpacker.collect_extracted_files(task, tmp_dir)
+        else:
+            extracted_objects = []
 
-            logging.info(f'Unpacking completed: {task.uid} (extracted files: {len(extracted_objects)})')
-            # each worker needs its own interface because connections are not thread-safe
-            db_interface = self.db_interface()
-            try:
-                db_interface.add_object(task)  # save FO before submitting to analysis scheduler
-                self.post_unpack(task)
-            except DbInterfaceError as error:
-                logging.error(str(error))
-                extracted_objects = []
-            self._update_currently_unpacked(task, extracted_objects, db_interface)
-            self._schedule_extracted_files(extracted_objects)
+        logging.info(f'Unpacking completed: {task.uid} (extracted files: {len(extracted_objects)})')
+        try:
+            if isinstance(task, Firmware):
+                db_interface.add_object(task)  # save FW before submitting to analysis scheduler
+            else:
+                # the DB entry of an extracted file was created together with its siblings when its parent was
+                # processed (see `_update_currently_unpacked`) -> only the result of the unpacker is missing
+                db_interface.add_analyses(
+                    [(task.uid, plugin, analysis) for plugin, analysis in task.processed_analysis.items()]
+                )
+            self.post_unpack(task)
+        except DbInterfaceError as error:
+            logging.error(str(error))
+            extracted_objects = []
+        self._update_currently_unpacked(task, extracted_objects, db_interface)
+        self._schedule_extracted_files(extracted_objects)
 
     def _update_currently_unpacked(
         self, task: FileObject, extracted_objects: list[FileObject], db_interface: BackendDbInterface
@@ -226,13 +286,17 @@ class UnpackingScheduler:
                 extracted_objects.clear()
                 return
 
-            if task.uid in currently_unpacked['delayed_vfp_update']:
-                for parent_uid, path_list in currently_unpacked['delayed_vfp_update'][task.uid].items():
-                    db_interface.add_vfp(parent_uid, task.uid, path_list)
-                    db_interface.add_child_to_parent(parent_uid=parent_uid, child_uid=task.uid)
+            # the new files are stored in the DB together with the VFPs and parent/child relations of files that are
+            # already in the DB before they are scheduled for unpacking
+            child_entries = [
+                (parent_uid, task.uid, path_list)
+                for parent_uid, path_list in currently_unpacked['delayed_vfp_update'].get(task.uid, {}).items()
+            ]
             currently_unpacked['done'].add(task.uid)
 
-            self._update_extracted_objects(currently_unpacked, db_interface, extracted_objects, task)
+            child_entries.extend(self._update_extracted_objects(currently_unpacked, extracted_objects, task))
+            if child_entries or extracted_objects:
+                db_interface.add_child_entries(child_entries, new_objects=extracted_objects)
             with suppress(KeyError):
                 currently_unpacked['remaining'].remove(task.uid)
             if not currently_unpacked['remaining']:
@@ -244,10 +308,14 @@ class UnpackingScheduler:
     @staticmethod
     def _update_extracted_objects(
         currently_unpacked: dict,
-        db_interface: BackendDbInterface,
         extracted_objects: list[FileObject],
         current_fo: FileObject,
-    ):
+    ) -> list[tuple[str, str, list[str]]]:
+        """
+        Removes all files from `extracted_objects` that should not be unpacked (again) and returns the
+        ``(parent_uid, child_uid, paths)`` entries of files that are already in the DB and only need a VFP update.
+        """
+        child_entries = []
         for fo in extracted_objects[:]:
             path_list = fo.virtual_file_path[current_fo.uid]
             # 3 cases: unpacking not yet started, unpacking currently in progress, unpacking already done
@@ -259,9 +327,9 @@ class UnpackingScheduler:
                 currently_unpacked['remaining'].add(fo.uid)
             else:  # FO was already unpacked from this FW -> only update VFP and skip unpacking/analysis
                 extracted_objects.remove(fo)
-                db_interface.add_vfp(current_fo.uid, fo.uid, path_list)
-                db_interface.add_child_to_parent(parent_uid=current_fo.uid, child_uid=fo.uid)
+                child_entries.append((current_fo.uid, fo.uid, path_list))
                 logging.debug(f'Skipping unpacking/analysis of {fo.uid} (part of {fo.root_uid}).')
+        return child_entries
 
     @staticmethod
     def _fetch_logs(container: ExtractionContainer) -> str:
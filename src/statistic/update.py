@@ -1,14 +1,38 @@
 from __future__ import annotations
 
+import json
 import logging
 from time import time
 
 from common_helper_filter.time import time_format
 
 from statistic.time_stats import build_stats_entry_from_date_query
-from storage.db_interface_stats import RelativeStats, Stats, StatsUpdateDbInterface, count_occurrences
+from storage.db_interface_stats import (
+    FIRMWARE_STATS_PREFIX,
+    UPDATE_STATE_IDENTIFIER,
+    RelativeStats,
+    Stats,
+    StatsUpdateDbInterface,
+    count_occurrences,
+)
 from storage.schema import AnalysisEntry, FileObjectEntry, FirmwareEntry
 
+ELF_EXECUTABLE_REGEX = '^ELF.*executable'
+ELF_EXECUTABLE_STATS = [
+    ('big endian', '^ELF.*MSB.*executable'),
+    ('little endian', '^ELF.*LSB.*executable'),
+    ('stripped', '^ELF.*executable.*, stripped'),
+    ('not stripped', '^ELF.*executable.*, not stripped'),
+    ('32-bit', '^ELF 32-bit.*executable'),
+    ('64-bit', '^ELF 64-bit.*executable'),
+    ('dynamically linked', '^ELF.*executable.*dynamically linked'),
+    ('statically linked', '^ELF.*executable.*statically linked'),
+    ('section info missing', '^ELF.*executable.*section header'),
+]
+FILTERED_STATS_PREFIX = 'filtered:'
+# number of the most common vendors and device classes for which the filtered statistics are precomputed
+PRECOMPUTED_FILTER_COUNT = 5
+
 
 class StatsUpdater:
     """
@@ -23,15 +47,27 @@ class StatsUpdater:
     def set_match(self, match):
         self.match = match or {}
 
-    def update_all_stats(self):
+    def update_all_stats(self, force: bool = False):
+        """
+        Update all statistics. The update is skipped if the DB was not modified since the last update (unless
+        ``force`` is set). Cached filtered statistics that are outdated are deleted.
+
+        :param force: Update the statistics even if there were no changes (this also recomputes the stats entries of
+            the individual firmware).
+        """
         self.start_time = time()
 
+        modification_state = self.db.get_modification_state()
+        if not force and modification_state is not None and modification_state == self.db.get_last_modification_state():
+            logging.info('No changes in the database since the last statistics update: skipping update')
+            return
+
         with self.db.get_read_only_session():
             self.db.update_statistic('firmware_meta', self.get_firmware_meta_stats())
             self.db.update_statistic('file_type', self.get_file_type_stats())
             self.db.update_statistic('crypto_material', self.get_crypto_material_stats())
             self.db.update_statistic('unpacking', self.get_unpacking_stats())
-            self.db.update_statistic('architecture', self.get_architecture_stats())
+            self.db.update_statistic('architecture', self.get_architecture_stats(incremental=not force))
             self.db.update_statistic('ips_and_uris', self.get_ip_stats())
             self.db.update_statistic('release_date', self.get_time_stats())
             self.db.update_statistic('exploit_mitigations', self.get_exploit_mitigations_stats())
@@ -40,6 +76,67 @@ class StatsUpdater:
             self.db.update_statistic('elf_executable', self.get_executable_stats())
             # should always be the last, because of the benchmark
             self.db.update_statistic('general', self.get_general_stats())
+        self.db.update_statistic(UPDATE_STATE_IDENTIFIER, {'modification_state': modification_state})
+        # filtered statistics are cached for arbitrary filters -> remove outdated entries so that they don't pile up
+        self.db.delete_outdated_stats(FILTERED_STATS_PREFIX, modification_state)
+        self.db.delete_stats_of_deleted_firmware()
+
+    def get_filtered_stats(self, q_filter: dict) -> dict:
+        """
+        Get all statistics for the firmware matching `q_filter`. The results are cached in the DB and the cache entry
+        is only used as long as the DB was not modified since the statistics were computed.
+
+        :param q_filter: The firmware filter (e.g. ``{'vendor': 'foo'}``).
+        :return: A dict with the statistics (in the same format as :py:func:`get_all_stats`).
+        """
+        identifier = get_filtered_stats_identifier(q_filter)
+        modification_state = self.db.get_modification_state()
+        cached = self.db.get_stats_data(identifier)
+        if (
+            modification_state is not None
+            and cached is not None
+            and cached.get('modification_state') == modification_state
+        ):
+            return cached['stats']
+        self.set_match(q_filter)
+        stats = self.get_all_stats()
+        if modification_state is not None:
+            self.db.update_statistic(identifier, {'modification_state': modification_state, 'stats': stats})
+        return stats
+
+    def update_firmware_stats(self, uid: str):
+        """
+        Update the stats entry of the firmware with UID `uid` (e.g. after its analysis is completed), so that the
+        unfiltered architecture statistics do not need to be recomputed for all firmware during each update.
+        """
+        architecture = self._get_architecture_by_firmware(firmware_uids=[uid]).get(uid)
+        self.db.update_statistic(get_firmware_stats_identifier(uid), {'architecture': architecture})
+
+    def precompute_filtered_stats(self, count: int = PRECOMPUTED_FILTER_COUNT):
+        """
+        Fill the cache of :py:func:`get_filtered_stats` for the `count` most common vendors and device classes.
+        """
+        for field, key in [(FirmwareEntry.vendor, 'vendor'), (FirmwareEntry.device_class, 'device_class')]:
+            most_common = self.db.count_distinct_values(field)[-count:] if count > 0 else []
+            for value, _ in most_common:
+                StatsUpdater(stats_db=self.db).get_filtered_stats({key: value})
+
+    def get_all_stats(self) -> dict:
+        with self.db.get_read_only_session():
+            return {
+                'firmware_meta_stats': self.get_firmware_meta_stats(),
+                'file_type_stats': self.get_file_type_stats(),
+                'crypto_material_stats': self.get_crypto_material_stats(),
+                'unpacker_stats': self.get_unpacking_stats(),
+                'ip_and_uri_stats': self.get_ip_stats(),
+                'architecture_stats': self.get_architecture_stats(),
+                'release_date_stats': self.get_time_stats(),
+                'general_stats': self.get_general_stats(),
+                'exploit_mitigations_stats': self.get_exploit_mitigations_stats(),
+                'known_vulnerabilities_stats': self.get_known_vulnerabilities_stats(),
+                'software_stats': self.get_software_components_stats(),
+                'elf_executable_stats': self.get_executable_stats(),
+            }
 
     # ---- get statistic functions
 
@@ -132,15 +229,37 @@ class StatsUpdater:
             'average_unpacked_entropy': self.db.get_unpacking_entropy('unpacked', q_filter=self.match),
         }
 
-    def get_architecture_stats(self):
+    def get_architecture_stats(self, incremental: bool = True):
+        """
+        Get the architecture stats (the architecture of a firmware is the most frequent one of its files). Without
+        filter, the architectures are taken from the stats entries of the individual firmware (see
+        :py:func:`update_firmware_stats`) and only computed for firmware without an entry (or for all firmware if
+        `incremental` is not set).
+        """
+        if self.match:
+            architectures = list(self._get_architecture_by_firmware().values())
+        else:
+            architectures = self._get_architectures_from_firmware_stats(incremental)
+        return {'cpu_architecture': count_occurrences([arch for arch in architectures if arch is not None])}
+
+    def _get_architectures_from_firmware_stats(self, incremental: bool) -> list[str | None]:
+        firmware_stats = self.db.get_firmware_stats()
+        missing = [uid for uid, data in firmware_stats.items() if data is None] if incremental else list(firmware_stats)
+        if missing:
+            architectures = self._get_architecture_by_firmware(firmware_uids=missing if incremental else None)
+            for uid in missing:
+                firmware_stats[uid] = {'architecture': architectures.get(uid)}
+                self.db.update_statistic(get_firmware_stats_identifier(uid), firmware_stats[uid])
+        return [data['architecture'] for data in firmware_stats.values()]
+
+    def _get_architecture_by_firmware(self, firmware_uids: list[str] | None = None) -> dict[str, str]:
         arch_stats_by_fw = {}
-        for arch, count, uid in self.db.get_arch_stats(q_filter=self.match):
+        for arch, count, uid in self.db.get_arch_stats(q_filter=self.match, firmware_uids=firmware_uids):
             arch_stats_by_fw.setdefault(uid, []).append((arch, count))
-        arch_stats = [
-            self._shorten_architecture_string(self._find_most_frequent_architecture(arch_count_list))
-            for arch_count_list in arch_stats_by_fw.values()
-        ]
-        return {'cpu_architecture': count_occurrences(arch_stats)}
+        return {
+            uid: self._shorten_architecture_string(self._find_most_frequent_architecture(arch_count_list))
+            for uid, arch_count_list in arch_stats_by_fw.items()
+        }
 
     @staticmethod
     def _find_most_frequent_architecture(arch_stats: Stats) -> str:
@@ -164,21 +283,13 @@ class StatsUpdater:
             return 0.0
 
     def get_executable_stats(self) -> dict[str, list[tuple[str, int, float, str]]]:
-        total = self.db.get_regex_mime_match_count('^ELF.*executable')
-        stats = []
-        for label, query_match in [
-            ('big endian', '^ELF.*MSB.*executable'),
-            ('little endian', '^ELF.*LSB.*executable'),
-            ('stripped', '^ELF.*executable.*, stripped'),
-            ('not stripped', '^ELF.*executable.*, not stripped'),
-            ('32-bit', '^ELF 32-bit.*executable'),
-            ('64-bit', '^ELF 64-bit.*executable'),
-            ('dynamically linked', '^ELF.*executable.*dynamically linked'),
-            ('statically linked', '^ELF.*executable.*statically linked'),
-            ('section info missing', '^ELF.*executable.*section header'),
-        ]:
-            count = self.db.get_regex_mime_match_count(query_match)
-            stats.append((label, count, count / (total if total else 1), query_match))
+        total, *counts = self.db.get_regex_mime_match_counts(
+            [ELF_EXECUTABLE_REGEX, *(query_match for _, query_match in ELF_EXECUTABLE_STATS)]
+        )
+        stats = [
+            (label, count, count / (total if total else 1), query_match)
+            for (label, query_match), count in zip(ELF_EXECUTABLE_STATS, counts)
+        ]
         return {'executable_stats': stats}
 
     def get_ip_stats(self) -> dict[str, Stats]:
@@ -206,3 +317,15 @@ class StatsUpdater:
 
     def get_software_components_stats(self):
         return {'software_components': self.db.get_software_components(q_filter=self.match)}
+
+
+def get_filtered_stats_identifier(q_filter: dict) -> str:
+    return f'{FILTERED_STATS_PREFIX}{json.dumps(q_filter, sort_keys=True)}'
+
+
+def get_firmware_stats_identifier(uid: str) -> str:
+    return f'{FIRMWARE_STATS_PREFIX}{uid}'
+
+
+def update_firmware_stats(uid: str):
+    StatsUpdater().update_firmware_stats(uid)
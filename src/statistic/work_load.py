@@ -10,6 +10,7 @@ import distro
 import psutil
 
 import config
+from storage.db_connection import get_opened_connection_count
 from storage.db_interface_stats import StatsUpdateDbInterface
 from version import __VERSION__
 
@@ -19,6 +20,7 @@ class WorkLoadStatistic:
         self.component = component
         self.db = StatsUpdateDbInterface()
         self.platform_information = self._get_platform_information()
+        self._last_connection_count = (get_opened_connection_count(), time())
         logging.debug(f'{self.component}: Online')
 
     def shutdown(self):
@@ -32,6 +34,7 @@ class WorkLoadStatistic:
             'last_update': time(),
             'system': self._get_system_information(),
             'platform': self.platform_information,
+            'database': self._get_database_information(),
         }
         if unpacking_workload:
             stats['unpacking'] = unpacking_workload
@@ -65,6 +68,15 @@ class WorkLoadStatistic:
             'disk_percent': disk_usage.percent,
         }
 
+    def _get_database_information(self) -> dict:
+        opened, now = get_opened_connection_count(), time()
+        last_opened, last_time = self._last_connection_count
+        self._last_connection_count = (opened, now)
+        return {
+            'connections_opened': opened,
+            'connections_opened_per_second': round((opened - last_opened) / max(now - last_time, 1e-3), 2),
+        }
+
     @staticmethod
     def _get_platform_information():
         operating_system = f'{distro.id()} {distro.version()}'
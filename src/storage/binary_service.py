@@ -46,6 +46,19 @@ class BinaryService:
         name = f'{file_name}.tar.gz'
         return tar, name
 
+    def get_repacked_archive_file_name(self, uid: str) -> str | None:
+        """
+        Repack the file with UID ``uid`` into the archive cache without reading the archive (the frontend can read it
+        from the cache with :py:func:`storage.fsorganizer.get_readable_repacked_archive_path`).
+
+        :return: The file name of the archive for the download or ``None`` if the file does not exist.
+        """
+        file_name = self.db_interface.get_file_name(uid)
+        if file_name is None:
+            return None
+        TarRepack().get_repacked_archive(self.fs_organizer.generate_path_from_uid(uid))
+        return f'{file_name}.tar.gz'
+
 
 class BinaryServiceDbInterface(ReadOnlyDbInterface):
     def get_file_name(self, uid: str) -> str | None:
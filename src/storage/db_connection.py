@@ -1,13 +1,62 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import URL
+import os
+from multiprocessing import Value
+from threading import Lock
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine
 from sqlalchemy.orm import sessionmaker
 
 import config
 from storage.schema import Base
 from typing import Optional
 
+_ENGINES: dict[tuple, Engine] = {}
+_ENGINE_LOCK = Lock()
+# number of DB connections that were opened by this component (shared with the child processes, which are forked)
+_CONNECTIONS_OPENED = Value('L', 0)
+
+
+def get_engine(engine_url: URL, **kwargs) -> Engine:
+    """
+    Get the engine for `engine_url`. Engines (and their connection pools) are shared by all DB connection objects of a
+    process, so that connections are reused instead of creating new ones for each DB interface.
+
+    :param engine_url: The URL of the database (including user and password).
+    :param kwargs: Additional arguments for ``sqlalchemy.create_engine``.
+    """
+    key = (engine_url.render_as_string(hide_password=False), tuple(sorted(kwargs.items())))
+    with _ENGINE_LOCK:
+        if key not in _ENGINES:
+            _ENGINES[key] = create_engine(engine_url, pool_size=100, pool_pre_ping=True, future=True, **kwargs)
+            event.listen(_ENGINES[key], 'connect', _count_connection)
+        return _ENGINES[key]
+
+
+def _count_connection(*_):
+    with _CONNECTIONS_OPENED.get_lock():
+        _CONNECTIONS_OPENED.value += 1
+
+
+def get_opened_connection_count() -> int:
+    """
+    Get the number of DB connections that were opened by all processes of this component (i.e. the process that
+    imported this module first and all processes that were forked from it) so far.
+    """
+    return _CONNECTIONS_OPENED.value
+
+
+def _reset_engines_after_fork():
+    # connections must not be shared between processes -> the child process gets new (empty) pools
+    global _ENGINE_LOCK  # noqa: PLW0603
+    _ENGINE_LOCK = Lock()
+    for engine in _ENGINES.values():
+        engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_engines_after_fork)
+
 
 class DbConnection:
     def __init__(
@@ -29,7 +78,7 @@ class DbConnection:
             port=port,
             database=database,
         )
-        self.engine = create_engine(engine_url, pool_size=100, future=True, **kwargs)
+        self.engine = get_engine(engine_url, **kwargs)
         self.session_maker = sessionmaker(bind=self.engine, future=True)  # future=True => sqlalchemy 2.0 support
 
     def create_tables(self):
@@ -2,13 +2,13 @@ from __future__ import annotations
 
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import delete, exists, func, select
 
 from intercom.front_end_binding import InterComFrontEndBinding
 from storage.db_connection import DbConnection, ReadWriteDeleteConnection
 from storage.db_interface_base import ReadWriteDbInterface
 from storage.db_interface_common import DbInterfaceCommon
-from storage.schema import ComparisonEntry, FileObjectEntry
+from storage.schema import ComparisonEntry, FileObjectEntry, fw_files_table
 
 
 class AdminDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
@@ -22,6 +22,8 @@ class AdminDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
         with self.get_read_write_session() as session:
             fo_entry = session.get(FileObjectEntry, uid)
             if fo_entry is not None:
+                if fo_entry.is_firmware:
+                    self._delete_orphans(uid, session)
                 session.delete(fo_entry)
 
     def delete_firmware(self, uid: str, delete_root_file: bool = True) -> tuple[int, int]:
@@ -30,31 +32,48 @@ class AdminDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
             if not fw or not fw.is_firmware:
                 logging.error(f'Trying to remove FW with UID {uid} but it could not be found in the DB.')
                 return 0, 0
-            included_uids = self.get_all_files_in_fw(fw.uid)
-            self.delete_object(uid)
-            # DB entries of files that only belonged to this FW are deleted by event listener `delete_file_orphans()`
+            included_count = session.execute(
+                select(func.count()).select_from(fw_files_table).where(fw_files_table.c.root_uid == uid)
+            ).scalar()
+            # DB entries of files that only belonged to this FW are deleted
             # DB entries of files that also belong to other FW should still be there
-            still_in_db = self._find_files_still_in_db(included_uids, session)
-        # if we subtract the updated files from all files that belonged to the FW we get the files that need to be
-        # deleted from the file system (through the "intercom")
-        uids_to_delete = included_uids - still_in_db
+            uids_to_delete = self._delete_orphans(uid, session)
+            session.delete(fw)
+        # the deleted files also need to be deleted from the file system (through the "intercom")
+        still_in_db_count = included_count - len(uids_to_delete)
         if delete_root_file:
             uids_to_delete.add(uid)
         else:
             assert uid not in uids_to_delete  # this should never ever happen
         self.intercom.delete_file(uids_to_delete)
-        return len(still_in_db), len(uids_to_delete)
+        return still_in_db_count, len(uids_to_delete)
 
     @staticmethod
-    def _find_files_still_in_db(included_files: set[str], session) -> set[str]:
+    def _delete_orphans(fw_uid: str, session) -> set[str]:
         """
-        :param included_files: A set of UIDs of all files included in the FW
+        Delete all files of a firmware that would be "orphaned" if the firmware was deleted: files that do not belong
+        to any other firmware (and also are not a firmware themselves). Only the files of this firmware are considered
+        (through the fw_files table), so the cost does not depend on the size of the whole DB.
+
+        :param fw_uid: The UID of the firmware that is about to be deleted
         :param session: The current DB session
-        :return: A set of UIDs from files included in the deleted FW that are still in the DB (because they are also
-            included in another FW). Can be empty if no file also occurs in another FW.
+        :return: A set of UIDs of the deleted files
         """
-        query = select(FileObjectEntry.uid).filter(FileObjectEntry.uid.in_(included_files))
-        return set(session.execute(query).scalars() or [])
+        other_fw_files = fw_files_table.alias('other_fw_files')
+        statement = (
+            delete(FileObjectEntry)
+            .where(
+                FileObjectEntry.uid.in_(select(fw_files_table.c.file_uid).where(fw_files_table.c.root_uid == fw_uid)),
+                ~FileObjectEntry.is_firmware,
+                ~exists().where(
+                    other_fw_files.c.file_uid == FileObjectEntry.uid,
+                    other_fw_files.c.root_uid != fw_uid,
+                ),
+            )
+            .returning(FileObjectEntry.uid)
+            .execution_options(synchronize_session='fetch')
+        )
+        return set(session.execute(statement).scalars())
 
     def delete_comparison(self, comparison_id: str):
         try:
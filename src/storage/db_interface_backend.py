@@ -4,6 +4,7 @@ import logging
 from contextlib import suppress
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
 from objects.firmware import Firmware
@@ -16,13 +17,24 @@ from storage.entry_conversion import (
     create_vfp_entries,
     sanitize,
 )
-from storage.schema import AnalysisEntry, FileObjectEntry, FirmwareEntry, included_files_table, VirtualFilePath
+from storage.schema import (
+    AnalysisEntry,
+    FileObjectEntry,
+    FirmwareEntry,
+    fw_files_table,
+    included_files_table,
+    VirtualFilePath,
+)
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from objects.file import FileObject
     from sqlalchemy.orm import Session
 
+ANALYSIS_UPDATE_COLUMNS = ['plugin_version', 'system_version', 'analysis_date', 'summary', 'tags', 'result']
+# postgres supports at most 65535 bind parameters per statement -> split multi-row inserts into chunks
+MAX_BIND_PARAMETERS = 65_535
+
 
 class BackendDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
     # ===== Create / INSERT =====
@@ -94,6 +106,46 @@ class BackendDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
             logging.error(f'Bad value in analysis result of {plugin} on {uid}: {error!s}\n{analysis_dict}')
             raise
 
+    def add_analyses(self, analyses: list[tuple[str, str, dict]]):
+        """
+        Store a batch of analysis results given as ``(uid, plugin, analysis_dict)`` tuples in a single transaction.
+        New analyses are inserted and existing analyses are updated with one ``INSERT ... ON CONFLICT DO UPDATE``
+        statement. If the batch cannot be stored as a whole, the results are stored separately so that one bad result
+        does not affect the others.
+        """
+        rows = {}
+        for uid, plugin, analysis_dict in analyses:
+            if any(item not in analysis_dict for item in ['plugin_version', 'analysis_date']):
+                logging.error(f'Could not store analysis result of {plugin} on {uid}: data is incomplete')
+                continue
+            rows[(uid, plugin)] = _create_analysis_row(uid, plugin, analysis_dict)
+        if not rows:
+            return
+        try:
+            with self.get_read_write_session() as session:
+                existing_uids = self._get_existing_uids(session, {uid for uid, _ in rows})
+                for uid, plugin in list(rows):
+                    if uid not in existing_uids:
+                        logging.error(f'Could not find file object for analysis update: {uid} ({plugin})')
+                        rows.pop((uid, plugin))
+                if rows:
+                    session.execute(_create_analysis_upsert_statement(list(rows.values())))
+        except (DbInterfaceError, ValueError):
+            logging.warning(f'Could not store batch of {len(rows)} analysis results. Storing them separately.')
+            self._add_analyses_separately([analysis for analysis in analyses if analysis[:2] in rows])
+
+    def _add_analyses_separately(self, analyses: list[tuple[str, str, dict]]):
+        for uid, plugin, analysis_dict in analyses:
+            try:
+                self.add_analysis(uid, plugin, analysis_dict)
+            except ValueError:
+                continue  # the error was already logged -> store the remaining results anyway
+
+    @staticmethod
+    def _get_existing_uids(session: Session, uid_set: set[str]) -> set[str]:
+        query = select(FileObjectEntry.uid).filter(FileObjectEntry.uid.in_(uid_set))
+        return set(session.execute(query).scalars())
+
     def analysis_exists(self, uid: str, plugin: str) -> bool:
         with self.get_read_only_session() as session:
             query = select(AnalysisEntry.uid).filter_by(uid=uid, plugin=plugin)
@@ -145,6 +197,48 @@ class BackendDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
                 # entry may already exist, but it is faster trying to create it and failing than checking beforehand
                 session.execute(statement)
 
+    def add_child_entries(self, entries: list[tuple[str, str, list[str]]], new_objects: list[FileObject] | None = None):
+        """
+        Adds a batch of extracted files in a single transaction using multi-row ``INSERT`` statements: The entries of
+        `new_objects` (files that were not stored as part of the firmware before) are added together with their
+        firmware and parent/child relations and "virtual file paths". For files that are already in the DB, the
+        relations and paths are given as ``(parent_uid, child_uid, paths)`` tuples in `entries`. Entries that exist
+        already are skipped.
+        """
+        new_objects = new_objects or []
+        file_object_rows = [_create_file_object_row(file_object) for file_object in new_objects]
+        fw_file_rows = [
+            {'root_uid': root_uid, 'file_uid': file_object.uid}
+            for file_object in new_objects
+            for root_uid in file_object.parent_firmware_uids
+        ]
+        entries = [
+            *entries,
+            *(
+                (parent_uid, file_object.uid, paths)
+                for file_object in new_objects
+                for parent_uid, paths in file_object.virtual_file_path.items()
+            ),
+        ]
+        included_file_rows = list(
+            {
+                (parent_uid, child_uid): {'parent_uid': parent_uid, 'child_uid': child_uid}
+                for parent_uid, child_uid, _ in entries
+            }.values()
+        )
+        vfp_rows = list(
+            {
+                (parent_uid, child_uid, path): {'parent_uid': parent_uid, 'file_uid': child_uid, 'file_path': path}
+                for parent_uid, child_uid, paths in entries
+                for path in paths
+            }.values()
+        )
+        with self.get_read_write_session() as session:
+            _insert_ignore_existing(session, FileObjectEntry, file_object_rows)
+            _insert_ignore_existing(session, fw_files_table, fw_file_rows)
+            _insert_ignore_existing(session, included_files_table, included_file_rows)
+            _insert_ignore_existing(session, VirtualFilePath, vfp_rows)
+
     # ===== Update / UPDATE =====
 
     def update_object(self, fw_object: FileObject):
@@ -205,3 +299,48 @@ class BackendDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
         with self.get_read_write_session() as session:
             fo_entry = session.get(FileObjectEntry, file_uid)
             self._update_parents([root_uid], [parent_uid], fo_entry, session)
+
+
+def _create_file_object_row(file_object: FileObject) -> dict:
+    sanitize(file_object.virtual_file_path)
+    return {
+        'uid': file_object.uid,
+        'sha256': file_object.sha256,
+        'file_name': file_object.file_name,
+        'depth': file_object.depth,
+        'size': file_object.size,
+        'comments': file_object.comments,
+        'is_firmware': False,
+    }
+
+
+def _create_analysis_row(uid: str, plugin: str, analysis_dict: dict) -> dict:
+    result = analysis_dict.get('result', {})
+    if result is not None:
+        sanitize(result)
+    return {
+        'uid': uid,
+        'plugin': plugin,
+        'plugin_version': analysis_dict['plugin_version'],
+        'system_version': analysis_dict.get('system_version'),
+        'analysis_date': analysis_dict['analysis_date'],
+        'summary': analysis_dict.get('summary'),
+        'tags': analysis_dict.get('tags'),
+        'result': result,
+    }
+
+
+def _create_analysis_upsert_statement(rows: list[dict]):
+    statement = insert(AnalysisEntry).values(rows)
+    return statement.on_conflict_do_update(
+        constraint='_analysis_primary_key',
+        set_={column: statement.excluded[column] for column in ANALYSIS_UPDATE_COLUMNS},
+    )
+
+
+def _insert_ignore_existing(session: Session, table, rows: list[dict]):
+    if not rows:
+        return
+    chunk_size = MAX_BIND_PARAMETERS // len(rows[0])
+    for index in range(0, len(rows), chunk_size):
+        session.execute(insert(table).values(rows[index : index + chunk_size]).on_conflict_do_nothing())
@@ -38,7 +38,7 @@ class ReadOnlyDbInterface:
             logging.exception(f'{message}: {err}')
             raise DbInterfaceError(message) from err
         finally:
-            self.ro_session.invalidate()
+            self.ro_session.close()  # returns the connection to the pool
             self.ro_session = None
 
 
@@ -60,4 +60,4 @@ class ReadWriteDbInterface(ReadOnlyDbInterface):
             logging.exception(f'{message}: {err}')
             raise DbInterfaceError(message) from err
         finally:
-            session.invalidate()
+            session.close()
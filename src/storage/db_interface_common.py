@@ -153,6 +153,32 @@ class DbInterfaceCommon(ReadOnlyDbInterface):
             return None
         return analysis_entry_to_dict(entry)
 
+    def get_analysis_metadata_for_uid_list(self, uid_list: list[str] | set[str]) -> dict[str, dict[str, dict]]:
+        """
+        Get the metadata of all analyses of the files in `uid_list` without loading the actual analysis results.
+        The result has the structure ``{uid: {plugin: {plugin_version, system_version, analysis_date, failed}}}``.
+        """
+        if not uid_list:
+            return {}
+        with self.get_read_only_session() as session:
+            query = select(
+                AnalysisEntry.uid,
+                AnalysisEntry.plugin,
+                AnalysisEntry.plugin_version,
+                AnalysisEntry.system_version,
+                AnalysisEntry.analysis_date,
+                AnalysisEntry.result.has_key('failed'),
+            ).filter(AnalysisEntry.uid.in_(uid_list))
+            result = {}
+            for uid, plugin, plugin_version, system_version, analysis_date, failed in session.execute(query):
+                result.setdefault(uid, {})[plugin] = {
+                    'plugin_version': plugin_version,
+                    'system_version': system_version,
+                    'analysis_date': analysis_date,
+                    'failed': bool(failed),
+                }
+            return result
+
     def get_vfps(self, uid: str, parent_uid: str | None = None, root_uid: str | None = None) -> dict[str, list[str]]:
         """
         Get all virtual file paths of file with UID `uid` in all parent files. If `parent_uid` is set, returns only the
@@ -298,14 +324,13 @@ class DbInterfaceCommon(ReadOnlyDbInterface):
         with self.get_read_only_session() as session:
             return self._get_files_in_files(session, fo.files_included).union({fo.uid, *fo.files_included})
 
-    def _get_files_in_files(self, session, uid_set: set[str], recursive: bool = True) -> set[str]:
+    @staticmethod
+    def _get_files_in_files(session, uid_set: set[str]) -> set[str]:
+        """Get the UIDs of all files (recursively) included in the files in `uid_set` with a single recursive query"""
         if not uid_set:
             return set()
-        query = select(FileObjectEntry).filter(FileObjectEntry.uid.in_(uid_set))
-        included_files = {child.uid for fo in session.execute(query).scalars() for child in fo.included_files}
-        if recursive and included_files:
-            included_files.update(self._get_files_in_files(session, included_files))
-        return included_files
+        included = _get_included_files_cte(uid_set)
+        return set(session.execute(select(included.c.uid)).scalars())
 
     # ===== summary =====
 
@@ -319,8 +344,10 @@ class DbInterfaceCommon(ReadOnlyDbInterface):
         if fo is None:
             raise Exception(f'UID not found: {uid}')
         fo.list_of_all_included_files = self.get_list_of_all_included_files(fo)
+        plugins = [plugin for plugin, analysis_result in fo.processed_analysis.items() if 'summary' in analysis_result]
+        summaries = self._collect_summaries(fo, plugins)
         for plugin, analysis_result in fo.processed_analysis.items():
-            analysis_result['summary'] = self.get_summary(fo, plugin)
+            analysis_result['summary'] = summaries.get(plugin, {}) if plugin in plugins else None
         return fo
 
     def get_summary(self, fo: FileObject, selected_analysis: str) -> Summary | None:
@@ -329,22 +356,26 @@ class DbInterfaceCommon(ReadOnlyDbInterface):
             return None
         if 'summary' not in fo.processed_analysis[selected_analysis]:
             return None
-        if not isinstance(fo, Firmware):
-            included_files = fo.list_of_all_included_files or self.get_list_of_all_included_files(fo)
-        else:
-            included_files = self.get_all_files_in_fw(fo.uid).union({fo.uid})
-        return self._collect_summary_for_uid_list(included_files, selected_analysis)
+        return self._collect_summaries(fo, [selected_analysis]).get(selected_analysis, {})
 
-    def _collect_summary_for_uid_list(self, uid_list: set[str] | list[str], plugin: str) -> Summary:
+    def _collect_summaries(self, fo: FileObject, plugins: list[str]) -> dict[str, Summary]:
+        """
+        Collect the summaries of `plugins` of `fo` and all files (recursively) included in `fo` with a single query.
+        The included files are selected in the DB (using the fw_files table for firmware and the included_files table
+        otherwise), so that no (possibly huge) list of UIDs needs to be passed to the query.
+        """
+        if not plugins:
+            return {}
         with self.get_read_only_session() as session:
-            query = select(AnalysisEntry.uid, AnalysisEntry.summary).filter(
-                AnalysisEntry.plugin == plugin, AnalysisEntry.uid.in_(uid_list)
+            query = select(AnalysisEntry.uid, AnalysisEntry.plugin, AnalysisEntry.summary).filter(
+                AnalysisEntry.plugin.in_(plugins),
+                AnalysisEntry.uid.in_(_get_included_uid_query(fo)),
             )
-            summary = {}
-            for uid, summary_list in session.execute(query):  # type: str, list[str]
+            summaries = {}
+            for uid, plugin, summary_list in session.execute(query):  # type: str, str, list[str]
                 for item in set(summary_list or []):
-                    summary.setdefault(item, []).append(uid)
-        return summary
+                    summaries.setdefault(plugin, {}).setdefault(item, []).append(uid)
+        return summaries
 
     # ===== tags =====
 
@@ -392,3 +423,27 @@ class DbInterfaceCommon(ReadOnlyDbInterface):
         if limit:
             query = query.limit(limit)
         return query
+
+
+def _get_included_files_cte(uid_set: set[str]):
+    """
+    Recursive CTE for the UIDs of all files (recursively) included in the files in `uid_set`. The rows only contain
+    the UID, so the ``UNION`` removes duplicates, which also stops the recursion on cyclic inclusions.
+    """
+    included = (
+        select(included_files_table.c.child_uid.label('uid'))
+        .where(included_files_table.c.parent_uid.in_(uid_set))
+        .cte('included', recursive=True)
+    )
+    return included.union(
+        select(included_files_table.c.child_uid).join(included, included_files_table.c.parent_uid == included.c.uid)
+    )
+
+
+def _get_included_uid_query(fo: FileObject) -> Select:
+    """Query for the UIDs of `fo` and all files (recursively) included in `fo`"""
+    if isinstance(fo, Firmware):
+        included_uids = select(fw_files_table.c.file_uid).where(fw_files_table.c.root_uid == fo.uid)
+    else:
+        included_uids = select(_get_included_files_cte({fo.uid}).c.uid)
+    return included_uids.union(select(FileObjectEntry.uid).where(FileObjectEntry.uid == fo.uid))
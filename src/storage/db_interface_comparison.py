@@ -104,6 +104,21 @@ class ComparisonDbInterface(DbInterfaceCommon, ReadWriteDbInterface):
             analysis: AnalysisEntry = session.get(AnalysisEntry, (uid, 'file_hashes'))
             return analysis.result['ssdeep'] if analysis is not None else None
 
+    def get_ssdeep_hashes(self, uid_list: list[str]) -> dict[str, str]:
+        """
+        Get the ssdeep hashes of all files in `uid_list` with a single query. Files without hash are left out.
+
+        :param uid_list: The UIDs of the files.
+        :return: A dict with UIDs as keys and ssdeep hashes as values.
+        """
+        with self.get_read_only_session() as session:
+            query = (
+                select(AnalysisEntry.uid, AnalysisEntry.result['ssdeep'].astext)
+                .filter(AnalysisEntry.plugin == 'file_hashes')
+                .filter(AnalysisEntry.uid.in_(uid_list))
+            )
+            return {uid: ssdeep_hash for uid, ssdeep_hash in session.execute(query) if ssdeep_hash}
+
     def get_entropy(self, uid: str) -> float:
         with self.get_read_only_session() as session:
             analysis: AnalysisEntry = session.get(AnalysisEntry, (uid, 'unpacker'))
@@ -4,12 +4,19 @@ import logging
 from collections import Counter
 from typing import Any, Callable, Iterator, List, Tuple, TYPE_CHECKING
 
-from sqlalchemy import column, func, select
+from sqlalchemy import column, delete, func, literal, select, table
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import InstrumentedAttribute, aliased
 
 from storage.db_interface_base import ReadOnlyDbInterface, ReadWriteDbInterface
-from storage.schema import AnalysisEntry, FileObjectEntry, FirmwareEntry, StatsEntry
+from storage.schema import (
+    AnalysisEntry,
+    FileObjectEntry,
+    FirmwareEntry,
+    StatsEntry,
+    fw_files_table,
+    included_files_table,
+)
 
 if TYPE_CHECKING:
     from sqlalchemy.sql import Select
@@ -17,6 +24,23 @@ if TYPE_CHECKING:
 Stats = List[Tuple[str, int]]
 RelativeStats = List[Tuple[str, int, float]]  # stats with relative share as third element
 
+# the tables the statistics are computed from
+STATS_SOURCE_TABLES = [
+    AnalysisEntry.__tablename__,
+    FileObjectEntry.__tablename__,
+    FirmwareEntry.__tablename__,
+    fw_files_table.name,
+    included_files_table.name,
+]
+# the statistics view of PostgreSQL (with the number of inserted/updated/deleted rows per table)
+PG_STAT_USER_TABLES = table(
+    'pg_stat_user_tables', column('relname'), column('n_tup_ins'), column('n_tup_upd'), column('n_tup_del')
+)
+PG_STAT_DATABASE = table('pg_stat_database', column('datname'), column('stats_reset'))
+UPDATE_STATE_IDENTIFIER = 'update_state'
+# prefix of the identifiers of the stats entries of individual firmware (followed by the UID)
+FIRMWARE_STATS_PREFIX = 'firmware:'
+
 
 class StatsUpdateDbInterface(ReadWriteDbInterface):
     """
@@ -36,6 +60,78 @@ class StatsUpdateDbInterface(ReadWriteDbInterface):
         except SQLAlchemyError:
             logging.error(f'Could not save stats entry in the DB:\n{content_dict}')
 
+    def get_stats_data(self, identifier: str) -> dict | None:
+        with self.get_read_only_session() as session:
+            entry: StatsEntry = session.get(StatsEntry, identifier)
+            return entry.data if entry is not None else None
+
+    def delete_outdated_stats(self, prefix: str, modification_state: str | None):
+        """
+        Delete all stats entries whose identifier starts with `prefix` and that were not computed at the modification
+        state `modification_state` (see :py:func:`get_modification_state`).
+        """
+        query = delete(StatsEntry).where(StatsEntry.name.startswith(prefix))
+        if modification_state is not None:
+            query = query.where(StatsEntry.data['modification_state'].astext.is_distinct_from(modification_state))
+        with self.get_read_write_session() as session:
+            session.execute(query)
+
+    def get_modification_state(self) -> str | None:
+        """
+        Get the modification state of the tables the statistics are computed from: the total number of rows that were
+        inserted, updated or deleted in these tables (according to the cumulative statistics of PostgreSQL) together
+        with the time of the last reset of these statistics. The time is needed because the counters start again from
+        zero after a reset, so that the number alone could match an older state by chance. If the state did not
+        change, the statistics did not change either.
+
+        :return: The modification state or ``None`` if it is not available.
+        """
+        with self.get_read_only_session() as session:
+            count_query = select(
+                func.sum(
+                    PG_STAT_USER_TABLES.c.n_tup_ins + PG_STAT_USER_TABLES.c.n_tup_upd + PG_STAT_USER_TABLES.c.n_tup_del
+                )
+            ).filter(PG_STAT_USER_TABLES.c.relname.in_(STATS_SOURCE_TABLES))
+            count = session.execute(count_query).scalar()
+            if count is None:
+                return None
+            reset_query = select(PG_STAT_DATABASE.c.stats_reset).filter(
+                PG_STAT_DATABASE.c.datname == func.current_database()
+            )
+            stats_reset = session.execute(reset_query).scalar()
+            return f'{stats_reset}/{int(count)}'
+
+    def get_last_modification_state(self) -> str | None:
+        """
+        Get the modification state (see :py:func:`get_modification_state`) at the time of the last statistics update.
+        """
+        update_state = self.get_stats_data(UPDATE_STATE_IDENTIFIER)
+        return update_state.get('modification_state') if update_state is not None else None
+
+    def get_firmware_stats(self) -> dict[str, dict | None]:
+        """
+        Get the stats entries of individual firmware (see
+        :py:func:`statistic.update.StatsUpdater.update_firmware_stats`) for all firmware in the DB.
+
+        :return: A dict with the firmware UIDs as keys and the stats data as values (``None`` if there is no entry).
+        """
+        with self.get_read_only_session() as session:
+            query = select(FirmwareEntry.uid, StatsEntry.data).outerjoin(
+                StatsEntry, StatsEntry.name == literal(FIRMWARE_STATS_PREFIX) + FirmwareEntry.uid
+            )
+            return dict(session.execute(query).all())
+
+    def delete_stats_of_deleted_firmware(self):
+        firmware_exists = (
+            select(FirmwareEntry.uid)
+            .where(StatsEntry.name == literal(FIRMWARE_STATS_PREFIX) + FirmwareEntry.uid)
+            .exists()
+        )
+        with self.get_read_write_session() as session:
+            session.execute(
+                delete(StatsEntry).where(StatsEntry.name.startswith(FIRMWARE_STATS_PREFIX)).where(~firmware_exists)
+            )
+
     def get_count(self, q_filter: dict | None = None, firmware: bool = False) -> int:
         return self._get_aggregate(FileObjectEntry.uid, func.count, q_filter, firmware) or 0
 
@@ -160,9 +256,12 @@ class StatsUpdateDbInterface(ReadWriteDbInterface):
                 query = query.filter_by(**q_filter)
             return count_occurrences(session.execute(query).scalars())
 
-    def get_arch_stats(self, q_filter: dict | None = None) -> list[tuple[str, int, str]]:
+    def get_arch_stats(
+        self, q_filter: dict | None = None, firmware_uids: list[str] | None = None
+    ) -> list[tuple[str, int, str]]:
         """
         Get architecture stats per firmware. Returns tuples with arch, count, and root_uid.
+        If `firmware_uids` is set, only the stats of these firmware are returned.
         """
         with self.get_read_only_session() as session:
             # unnest (convert array column summary to individual rows) summary entries in a subquery
@@ -182,6 +281,8 @@ class StatsUpdateDbInterface(ReadWriteDbInterface):
             )
             if self._filter_is_not_empty(q_filter):
                 query = query.filter_by(**q_filter)
+            if firmware_uids is not None:
+                query = query.filter(FirmwareEntry.uid.in_(firmware_uids))
             return list(session.execute(query))
 
     def get_unpacking_file_types(self, summary_key: str, q_filter: dict | None = None) -> Stats:
@@ -236,6 +337,25 @@ class StatsUpdateDbInterface(ReadWriteDbInterface):
                 query = query.filter_by(**q_filter)
             return session.execute(query).scalar()
 
+    def get_regex_mime_match_counts(self, regex_list: list[str], q_filter: dict | None = None) -> list[int]:
+        """
+        Count the file type analyses whose full file type matches the regular expressions in ``regex_list``. All
+        expressions are matched in a single scan over the analysis table.
+
+        :param regex_list: A list of regular expressions (e.g. ``'^ELF.*executable'``).
+        :param q_filter: Additional query filter (e.g. ``{'device_class': 'router'}``)
+        :return: The number of matches for each expression (in the same order).
+        """
+        with self.get_read_only_session() as session:
+            full_type = AnalysisEntry.result['full'].astext
+            query = select(
+                *(func.count(AnalysisEntry.uid).filter(full_type.regexp_match(regex)) for regex in regex_list)
+            ).filter(AnalysisEntry.plugin == 'file_type')
+            if self._filter_is_not_empty(q_filter):
+                query = self._join_fw_or_fo(query, is_firmware=False)
+                query = query.filter_by(**q_filter)
+            return list(session.execute(query).one())
+
     def get_release_date_stats(self, q_filter: dict | None = None) -> list[tuple[int, int, int]]:
         with self.get_read_only_session() as session:
             query = select(
@@ -1,10 +1,16 @@
+from __future__ import annotations
+
 import logging
+import os
 from pathlib import Path
 
 from common_helper_files import delete_file, write_binary_to_file
 
 import config
 
+STORED_FILE_MODE = 0o644
+TAR_REPACK_CACHE_DIR_NAME = 'fact_tar_repack_cache'
+
 
 class FSOrganizer:
     """
@@ -15,15 +21,41 @@ class FSOrganizer:
         self.data_storage_path = Path(config.backend.firmware_file_storage_directory).absolute()
         self.data_storage_path.parent.mkdir(parents=True, exist_ok=True)
 
-    def store_file(self, file_object):
+    def store_file(self, file_object, move: bool = False):
+        """
+        Store the binary of ``file_object`` in the file storage and set its ``file_path`` accordingly.
+
+        :param file_object: The file object that should be stored.
+        :param move: If ``True``, the file at ``file_object.file_path`` is moved (renamed) into the storage instead of
+            writing the binary. It is only copied if this is not possible (e.g. if the storage is on another file
+            system). Only use this for temporary files (e.g. extracted files)!
+        """
         if file_object.binary is None:
             logging.error('Cannot store binary! No binary data specified')
         else:
             destination_path = self.generate_path(file_object)
-            write_binary_to_file(file_object.binary, destination_path, overwrite=False)
+            if not move or not self._move_file(file_object.file_path, destination_path):
+                write_binary_to_file(file_object.binary, destination_path, overwrite=False)
             file_object.file_path = destination_path
             file_object.create_binary_from_path()
 
+    @staticmethod
+    def _move_file(source_path: str | None, destination_path: str) -> bool:
+        if source_path is None:
+            return False
+        source, destination = Path(source_path), Path(destination_path)
+        if source.is_symlink() or not source.is_file():
+            return False
+        if destination.exists():
+            return True  # the file is already stored and files are never overwritten
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            source.rename(destination)
+        except OSError:  # e.g. the source is on another file system
+            return False
+        destination.chmod(STORED_FILE_MODE)  # extracted files can have arbitrary permissions
+        return True
+
     def delete_file(self, uid):
         local_file_path = self.generate_path_from_uid(uid)
         delete_file(local_file_path)
@@ -32,4 +64,42 @@ class FSOrganizer:
         return self.generate_path_from_uid(file_object.uid)
 
     def generate_path_from_uid(self, uid):
-        return str(self.data_storage_path / uid[0:2] / uid)
+        return str(_get_path_from_uid(self.data_storage_path, uid))
+
+
+def get_readable_file_path(uid: str) -> Path | None:
+    """
+    Get the path of the stored file with UID ``uid`` without going through the backend. This only works if this
+    process can read the storage directory (e.g. if the frontend runs on the same host as the backend or the storage
+    directory is mounted).
+
+    :param uid: The UID of the file.
+    :return: The path of the file or ``None`` if it does not exist or is not readable.
+    """
+    return _get_readable_file(_get_path_from_uid(Path(config.backend.firmware_file_storage_directory).absolute(), uid))
+
+
+def get_tar_repack_cache_dir() -> Path:
+    """
+    Get the directory in which repacked .tar.gz archives are cached (see :py:class:`unpacker.tar_repack.TarRepack`).
+    """
+    return Path(config.backend.temp_dir_path) / TAR_REPACK_CACHE_DIR_NAME
+
+
+def get_readable_repacked_archive_path(uid: str) -> Path | None:
+    """
+    Get the path of the cached .tar.gz archive of the stored file with UID ``uid`` without going through the backend
+    (see :py:func:`get_readable_file_path`).
+
+    :param uid: The UID of the file.
+    :return: The path of the archive or ``None`` if it is not cached or not readable.
+    """
+    return _get_readable_file(get_tar_repack_cache_dir() / f'{uid}.tar.gz')
+
+
+def _get_readable_file(file_path: Path) -> Path | None:
+    return file_path if file_path.is_file() and os.access(file_path, os.R_OK) else None
+
+
+def _get_path_from_uid(storage_path: Path, uid: str) -> Path:
+    return storage_path / uid[0:2] / uid
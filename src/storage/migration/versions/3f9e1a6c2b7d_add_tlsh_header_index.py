@@ -0,0 +1,30 @@
+"""Add TLSH header index
+
+Revision ID: 3f9e1a6c2b7d
+Revises: 70ae1212bc03
+Create Date: 2026-10-18 10:12:31.482104
+
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '3f9e1a6c2b7d'
+down_revision = '70ae1212bc03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_analysis_tlsh_header',
+        'analysis',
+        [text("upper(left(right(result ->> 'tlsh', 68), 4))")],
+        unique=False,
+        postgresql_where=text("plugin = 'file_hashes'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_tlsh_header', table_name='analysis')
@@ -24,28 +24,44 @@ class RedisInterface:
 
         self.redis = Redis(host=redis_host, port=redis_port, db=redis_db, password=redis_pw)
 
-    def set(self, key: str, value: Any):
-        self.redis.set(key, self._split_if_necessary(dumps(value)))
+    def set(self, key: str, value: Any, expire: int | None = None):
+        self.redis.set(key, self._split_if_necessary(dumps(value), expire=expire), ex=expire)
 
     def get(self, key: str, delete: bool = True) -> Any:
         value = self._redis_pop(key) if delete else self.redis.get(key)
         return self._combine_if_split(value, delete=delete)
 
-    def queue_put(self, key: str, value: Any):
-        self.redis.rpush(key, self._split_if_necessary(dumps(value)))
-
-    def queue_get(self, key: str) -> Any:
-        return self._combine_if_split(self.redis.lpop(key))
-
-    def _split_if_necessary(self, value: bytes) -> str | bytes:
-        return self._store_chunks(value) if len(value) > self.chunk_size else value
-
-    def _store_chunks(self, value) -> str:
+    def queue_put(self, key: str, value: Any, expire: int | None = None):
+        """
+        Append ``value`` to the queue ``key``. If ``expire`` is set, the queue (and the value) is deleted after
+        ``expire`` seconds (e.g. for responses that may never be picked up).
+        """
+        pipeline = self.redis.pipeline()
+        pipeline.rpush(key, self._split_if_necessary(dumps(value), expire=expire))
+        if expire is not None:
+            pipeline.expire(key, expire)
+        pipeline.execute()
+
+    def queue_get(self, key: str, timeout: float | None = None) -> Any:
+        """
+        Get the first element of the queue ``key``. If ``timeout`` is set, block (at most ``timeout`` seconds) until
+        an element is available instead of returning ``None`` immediately if the queue is empty.
+        """
+        if not timeout:
+            return self._combine_if_split(self.redis.lpop(key))
+        # Redis < 6.0 only accepts integer timeouts for BLPOP (and 0 would mean "block forever")
+        key_and_value = self.redis.blpop([key], timeout=max(1, ceil(timeout)))
+        return self._combine_if_split(key_and_value[1]) if key_and_value is not None else None
+
+    def _split_if_necessary(self, value: bytes, expire: int | None = None) -> str | bytes:
+        return self._store_chunks(value, expire) if len(value) > self.chunk_size else value
+
+    def _store_chunks(self, value, expire: int | None = None) -> str:
         meta_key = CHUNK_MAGIC.decode()
         for index in range(ceil(len(value) / self.chunk_size)):
             key = self._get_new_chunk_key()
             chunk = value[self.chunk_size * index : self.chunk_size * (index + 1)]
-            self.redis.set(key, chunk)
+            self.redis.set(key, chunk, ex=expire)
             meta_key += SEPARATOR + key
         return meta_key
 
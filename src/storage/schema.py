@@ -7,16 +7,16 @@ from sqlalchemy import (
     Date,
     Float,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     PrimaryKeyConstraint,
     Table,
-    delete,
-    event,
+    func,
 )
 from sqlalchemy.dialects.postgresql import ARRAY, CHAR, JSONB, VARCHAR
 from sqlalchemy.ext.mutable import MutableDict, MutableList
-from sqlalchemy.orm import Session, backref, declarative_base, mapped_column, relationship
+from sqlalchemy.orm import backref, declarative_base, mapped_column, relationship
 
 Base = declarative_base()
 UID = VARCHAR(78)
@@ -44,6 +44,13 @@ class AnalysisEntry(Base):
         return f'AnalysisEntry({self.uid}, {self.plugin}, {self.plugin_version})'
 
 
+#: The header of the TLSH hash in the result of the file_hashes plugin without the version prefix and the checksum
+#: (i.e. the hex encoded length value and quartile ratios). Similar files must have similar headers, so the index on
+#: this expression is used for finding candidates for similar files (see analysis plugin "tlsh").
+TLSH_HEADER = func.upper(func.left(func.right(AnalysisEntry.result['tlsh'].astext, 68), 4))
+Index('ix_analysis_tlsh_header', TLSH_HEADER, postgresql_where=AnalysisEntry.plugin == 'file_hashes')
+
+
 included_files_table = Table(
     'included_files',
     Base.metadata,
@@ -191,17 +198,3 @@ class VirtualFilePath(Base):
 
     # unique constraint: each combination of parent + child + path should be unique
     __table_args__ = (PrimaryKeyConstraint('parent_uid', 'file_uid', 'file_path', name='_vfp_primary_key'),)
-
-
-@event.listens_for(Session, 'persistent_to_deleted')
-def delete_file_orphans(session, deleted_object):
-    """
-    If a firmware is deleted, delete all "orphaned" files: files that do not belong to any firmware anymore (and also
-    are not a firmware themselves).
-    """
-    if isinstance(deleted_object, FirmwareEntry):
-        session.execute(
-            delete(FileObjectEntry)
-            .where(~FileObjectEntry.is_firmware, ~FileObjectEntry.root_firmware.any())
-            .execution_options(synchronize_session='fetch')
-        )
@@ -0,0 +1,68 @@
+"""
+Benchmark for the hash computation of the file_hashes plugin: computing each hash separately over the whole binary
+(the old behaviour of the plugin) compared to :py:func:`helperFunctions.hash.get_hashes` (all hashes are computed in a
+single pass over chunks of a memory-mapped file).
+
+Usage (from the src directory): ``python -m test.benchmark.file_hashes [--sizes SIZE [SIZE ...]] [--files N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+
+from helperFunctions.fileSystem import map_file
+from helperFunctions.hash import get_hash, get_hashes, get_ssdeep, get_tlsh
+
+HASH_FUNCTIONS = ['md5', 'sha1', 'sha256', 'sha512']
+DEFAULT_SIZES = [1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 128 * 1024 * 1024]
+
+
+def hash_separately(file_path: Path) -> dict[str, str]:
+    binary = file_path.read_bytes()
+    result = {name: get_hash(name, binary) for name in HASH_FUNCTIONS}
+    result['ssdeep'] = get_ssdeep(binary)
+    result['tlsh'] = get_tlsh(binary)
+    return result
+
+
+def hash_in_single_pass(file_path: Path) -> dict[str, str]:
+    with map_file(file_path) as binary:
+        return get_hashes(binary, HASH_FUNCTIONS)
+
+
+def _seconds_per_file(hash_function, file_paths: list[Path]) -> float:
+    start = time()
+    for file_path in file_paths:
+        hash_function(file_path)
+    return (time() - start) / len(file_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare separate and single-pass hashing of the file_hashes plugin')
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='file sizes in bytes (default: %(default)s)'
+    )
+    parser.add_argument('--files', type=int, default=3, help='number of files per size (default: %(default)s)')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            file_paths = []
+            for index in range(args.files):
+                file_path = Path(tmp_dir) / f'{size}_{index}'
+                file_path.write_bytes(os.urandom(size))
+                file_paths.append(file_path)
+            separate = _seconds_per_file(hash_separately, file_paths)
+            single_pass = _seconds_per_file(hash_in_single_pass, file_paths)
+            print(f'{size:>10} bytes: separate {separate * 1000:10.3f} ms/file', end=', ')  # noqa: T201
+            print(f'single pass {single_pass * 1000:10.3f} ms/file')  # noqa: T201
+            for file_path in file_paths:
+                file_path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark for running analysis tasks in a new process per task (the old behaviour of the analysis plugins) compared
+to running them in a persistent process (:py:class:`helperFunctions.process.PersistentProcess`).
+
+Usage (from the src directory): ``python -m test.benchmark.persistent_process [--tasks N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+from multiprocessing import Manager
+from time import time
+
+from helperFunctions.process import ExceptionSafeProcess, PersistentProcess
+
+TIMEOUT = 10
+
+
+def _analyze(binary: bytes) -> dict:
+    # a cheap analysis (similar to the file_hashes plugin on a small file)
+    return {algorithm: hashlib.new(algorithm, binary).hexdigest() for algorithm in ['md5', 'sha1', 'sha256']}
+
+
+def _analyze_with_result_list(binary: bytes, result: list):
+    result.append(_analyze(binary))
+
+
+def run_with_process_per_task(tasks: list[bytes]):
+    manager = Manager()
+    for binary in tasks:
+        result = manager.list()
+        process = ExceptionSafeProcess(target=_analyze_with_result_list, args=(binary, result), reraise=False)
+        process.start()
+        process.join(timeout=TIMEOUT)
+        result.pop()
+    manager.shutdown()
+
+
+def run_with_persistent_process(tasks: list[bytes]):
+    process = PersistentProcess(_analyze)
+    for binary in tasks:
+        process.run_task(binary, timeout=TIMEOUT)
+    process.stop()
+
+
+def _files_per_second(function, tasks: list[bytes]) -> float:
+    start = time()
+    function(tasks)
+    return len(tasks) / (time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare process per task and persistent process')
+    parser.add_argument('--tasks', type=int, default=500, help='number of analyzed files (default: %(default)s)')
+    parser.add_argument('--size', type=int, default=1024, help='size of the files in bytes (default: %(default)s)')
+    args = parser.parse_args()
+
+    tasks = [os.urandom(args.size) for _ in range(args.tasks)]
+    for label, function in [
+        ('process per task', run_with_process_per_task),
+        ('persistent process', run_with_persistent_process),
+    ]:
+        print(f'{label:>20}: {_files_per_second(function, tasks):8.1f} files/s')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
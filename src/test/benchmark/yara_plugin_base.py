@@ -0,0 +1,71 @@
+"""
+Benchmark for the per-file latency of :py:class:`analysis.YaraPluginBase.YaraBasePlugin` when matching with the yara
+command line tool (one process per file that loads the rules again each time) compared to yara-python (rules are
+loaded once per process).
+
+Usage (from the src directory): ``python -m test.benchmark.yara_plugin_base [--files N] [--rules PATH]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+
+from analysis.YaraPluginBase import YaraBasePlugin
+from helperFunctions.fileSystem import get_src_dir
+from objects.file import FileObject
+
+DEFAULT_RULES = str(Path(get_src_dir()) / 'test/unit/analysis/test.yara')
+
+
+class _BenchmarkPlugin(YaraBasePlugin):
+    NAME = 'yara_benchmark'
+
+    def __init__(self, signature_path: str):
+        # we don't need the plugin workers etc. here -> skip the initialization of AnalysisBasePlugin
+        self.signature_path = signature_path
+
+
+class _CliBenchmarkPlugin(_BenchmarkPlugin):
+    def process_object(self, file_object):
+        result = self._parse_yara_output(self._run_yara_cli(file_object.file_path))
+        file_object.processed_analysis[self.NAME] = result
+        return file_object
+
+
+def _ms_per_file(plugin: YaraBasePlugin, file_objects: list[FileObject]) -> float:
+    start = time()
+    for file_object in file_objects:
+        plugin.process_object(file_object)
+    return (time() - start) / len(file_objects) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the yara CLI and yara-python in YaraBasePlugin')
+    parser.add_argument('--files', type=int, default=200, help='number of analyzed files (default: %(default)s)')
+    parser.add_argument('--size', type=int, default=64 * 1024, help='size of the files in bytes (default: %(default)s)')
+    parser.add_argument('--rules', default=DEFAULT_RULES, help='YARA rule file (default: %(default)s)')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp_dir:
+        file_objects = []
+        for index in range(args.files):
+            file_path = Path(tmp_dir) / str(index)
+            file_path.write_bytes(os.urandom(args.size))
+            file_objects.append(FileObject(file_path=str(file_path)))
+
+        benchmarks = [('yara-python', _BenchmarkPlugin(args.rules))]
+        if shutil.which('yara'):
+            benchmarks.insert(0, ('yara CLI', _CliBenchmarkPlugin(args.rules)))
+        else:
+            print('yara CLI not found: skipping CLI benchmark')  # noqa: T201
+        for label, plugin in benchmarks:
+            print(f'{label:>12}: {_ms_per_file(plugin, file_objects):8.3f} ms/file')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
@@ -135,6 +135,10 @@ class MockFileObject:
         self.file_path = file_path
         self.processed_analysis = {'file_type': {'result': {'mime': 'application/x-executable'}}}
 
+    @contextmanager
+    def open_binary(self):
+        yield self.binary
+
 
 class CommonDatabaseMock:
     fw_uid = TEST_FW.uid
@@ -36,9 +36,19 @@ class MockDbInterface:
     def add_object(self, fo_fw):
         self._objects[fo_fw.uid] = fo_fw
 
+    def add_child_entries(self, _, new_objects=None):
+        for fo in new_objects or []:
+            self._objects[fo.uid] = fo
+
+    def add_analyses(self, *_):
+        pass
+
     def get_analysis(self, *_):
         pass
 
+    def get_analysis_metadata_for_uid_list(self, *_):
+        return {}
+
     def add_analysis(self, *_):
         pass
 
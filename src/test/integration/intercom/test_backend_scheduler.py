@@ -6,7 +6,7 @@ import pytest
 from intercom.back_end_binding import InterComBackEndBinding
 
 # This number must be changed, whenever a listener is added or removed
-NUMBER_OF_LISTENERS = 12
+NUMBER_OF_LISTENERS = 13
 
 
 class ServiceMock:
@@ -26,7 +26,7 @@ class CommunicationBackendMock:
     def __init__(self):
         pass
 
-    def get_next_task(self):
+    def get_next_task(self, timeout=None):
         self.counter.value += 1
         return 'test_task' if self.counter.value < 2 else None  # noqa: PLR2004
 
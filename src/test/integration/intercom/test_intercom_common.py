@@ -1,8 +1,10 @@
 import os
 
 import pytest
+from redis.exceptions import RedisError
 
 from helperFunctions.data_conversion import convert_str_to_bool
+from intercom import common_redis_binding
 from intercom.common_redis_binding import InterComListener
 from storage.redis_interface import REDIS_MAX_VALUE_SIZE
 
@@ -28,6 +30,17 @@ def test_small_file(listener):
     check_file(b'this is a test', listener)
 
 
+def test_redis_error(listener, monkeypatch):
+    def _raise_error(*_, **__):
+        raise RedisError('timeout is not an integer or out of range')
+
+    delays = []
+    monkeypatch.setattr(listener.redis, 'queue_get', _raise_error)
+    monkeypatch.setattr(common_redis_binding, 'sleep', delays.append)
+    assert listener.get_next_task(timeout=1.0) is None
+    assert delays == [common_redis_binding.REDIS_ERROR_DELAY], 'should wait after an error to avoid a busy loop'
+
+
 @pytest.mark.skipif(not convert_str_to_bool(os.environ.get('RUN_EXPENSIVE_TESTS', '0')), reason='should not run on CI')
 def test_big_file(listener):
     large_test_data = b'\x00' * int(REDIS_MAX_VALUE_SIZE * 1.2)
@@ -18,9 +18,11 @@ from intercom.back_end_binding import (
     InterComBackEndRawDownloadTask,
     InterComBackEndReAnalyzeTask,
     InterComBackEndSingleFileTask,
+    InterComBackEndTarRepackPathTask,
     InterComBackEndTarRepackTask,
 )
 from intercom.front_end_binding import InterComFrontEndBinding
+from storage.fsorganizer import get_tar_repack_cache_dir
 from test.common_helper import create_test_firmware
 
 
@@ -159,20 +161,45 @@ class TestInterComTaskCommunication:
         result = intercom_frontend.get_repacked_binary_and_file_name('valid_uid_0.0')
         assert result == (b'test', 'test.tar'), 'retrieved binary not correct'
 
+    def test_tar_repack_path_task(self, intercom_frontend, monkeypatch):
+        cache_dir = get_tar_repack_cache_dir()
+        cache_dir.mkdir(exist_ok=True)  # the backend is only asked if the frontend can read the cache
+
+        def _repack(_, uid):
+            (cache_dir / f'{uid}.tar.gz').write_bytes(b'test')
+            return 'test.tar.gz'
+
+        monkeypatch.setattr('intercom.back_end_binding.BinaryService.get_repacked_archive_file_name', _repack)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            result_future = pool.submit(intercom_frontend.get_readable_repacked_archive, 'valid_uid')
+            task_listener = InterComBackEndTarRepackPathTask()
+            task = task_listener.get_next_task(timeout=5)
+            assert task == 'valid_uid', 'task not correct'
+            archive_path, file_name = result_future.result()
+        try:
+            assert archive_path == cache_dir / 'valid_uid.tar.gz'
+            assert archive_path.read_bytes() == b'test'
+            assert file_name == 'test.tar.gz'
+        finally:
+            (cache_dir / 'valid_uid.tar.gz').unlink()
+
     def test_binary_search_task(self, intercom_frontend, monkeypatch):
         yara_rule, expected_result = b'yara rule', 'result'
         monkeypatch.setattr(
             'intercom.back_end_binding.YaraBinarySearchScanner.get_binary_search_result', lambda *_: expected_result
         )
-        result = intercom_frontend.add_binary_search_request(yara_rule)
-        assert result is not None
+        search_id = intercom_frontend.add_binary_search_request(yara_rule)
+        assert search_id is not None
+        assert intercom_frontend.get_binary_search_progress(search_id) is not None, 'queued search should be running'
 
         task_listener = InterComBackEndBinarySearchTask()
         task = task_listener.get_next_task()
         assert task == (yara_rule, None), 'task not correct'
 
-        result = intercom_frontend.get_binary_search_result(result)
+        result = intercom_frontend.get_binary_search_result(search_id)
         assert result == (expected_result, task)
+        assert not intercom_frontend.cancel_binary_search(search_id), 'finished search should not be cancellable'
+        assert intercom_frontend.redis.get(f'{search_id}_cancel', delete=False) is None
 
     def test_logs_task(self, intercom_frontend, monkeypatch):
         with NamedTemporaryFile() as tmp_file:
@@ -220,6 +220,36 @@ def test_get_architecture_stats(stats_updater, backend_db):
     assert stats_updater.get_architecture_stats() == {'cpu_architecture': []}
 
 
+def test_get_architecture_stats_from_firmware_stats(stats_updater, backend_db):
+    insert_test_fw(backend_db, 'fw1')
+    insert_test_fo(
+        backend_db,
+        'fo1',
+        parent_fw='fw1',
+        analysis={'cpu_architecture': generate_analysis_entry(summary=['MIPS, 32-bit, big endian (M)'])},
+    )
+    insert_test_fw(backend_db, 'fw2')
+
+    assert stats_updater.get_architecture_stats() == {'cpu_architecture': [('MIPS, 32-bit', 1)]}
+    assert stats_updater.db.get_stats_data('firmware:fw1') == {'architecture': 'MIPS, 32-bit'}
+    assert stats_updater.db.get_stats_data('firmware:fw2') == {'architecture': None}
+
+    insert_test_fo(
+        backend_db,
+        'fo2',
+        parent_fw='fw2',
+        analysis={'cpu_architecture': generate_analysis_entry(summary=['ARM, 32-bit, big endian (M)'])},
+    )
+    stats = stats_updater.get_architecture_stats()
+    assert stats == {'cpu_architecture': [('MIPS, 32-bit', 1)]}, 'the stored entries should be used'
+    stats_updater.update_firmware_stats('fw2')
+    assert stats_updater.db.get_stats_data('firmware:fw2') == {'architecture': 'ARM, 32-bit'}
+    assert sorted(stats_updater.get_architecture_stats()['cpu_architecture']) == [
+        ('ARM, 32-bit', 1),
+        ('MIPS, 32-bit', 1),
+    ]
+
+
 def test_get_executable_stats(backend_db, stats_updater):
     for i, file_str in enumerate(
         [
@@ -330,3 +360,68 @@ def test_get_software_components_stats(stats_updater, backend_db):
 
     stats_updater.set_match({'vendor': 'unknown'})
     assert stats_updater.get_software_components_stats()['software_components'] == []
+
+
+def test_update_all_stats_skipped_without_changes(stats_updater, monkeypatch):
+    monkeypatch.setattr(stats_updater.db, 'get_modification_state', lambda: 'reset_time/42')
+    updated = []
+    monkeypatch.setattr(stats_updater.db, 'update_statistic', lambda identifier, _: updated.append(identifier))
+    monkeypatch.setattr(stats_updater.db, 'get_last_modification_state', lambda: 'reset_time/41')
+    stats_updater.update_all_stats()
+    assert 'general' in updated
+    assert updated[-1] == 'update_state'
+
+    updated.clear()
+    monkeypatch.setattr(stats_updater.db, 'get_last_modification_state', lambda: 'reset_time/42')
+    stats_updater.update_all_stats()
+    assert updated == [], 'there were no changes -> stats should not be updated'
+    stats_updater.update_all_stats(force=True)
+    assert 'general' in updated
+
+    updated.clear()
+    monkeypatch.setattr(stats_updater.db, 'get_modification_state', lambda: 'later_reset_time/42')
+    stats_updater.update_all_stats()
+    assert 'general' in updated, 'the stats were reset in the meantime -> the count alone is not meaningful'
+
+
+def test_get_filtered_stats_cached(stats_updater, backend_db, monkeypatch):
+    insert_test_fw(backend_db, 'uid1', vendor='foobar')
+    monkeypatch.setattr(stats_updater.db, 'get_modification_state', lambda: 'reset_time/42')
+    stats = stats_updater.get_filtered_stats({'vendor': 'foobar'})
+    assert stats['general_stats']['number_of_firmwares'] == 1
+    cache_entry = stats_updater.db.get_stats_data('filtered:{"vendor": "foobar"}')
+    assert cache_entry['modification_state'] == 'reset_time/42'
+
+    insert_test_fw(backend_db, 'uid2', vendor='foobar')
+    stats = StatsUpdater(stats_db=stats_updater.db).get_filtered_stats({'vendor': 'foobar'})
+    assert stats['general_stats']['number_of_firmwares'] == 1, 'DB was not modified -> should be served from cache'
+
+    monkeypatch.setattr(stats_updater.db, 'get_modification_state', lambda: 'reset_time/43')
+    stats = StatsUpdater(stats_db=stats_updater.db).get_filtered_stats({'vendor': 'foobar'})
+    assert stats['general_stats']['number_of_firmwares'] == 2, 'DB was modified -> cache invalid'  # noqa: PLR2004
+
+
+def test_precompute_filtered_stats(stats_updater, backend_db):
+    insert_test_fw(backend_db, 'uid1', vendor='foo', device_class='router')
+    insert_test_fw(backend_db, 'uid2', vendor='foo', device_class='router')
+    insert_test_fw(backend_db, 'uid3', vendor='bar', device_class='camera')
+    stats_updater.precompute_filtered_stats(count=1)
+    assert stats_updater.db.get_stats_data('filtered:{"vendor": "foo"}') is not None
+    assert stats_updater.db.get_stats_data('filtered:{"device_class": "router"}') is not None
+    assert stats_updater.db.get_stats_data('filtered:{"vendor": "bar"}') is None
+
+
+def test_update_all_stats_deletes_outdated_filtered_stats(stats_updater, monkeypatch):
+    stats_updater.db.update_statistic(
+        'filtered:{"vendor": "old"}', {'modification_state': 'reset_time/41', 'stats': {}}
+    )
+    stats_updater.db.update_statistic(
+        'filtered:{"vendor": "new"}', {'modification_state': 'reset_time/42', 'stats': {}}
+    )
+    stats_updater.db.update_statistic('filtered:{"vendor": "legacy"}', {'modification_count': 42, 'stats': {}})
+    monkeypatch.setattr(stats_updater.db, 'get_modification_state', lambda: 'reset_time/42')
+    stats_updater.update_all_stats()
+    assert stats_updater.db.get_stats_data('filtered:{"vendor": "old"}') is None
+    assert stats_updater.db.get_stats_data('filtered:{"vendor": "legacy"}') is None
+    assert stats_updater.db.get_stats_data('filtered:{"vendor": "new"}') is not None
+    assert stats_updater.db.get_stats_data('general') is not None, 'other stats should not be deleted'
@@ -27,3 +27,5 @@ def test_update_workload_statistic(workload_stat, stats_db):
     assert isclose(time(), result['last_update'], abs_tol=0.1), 'timestamp not valid'
     assert isinstance(result['platform'], dict), 'platform is not a dict'
     assert isinstance(result['system'], dict), 'system is not a dict'
+    assert result['database']['connections_opened'] > 0, 'the statistics DB connection should be counted'
+    assert result['database']['connections_opened_per_second'] >= 0
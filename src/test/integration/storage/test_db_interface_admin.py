@@ -1,5 +1,5 @@
 from ...common_helper import create_test_file_object, create_test_firmware
-from .helper import TEST_FW, create_fw_with_child_fo, create_fw_with_parent_and_child
+from .helper import TEST_FW, add_included_file, create_fw_with_child_fo, create_fw_with_parent_and_child
 
 
 def test_delete_fo(admin_db, common_db, backend_db):
@@ -73,3 +73,20 @@ def test_same_fw_multiple_parents(backend_db, admin_db, common_db):
     assert common_db.exists(parent.uid) is False, 'should have been deleted by cascade'
     assert common_db.exists(parent2.uid) is False, 'should have been deleted by cascade'
     assert common_db.exists(child.uid) is False, 'should have been deleted by cascade'
+
+
+def test_delete_firmware_only_affects_its_files(backend_db, admin_db, common_db):
+    fo, fw = create_fw_with_child_fo()
+    fw2 = create_test_firmware()
+    fw2.uid = 'fw2_uid'
+    fo2 = create_test_file_object()
+    fo2.uid = 'fo2_uid'
+    add_included_file(fo2, fw2, fw2)
+    backend_db.insert_multiple_objects(fw, fo, fw2, fo2)
+
+    assert admin_db.delete_firmware(fw.uid) == (0, 2)
+
+    assert set(admin_db.intercom.deleted_files) == {fw.uid, fo.uid}
+    assert common_db.exists(fo.uid) is False
+    assert common_db.exists(fw2.uid) is True
+    assert common_db.exists(fo2.uid) is True
@@ -70,6 +70,43 @@ def test_add_vfp(backend_db, admin_db):
     assert backend_db.get_vfps(child_fo.uid) == {}, 'VFP should have been deleted by cascade'
 
 
+def test_add_child_entries(backend_db, common_db):
+    fw, parent_fo, child_fo = create_fw_with_parent_and_child()
+    backend_db.insert_multiple_objects(fw, parent_fo, child_fo)
+
+    backend_db.add_child_entries(
+        [
+            (fw.uid, child_fo.uid, ['/foo', '/bar']),
+            (fw.uid, child_fo.uid, ['/foo']),  # duplicates should be ignored
+            (parent_fo.uid, child_fo.uid, ['/baz']),
+        ]
+    )
+    vfp_dict = common_db.get_vfps(child_fo.uid)
+    assert sorted(vfp_dict[fw.uid]) == ['/bar', '/foo']
+    assert sorted(vfp_dict[parent_fo.uid]) == ['/baz', f'/folder/{child_fo.file_name}']
+    assert common_db.get_object(child_fo.uid).parents == {fw.uid, parent_fo.uid}
+
+    # adding existing entries again should not cause an exception
+    backend_db.add_child_entries([(fw.uid, child_fo.uid, ['/foo'])])
+    backend_db.add_child_entries([])
+
+
+def test_add_child_entries_new_objects(backend_db, common_db):
+    fw, parent_fo, child_fo = create_fw_with_parent_and_child()
+    backend_db.insert_multiple_objects(fw, parent_fo)
+
+    backend_db.add_child_entries([], new_objects=[child_fo])
+    assert common_db.exists(child_fo.uid)
+    stored_fo = common_db.get_object(child_fo.uid)
+    assert stored_fo.parents == {parent_fo.uid}
+    assert stored_fo.file_name == child_fo.file_name
+    assert common_db.get_parent_fw(child_fo.uid) == {fw.uid}
+    assert common_db.get_vfps(child_fo.uid) == {parent_fo.uid: [f'/folder/{child_fo.file_name}']}
+
+    # the file may have been stored as part of another firmware already
+    backend_db.add_child_entries([], new_objects=[child_fo])
+
+
 def test_vfp_multiple_parents(common_db, backend_db, admin_db):
     fw, parent_fo, fo = create_fw_with_parent_and_child()
     fo.virtual_file_path = {parent_fo.uid: ['foo']}
@@ -233,6 +270,54 @@ def test_update_analysis(backend_db, common_db):
     assert analysis['plugin_version'] == updated_analysis_data['plugin_version']
 
 
+def test_add_analyses(backend_db, common_db):
+    backend_db.insert_file_object(TEST_FO)
+    existing_plugin = next(iter(TEST_FO.processed_analysis))
+    analysis_data = {
+        'summary': ['sum 1'],
+        'result': {'foo': 'bar'},
+        'plugin_version': '2',
+        'analysis_date': 2.0,
+        'tags': {},
+        'system_version': '1.2',
+    }
+    backend_db.add_analyses(
+        [
+            (TEST_FO.uid, 'new_plugin', analysis_data),
+            (TEST_FO.uid, existing_plugin, analysis_data),
+            ('unknown_uid', 'new_plugin', analysis_data),  # should be ignored
+            (TEST_FO.uid, 'incomplete_plugin', {'result': {}}),  # should be ignored
+        ]
+    )
+    assert common_db.get_analysis(TEST_FO.uid, 'new_plugin') == analysis_data
+    assert common_db.get_analysis(TEST_FO.uid, existing_plugin) == analysis_data
+    assert common_db.get_analysis(TEST_FO.uid, 'incomplete_plugin') is None
+    assert not common_db.exists('unknown_uid')
+
+
+def test_add_analyses_invalid_row(backend_db, common_db):
+    backend_db.insert_file_object(TEST_FO)
+    analysis_data = {
+        'summary': ['sum 1'],
+        'result': {'foo': 'bar'},
+        'plugin_version': '2',
+        'analysis_date': 2.0,
+        'tags': {},
+        'system_version': '1.2',
+    }
+    invalid_data = {**analysis_data, 'summary': ['string literals must not contain NUL \x00']}
+    backend_db.add_analyses(
+        [
+            (TEST_FO.uid, 'plugin_1', analysis_data),
+            (TEST_FO.uid, 'invalid_plugin', invalid_data),
+            (TEST_FO.uid, 'plugin_2', analysis_data),
+        ]
+    )
+    assert common_db.get_analysis(TEST_FO.uid, 'invalid_plugin') is None
+    assert common_db.get_analysis(TEST_FO.uid, 'plugin_1') == analysis_data
+    assert common_db.get_analysis(TEST_FO.uid, 'plugin_2') == analysis_data, 'the rest of the batch should be stored'
+
+
 def test_get_parent_fw(backend_db, common_db):
     fw, parent_fo, child_fo = create_fw_with_parent_and_child()
     fw2 = create_test_firmware()
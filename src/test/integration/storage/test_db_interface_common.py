@@ -104,6 +104,21 @@ def test_all_files_in_fo(backend_db, common_db):
     assert common_db.get_all_files_in_fo(parent_fo) == {parent_fo.uid, child_fo.uid}
 
 
+def test_all_files_in_fo_nested(backend_db, common_db):
+    # fw -> parent_fo -> child_fo -> grandchild_fo
+    fw, parent_fo, child_fo = create_fw_with_parent_and_child()
+    grandchild_fo = create_test_file_object()
+    grandchild_fo.uid = 'grandchild_uid'
+    add_included_file(grandchild_fo, child_fo, fw)
+    backend_db.insert_multiple_objects(fw, parent_fo, child_fo, grandchild_fo)
+    assert common_db.get_all_files_in_fo(parent_fo) == {parent_fo.uid, child_fo.uid, grandchild_fo.uid}
+    assert common_db.get_all_files_in_fo(grandchild_fo) == {grandchild_fo.uid}
+
+    # a file that contains itself should not lead to an endless recursion
+    backend_db.add_child_to_parent(parent_uid=grandchild_fo.uid, child_uid=child_fo.uid)
+    assert common_db.get_all_files_in_fo(child_fo) == {child_fo.uid, grandchild_fo.uid}
+
+
 def test_get_objects_by_uid_list(backend_db, common_db):
     fo, fw = create_fw_with_child_fo()
     backend_db.insert_multiple_objects(fw, fo)
@@ -127,6 +142,24 @@ def test_get_analysis(backend_db, common_db):
     assert result['system_version'] is None
 
 
+def test_get_analysis_metadata_for_uid_list(backend_db, common_db):
+    backend_db.insert_object(TEST_FW)
+    backend_db.add_analysis(
+        TEST_FW.uid, 'failed_plugin', {'result': {'failed': 'reason'}, 'plugin_version': '1.0', 'analysis_date': 1.0}
+    )
+    result = common_db.get_analysis_metadata_for_uid_list([TEST_FW.uid, 'unknown_uid'])
+    assert set(result) == {TEST_FW.uid}
+    assert set(result[TEST_FW.uid]) == {*TEST_FW.processed_analysis, 'failed_plugin'}
+    assert result[TEST_FW.uid]['file_type'] == {
+        'plugin_version': TEST_FW.processed_analysis['file_type']['plugin_version'],
+        'system_version': None,
+        'analysis_date': TEST_FW.processed_analysis['file_type']['analysis_date'],
+        'failed': False,
+    }
+    assert result[TEST_FW.uid]['failed_plugin']['failed'] is True
+    assert common_db.get_analysis_metadata_for_uid_list([]) == {}
+
+
 def test_get_complete_object(backend_db, common_db):
     fw, parent_fo, child_fo = create_fw_with_parent_and_child()
     fw.processed_analysis['test_plugin'] = generate_analysis_entry(summary=['entry0'])
@@ -151,6 +184,19 @@ def test_get_complete_object(backend_db, common_db):
     _summary_is_equal(expected_summary, result.processed_analysis['test_plugin']['summary'])
 
 
+def test_get_complete_object_multiple_plugins(backend_db, common_db):
+    fo, fw = create_fw_with_child_fo()
+    fw.processed_analysis['plugin_1'] = generate_analysis_entry(summary=['a'])
+    fo.processed_analysis['plugin_1'] = generate_analysis_entry(summary=['a', 'b'])
+    fo.processed_analysis['plugin_2'] = generate_analysis_entry(summary=['c'])
+    fw.processed_analysis['plugin_2'] = generate_analysis_entry(summary=[])
+    backend_db.insert_multiple_objects(fw, fo)
+
+    result = common_db.get_complete_object_including_all_summaries(fw.uid)
+    _summary_is_equal({'a': [fw.uid, fo.uid], 'b': [fo.uid]}, result.processed_analysis['plugin_1']['summary'])
+    _summary_is_equal({'c': [fo.uid]}, result.processed_analysis['plugin_2']['summary'])
+
+
 def _summary_is_equal(expected_summary, summary):
     assert all(key in summary for key in expected_summary)
     assert all(set(expected_summary[key]) == set(summary[key]) for key in expected_summary)
@@ -110,6 +110,13 @@ def test_get_vfp_of_included_text_files(backend_db, comparison_db):
     assert result == {'/folder/testfile1': {fo.uid}}
 
 
+def test_get_ssdeep_hashes(backend_db, comparison_db):
+    fo, fw = create_fw_with_child_fo()
+    fo.processed_analysis['file_hashes'] = generate_analysis_entry(analysis_result={'ssdeep': '3:abc:def'})
+    backend_db.insert_multiple_objects(fw, fo)
+    assert comparison_db.get_ssdeep_hashes([fo.uid, fw.uid, 'unknown']) == {fo.uid: '3:abc:def'}
+
+
 def _create_comparison(uid1='uid1', uid2='uid2'):
     fw_one = create_test_firmware()
     fw_one.uid = uid1
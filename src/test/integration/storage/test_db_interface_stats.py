@@ -362,6 +362,40 @@ def test_get_used_unpackers(backend_db, stats_update_db):
     assert stats_update_db.get_used_unpackers(q_filter={'vendor': 'other'}) == []
 
 
+def test_get_regex_mime_match_counts(backend_db, stats_update_db):
+    insert_test_fw(backend_db, 'root_fw', vendor='foobar')
+    for uid, full_type in [('fo1', 'ELF 32-bit LSB executable'), ('fo2', 'ELF 64-bit LSB executable'), ('fo3', 'data')]:
+        insert_test_fo(
+            backend_db,
+            uid,
+            parent_fw='root_fw',
+            analysis={'file_type': generate_analysis_entry(analysis_result={'full': full_type})},
+        )
+
+    regex_list = ['^ELF', '^ELF 64-bit', '^foo']
+    assert stats_update_db.get_regex_mime_match_counts(regex_list) == [2, 1, 0]
+    assert stats_update_db.get_regex_mime_match_counts(regex_list, q_filter={'vendor': 'foobar'}) == [2, 1, 0]
+    assert stats_update_db.get_regex_mime_match_counts(regex_list, q_filter={'vendor': 'other'}) == [0, 0, 0]
+
+
+def test_get_last_modification_state(stats_update_db):
+    assert stats_update_db.get_last_modification_state() is None
+    stats_update_db.update_statistic('update_state', {'modification_state': 'reset_time/42'})
+    assert stats_update_db.get_last_modification_state() == 'reset_time/42'
+
+
+def test_get_firmware_stats(backend_db, stats_update_db):
+    insert_test_fw(backend_db, 'fw1')
+    insert_test_fw(backend_db, 'fw2')
+    stats_update_db.update_statistic('firmware:fw1', {'architecture': 'MIPS, 32-bit'})
+    stats_update_db.update_statistic('firmware:deleted_fw', {'architecture': 'ARM, 32-bit'})
+    assert stats_update_db.get_firmware_stats() == {'fw1': {'architecture': 'MIPS, 32-bit'}, 'fw2': None}
+
+    stats_update_db.delete_stats_of_deleted_firmware()
+    assert stats_update_db.get_stats_data('firmware:fw1') is not None
+    assert stats_update_db.get_stats_data('firmware:deleted_fw') is None
+
+
 def test_count_occurrences():
     test_list = ['A', 'B', 'B', 'C', 'C', 'C']
     result = set(count_occurrences(test_list))
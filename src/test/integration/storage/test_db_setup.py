@@ -1,5 +1,9 @@
+from multiprocessing import Process
+
 import pytest
+from sqlalchemy import event
 
+from storage.db_connection import get_opened_connection_count
 from storage.db_setup import DbSetup
 
 
@@ -18,3 +22,35 @@ def test_db_exists(db_setup, common_config):
     db_name = common_config.postgres.database
     assert db_setup.database_exists(db_name)
     assert not db_setup.database_exists('foobar')
+
+
+def test_engine_is_shared(db_setup):
+    assert DbSetup().connection.engine is db_setup.connection.engine
+    assert DbSetup(isolation_level='AUTOCOMMIT').connection.engine is not db_setup.connection.engine
+
+
+def test_connections_are_reused(db_setup):
+    db_setup.user_exists('foobar')  # make sure there is a pooled connection
+    opened_connections = []
+
+    def _count_connect(*_):
+        opened_connections.append(1)
+
+    engine = db_setup.connection.engine
+    event.listen(engine, 'connect', _count_connect)
+    try:
+        for _ in range(5):
+            db_setup.user_exists('foobar')
+    finally:
+        event.remove(engine, 'connect', _count_connect)
+    assert not opened_connections, 'pooled connection should be reused'
+
+
+def test_opened_connections_are_counted_across_processes(db_setup):
+    db_setup.user_exists('foobar')
+    opened = get_opened_connection_count()
+    process = Process(target=db_setup.user_exists, args=('foobar',))
+    process.start()
+    process.join()
+    # the pool of the child process is reset after the fork -> it must open a new connection
+    assert get_opened_connection_count() == opened + 1
@@ -1,4 +1,5 @@
 from os import urandom
+from time import time
 
 import pytest
 
@@ -52,3 +53,35 @@ def test_queue_chunked(redis):
     assert list_item.startswith(CHUNK_MAGIC)
     assert redis.queue_get('key') == value
     assert redis.queue_get('key') is None
+
+
+def test_queue_get_blocking(redis):
+    start = time()
+    assert redis.queue_get('key', timeout=0.5) is None
+    assert time() - start >= 0.5  # noqa: PLR2004
+    redis.queue_put('key', 'value')
+    assert redis.queue_get('key', timeout=0.5) == 'value'
+
+
+def test_queue_get_fractional_timeout(redis, monkeypatch):
+    timeouts = []
+    blpop = redis.redis.blpop
+
+    def _blpop(keys, timeout):
+        timeouts.append(timeout)
+        return blpop(keys, timeout=timeout)
+
+    monkeypatch.setattr(redis.redis, 'blpop', _blpop)
+    redis.queue_put('key', 'value')
+    assert redis.queue_get('key', timeout=0.2) == 'value'
+    assert redis.queue_get('key', timeout=1.5) is None
+    assert timeouts == [1, 2], 'older Redis versions only accept integer timeouts'
+
+
+def test_queue_put_expire(redis):
+    redis.queue_put('key', urandom(int(CHUNK_SIZE * 1.5)), expire=60)
+    assert 0 < redis.redis.ttl('key') <= 60  # noqa: PLR2004
+    chunk_key = redis.redis.lrange('key', 0, 0)[0].decode().split('#')[1]
+    assert 0 < redis.redis.ttl(chunk_key) <= 60, 'the chunks should also expire'  # noqa: PLR2004
+    redis.queue_put('other_key', 'value')
+    assert redis.redis.ttl('other_key') == -1, 'no expiry by default'
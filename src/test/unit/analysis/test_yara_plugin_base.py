@@ -3,11 +3,20 @@ from __future__ import annotations
 import logging
 import os
 import re
+import shutil
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
-from analysis.YaraPluginBase import YaraBasePlugin, _parse_meta_data, _split_output_in_rules_and_matches
+from analysis.YaraPluginBase import (
+    YaraBasePlugin,
+    _convert_matches,
+    _escape_matched_data,
+    _load_rules,
+    _parse_meta_data,
+    _split_output_in_rules_and_matches,
+)
 from helperFunctions.fileSystem import get_src_dir
 from objects.file import FileObject
 from test.common_helper import get_test_data_dir
@@ -101,3 +110,49 @@ def test_split_output_uneven():
     uneven_yara_output = 'rule1 [meta=0,data=1] /path\n0x0:$a1: AA BB \nrule2 [meta=0,data=1] /path\n'
     with pytest.raises(ValueError):  # noqa: PT011
         _split_output_in_rules_and_matches(uneven_yara_output)
+
+
+def test_escape_matched_data():
+    assert _escape_matched_data(b'foo 1.2') == 'foo 1.2'
+    assert _escape_matched_data(b'a\x00b\xff\n') == 'a\\x00b\\xFF\\x0A'
+    assert _escape_matched_data(b'"a\'b\\') == '\\"a\\\'b\\\\'
+
+
+PARITY_TEST_RULES = r'''
+rule parityRule
+{
+    meta:
+        description = "quotes and backslashes"
+        open_source = true
+        version = 3
+    strings:
+        $a = "\"quoted\""
+        $b = "back\\slash"
+        $c = /single'quote/
+        $d = /bin\x00ary\xff/
+    condition:
+        any of them
+}
+'''
+
+
+@pytest.mark.skipif(shutil.which('yara') is None, reason='yara CLI not installed')
+def test_yara_python_and_cli_parity(tmp_path):
+    rule_file = tmp_path / 'parity.yara'
+    rule_file.write_text(PARITY_TEST_RULES)
+    test_file = tmp_path / 'test_file'
+    test_file.write_bytes(b'foo "quoted" back\\slash single\'quote bin\x00ary\xff bar')
+
+    rules = _load_rules(str(rule_file))
+    assert rules is not None
+    python_result = _convert_matches(rules.match(str(test_file)))
+    cli_output = YaraBasePlugin._run_yara_cli(SimpleNamespace(signature_path=str(rule_file)), str(test_file))
+    cli_result = YaraBasePlugin._parse_yara_output(cli_output)
+    assert len(python_result['parityRule']['strings']) == 4  # noqa: PLR2004
+    assert python_result == cli_result
+
+
+def test_load_rules_unsupported_module(tmp_path):
+    rule_file = tmp_path / 'test.yara'
+    rule_file.write_text('import "foobar"\nrule test { condition: true }')
+    assert _load_rules(str(rule_file)) is None, 'should fall back to yara CLI'
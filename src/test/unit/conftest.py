@@ -46,6 +46,10 @@ class CommonIntercomMock:
             return TEST_FW.binary, f'{TEST_FW.file_name}.tar.gz'
         return None, None
 
+    @staticmethod
+    def get_readable_repacked_archive(_):
+        return None, None
+
     @staticmethod
     def add_binary_search_request(*_):
         return 'binary_search_id'
@@ -56,6 +60,18 @@ class CommonIntercomMock:
             return {'test_rule': ['test_uid']}, b'some yara rule'
         return None, None
 
+    @staticmethod
+    def get_binary_search_progress(uid):
+        if uid == 'running_search_id':
+            return {'partial_result': {'test_rule': ['test_uid']}, 'scanned': 100, 'total': 400}
+        return None
+
+    def cancel_binary_search(self, request_id):
+        if request_id != 'running_search_id':
+            return False
+        self.task_list.append(request_id)
+        return True
+
     def add_compare_task(self, compare_id, force=False):
         self.task_list.append((compare_id, force))
 
@@ -0,0 +1,224 @@
+from pathlib import Path
+
+import pytest
+from docker.errors import APIError
+from docker.types import Mount
+from requests.exceptions import ReadTimeout
+
+import config
+from helperFunctions import container_pool
+from helperFunctions.container_pool import (
+    INSTANCE_LABEL,
+    OUTPUT_DIR,
+    OWNER_LABEL,
+    ContainerPool,
+    _get_instance_id,
+    _get_task_script,
+    _remove_orphaned_containers,
+    can_be_pooled,
+    get_container_pool,
+    get_mount_spec,
+)
+from helperFunctions.docker import run_docker_container
+
+
+class ContainerMock:
+    def __init__(self, id_, mounts=None, labels=None):
+        self.id = id_
+        self.short_id = str(id_)
+        self.mounts = {mount['Target']: Path(mount['Source']) for mount in mounts or []}
+        self.labels = labels or {}
+        self.status = 'running'
+        self.removed = False
+        self.exec_run_calls = []
+
+    def reload(self):
+        pass
+
+    def start(self):
+        pass
+
+    def wait(self, timeout=None):
+        return {'StatusCode': 0}
+
+    def logs(self, stdout=True, stderr=True):
+        return b'output of a new container'
+
+    def stop(self):
+        pass
+
+    def remove(self, force=False):
+        self.removed = True
+
+    def exec_run(self, cmd, user=None):
+        self.exec_run_calls.append(cmd)
+
+
+class ApiMock:
+    def __init__(self, client):
+        self.client = client
+        self.scripts = []
+        self.running = False
+
+    def exec_create(self, container_id, cmd, environment=None):
+        self.scripts.append(cmd[2])
+        return {'Id': container_id}
+
+    def exec_start(self, exec_id, detach=False):
+        # simulate the task: it writes to stdout (which is redirected to the output dir) and to a directory mount
+        mounts = self.client.started[exec_id].mounts
+        (mounts[OUTPUT_DIR] / 'stdout').write_text('output')
+        if '/work' in mounts:
+            input_content = (mounts['/work'] / 'input').read_text()
+            (mounts['/work'] / 'result').write_text(f'result of {input_content}')
+
+    def exec_inspect(self, exec_id):
+        return {'Running': self.running, 'ExitCode': 0}
+
+
+class DockerClientMock:
+    def __init__(self):
+        self.api = ApiMock(self)
+        self.started = []
+        self.images = self
+        self.containers = self
+        self.user = ''
+        self.start_error = None
+        self.existing = []
+        self.not_pooled = []
+
+    def get(self, image):
+        config = {'Entrypoint': ['/entrypoint'], 'Cmd': ['--default'], 'User': self.user}
+        return type('Image', (), {'attrs': {'Config': config}})
+
+    def create(self, image, mounts=None, **kwargs):
+        if self.start_error is not None:
+            raise self.start_error
+        container = ContainerMock(len(self.started), mounts)
+        self.started.append(container)
+        return container
+
+    def run(self, image, **kwargs):
+        container = ContainerMock(f'not_pooled_{len(self.not_pooled)}')
+        self.not_pooled.append(container)
+        return container
+
+    def list(self, **kwargs):
+        return self.existing
+
+
+@pytest.fixture
+def docker_client(monkeypatch):
+    client = DockerClientMock()
+    monkeypatch.setattr(container_pool.docker, 'from_env', lambda: client)
+    monkeypatch.setattr(container_pool.docker.client, 'from_env', lambda: client)
+    monkeypatch.setattr(container_pool, '_POOLS', {})
+    return client
+
+
+def test_can_be_pooled(tmp_path):
+    assert can_be_pooled({'command': 'foo', 'mounts': [Mount('/input', str(tmp_path), type='bind')]})
+    assert can_be_pooled({})
+    assert not can_be_pooled({'mounts': [Mount('/input', str(tmp_path / 'missing'), type='bind')]}), 'no source'
+    assert not can_be_pooled({'privileged': True}), 'unsupported argument'
+
+
+@pytest.mark.common_config_overwrite({'docker_container_pool_size': 0})
+def test_can_be_pooled_disabled():
+    assert not can_be_pooled({})
+
+
+def test_get_task_script():
+    script = _get_task_script(['/entrypoint', 'some arg'], combine_stderr_stdout=True)
+    assert script == f"exec /entrypoint 'some arg' > {OUTPUT_DIR}/stdout 2>&1"
+
+
+def test_run(docker_client):
+    pool = ContainerPool('image', (), size=1)
+    assert pool.run(command='foo bar') == (0, 'output', '')
+    assert pool.run() == (0, 'output', '')
+    assert len(docker_client.started) == 1, 'container should be reused'
+    assert docker_client.api.scripts[0].startswith('exec /entrypoint foo bar > ')
+    assert docker_client.api.scripts[1].startswith('exec /entrypoint --default > ')
+
+
+def test_run_with_mounts(docker_client, tmp_path):
+    input_file = tmp_path / 'file'
+    input_file.write_text('file content')
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    (work_dir / 'input').write_text('input content')
+    mounts = [Mount('/input', str(input_file), type='bind', read_only=True), Mount('/work', str(work_dir), type='bind')]
+    pool = ContainerPool('image', get_mount_spec(mounts), size=1)
+    pool.run(mounts=mounts)
+
+    container = docker_client.started[0]
+    mount_base_dir = Path(config.common.docker_mount_base_dir)
+    assert all(mount_base_dir in source.parents for source in container.mounts.values()), 'only the work dir is mounted'
+    assert (work_dir / 'result').read_text() == 'result of input content', 'output should be copied back'
+    assert not list(container.mounts['/work'].iterdir()), 'work dir should be cleared after the task'
+    assert container.mounts['/input'].read_text() == ''
+    assert container.exec_run_calls, 'ownership of the output should be reset'
+
+    with pytest.raises(ValueError, match='do not match'):
+        pool.run(mounts=mounts[:1])
+
+
+def test_non_root_image_is_not_pooled(docker_client):
+    docker_client.user = 'nobody'
+    assert get_container_pool('image', []) is None
+    docker_client.user = 'root'
+    assert get_container_pool('other_image', []) is not None
+
+
+@pytest.mark.common_config_overwrite({'docker_container_pool_max_tasks': 2})
+def test_recycle_after_max_tasks(docker_client):
+    pool = ContainerPool('image', (), size=1)
+    for _ in range(3):
+        pool.run()
+    assert len(docker_client.started) == 2  # noqa: PLR2004
+    assert docker_client.started[0].removed
+
+
+def test_replace_crashed_container(docker_client):
+    pool = ContainerPool('image', (), size=1)
+    pool.run()
+    docker_client.started[0].status = 'exited'
+    pool.run()
+    assert len(docker_client.started) == 2  # noqa: PLR2004
+    assert docker_client.started[0].removed
+
+
+def test_timeout(docker_client, monkeypatch):
+    monkeypatch.setattr(container_pool, 'POLL_INTERVAL', 0.01)
+    pool = ContainerPool('image', (), size=1)
+    docker_client.api.running = True
+    with pytest.raises(ReadTimeout):
+        pool.run(timeout=0.05)
+    assert docker_client.started[0].removed, 'container should be removed after a timeout'
+    assert not docker_client.started[0].mounts[OUTPUT_DIR].parent.exists(), 'work dir should be removed'
+
+
+def test_start_error_falls_back_to_new_container(docker_client):
+    docker_client.start_error = APIError('exec: "sh": executable file not found in $PATH')
+    result = run_docker_container('image', pooled=True, command='foo')
+    assert result.stdout == 'output of a new container'
+    assert len(docker_client.not_pooled) == 1
+    assert get_container_pool('image', [], mem_limit=None, memswap_limit=None) is None, 'pool should be disabled'
+
+    docker_client.start_error = None
+    run_docker_container('image', pooled=True, command='foo')
+    assert not docker_client.started, 'pooled containers should not be used for this image anymore'
+    assert len(docker_client.not_pooled) == 2  # noqa: PLR2004
+
+
+def test_remove_orphaned_containers(docker_client):
+    dead_pid = str(2**22 + 1)  # larger than the maximum PID
+    orphan = ContainerMock('orphan', labels={INSTANCE_LABEL: _get_instance_id(), OWNER_LABEL: dead_pid})
+    other_instance = ContainerMock(
+        'other', labels={INSTANCE_LABEL: 'other_host:boot_id:/opt/FACT', OWNER_LABEL: dead_pid}
+    )
+    docker_client.existing = [orphan, other_instance]
+    _remove_orphaned_containers()
+    assert orphan.removed
+    assert not other_instance.removed, 'containers of other FACT instances must not be removed'
@@ -9,6 +9,7 @@ from helperFunctions.fileSystem import (
     get_relative_object_path,
     get_src_dir,
     get_template_dir,
+    map_file,
 )
 from test.common_helper import get_test_data_dir
 
@@ -63,3 +64,13 @@ def test_file_is_zero_broken_link():
 
 def test_get_config_dir():
     assert os.path.exists(f'{get_config_dir()}/fact-core-config.toml'), 'main config file not found'  # noqa: PTH110
+
+
+def test_map_file():
+    with map_file(TEST_DATA_DIR / 'test_data_file.bin') as mapped_file:
+        assert mapped_file[:] == b'test string in file'
+        assert mapped_file.find(b'string') == 5  # noqa: PLR2004
+    with (TEST_DATA_DIR / 'test_data_file.bin').open('rb') as file_handle, map_file(file_handle) as mapped_file:
+        assert len(mapped_file) == 19  # noqa: PLR2004
+    with map_file(TEST_DATA_DIR / 'zero_byte') as mapped_file:
+        assert mapped_file == b''
@@ -3,6 +3,7 @@ from pathlib import Path
 
 from helperFunctions.hash import (
     _suppress_stdout,
+    get_hashes,
     get_imphash,
     get_md5,
     get_sha256,
@@ -30,6 +31,20 @@ def test_get_ssdeep():
     assert get_ssdeep(TEST_STRING) == TEST_SSDEEP, 'not correct from string'
 
 
+def test_get_hashes():
+    binary = Path(get_test_data_dir(), 'test_executable').read_bytes()
+    hashes = get_hashes(binary, ['md5', 'sha256'], chunk_size=1000)
+    assert hashes['md5'] == get_md5(binary)
+    assert hashes['sha256'] == get_sha256(binary)
+    assert hashes['ssdeep'] == get_ssdeep(binary)
+    assert hashes['tlsh'] == get_tlsh(binary)
+
+
+def test_get_hashes_short_input():
+    hashes = get_hashes(TEST_STRING.encode(), ['md5'])
+    assert hashes == {'md5': TEST_MD5, 'ssdeep': TEST_SSDEEP}, 'TLSH should be missing for short input'
+
+
 def test_imphash():
     fo = create_test_file_object(bin_path=str(Path(get_test_data_dir(), 'test_executable')))
     fo.processed_analysis = {'file_type': {'result': {'mime': 'application/x-executable'}}}
@@ -1,9 +1,16 @@
 import logging
+import os
 from time import sleep
 
 import pytest
 
-from helperFunctions.process import ExceptionSafeProcess, check_worker_exceptions, new_worker_was_started
+from helperFunctions.process import (
+    ExceptionSafeProcess,
+    PersistentProcess,
+    TaskExceptionError,
+    check_worker_exceptions,
+    new_worker_was_started,
+)
 
 
 def breaking_process(wait: bool = False):
@@ -70,3 +77,37 @@ def test_new_worker_was_started():
 
     assert new_worker_was_started(old, new)
     assert not new_worker_was_started(old, old)
+
+
+def _persistent_process_task(mode: str):
+    if mode == 'sleep':
+        sleep(5)
+    elif mode == 'crash':
+        os._exit(1)
+    elif mode == 'exception':
+        raise RuntimeError('foobar')
+    return os.getpid()
+
+
+def test_persistent_process():
+    process = PersistentProcess(_persistent_process_task)
+    try:
+        pid = process.run_task('pid', timeout=5)
+        assert pid != os.getpid(), 'task should run in a child process'
+        assert process.run_task('pid', timeout=5) == pid, 'process should be reused'
+
+        with pytest.raises(TaskExceptionError, match='foobar'):
+            process.run_task('exception', timeout=5)
+        assert process.run_task('pid', timeout=5) == pid, 'process should be reused after an exception'
+
+        with pytest.raises(TimeoutError):
+            process.run_task('sleep', timeout=0.1)
+        new_pid = process.run_task('pid', timeout=5)
+        assert new_pid != pid, 'process should be restarted after a timeout'
+
+        with pytest.raises(ChildProcessError):
+            process.run_task('crash', timeout=5)
+        assert process.run_task('pid', timeout=5) != new_pid, 'process should be restarted after a crash'
+    finally:
+        process.stop()
+    assert process.pid is None
@@ -1,8 +1,6 @@
 import unittest
 from os import path
-from subprocess import CalledProcessError
 from unittest import mock
-from unittest.mock import patch
 
 import pytest
 
@@ -22,10 +20,6 @@ class MockCommonDbInterface:
         return []
 
 
-def mock_check_output(call, *_, shell=True, stderr=None, **__):  # noqa: ARG001
-    raise CalledProcessError(1, call, b'', stderr)
-
-
 @pytest.mark.backend_config_overwrite(
     {'firmware_file_storage_directory': path.join(get_test_data_dir(), TEST_FILE_1)},  # noqa: PTH118
 )
@@ -52,33 +46,35 @@ class TestHelperFunctionsYaraBinarySearch(unittest.TestCase):
         assert isinstance(result, str)
         assert 'There seems to be an error in the rule file' in result
 
-    @patch('helperFunctions.yara_binary_search.subprocess.run', side_effect=mock_check_output)
-    def test_get_binary_search_yara_error(self, _):  # noqa: PT019
-        result = self.yara_binary_scanner.get_binary_search_result((self.yara_rule, None))
-        assert isinstance(result, str)
-        assert 'Error when calling YARA' in result
-
     def test_eliminate_duplicates(self):
         test_dict = {1: [1, 2, 3, 3], 2: [1, 1, 2, 3]}
         self.yara_binary_scanner._eliminate_duplicates(test_dict)
         assert test_dict == {1: [1, 2, 3], 2: [1, 2, 3]}
 
-    def test_parse_raw_result(self):
-        raw_result = 'rule_1 match_1\nrule_1 match_2\nrule_2 match_1'
-        result = self.yara_binary_scanner._parse_raw_result(raw_result)
-        assert result == {'rule_1': ['match_1', 'match_2'], 'rule_2': ['match_1']}
-
     def test_execute_yara_search(self):
-        test_rule_path = path.join(get_test_data_dir(), 'yara_binary_search_test_rule')  # noqa: PTH118
-        result = self.yara_binary_scanner._execute_yara_search(test_rule_path)
-        assert 'test_rule' in result
-
-    def test_execute_yara_search_for_single_file(self):
-        test_rule_path = path.join(get_test_data_dir(), 'yara_binary_search_test_rule')  # noqa: PTH118
-        result = self.yara_binary_scanner._execute_yara_search(
-            test_rule_path, target_path=path.join(get_test_data_dir(), TEST_FILE_1, TEST_FILE_1)  # noqa: PTH118
-        )
-        assert 'test_rule' in result
+        compiled_rules = yara_binary_search._compile_rules(self.yara_rule)
+        file_paths = self.yara_binary_scanner._get_file_paths_of_all_files()
+        result = self.yara_binary_scanner._execute_yara_search(compiled_rules, file_paths)
+        assert result == {'test_rule': [TEST_FILE_1]}
+
+    def test_execute_yara_search_progress(self):
+        progress = []
+        self.yara_binary_scanner.progress_callback = lambda *args: progress.append(args)
+        compiled_rules = yara_binary_search._compile_rules(self.yara_rule)
+        file_paths = self.yara_binary_scanner._get_file_paths_of_all_files()
+        self.yara_binary_scanner._execute_yara_search(compiled_rules, file_paths)
+        assert progress[-1] == ({'test_rule': [TEST_FILE_1]}, len(file_paths), len(file_paths))
+
+    def test_get_binary_search_result_cancelled(self):
+        self.yara_binary_scanner.cancel_callback = lambda: True
+        result = self.yara_binary_scanner.get_binary_search_result((self.yara_rule, None))
+        assert result == yara_binary_search.CANCELLED_MESSAGE
+
+    def test_scan_files(self):
+        yara_binary_search._init_worker(yara_binary_search._compile_rules(self.yara_rule))
+        test_file = path.join(get_test_data_dir(), TEST_FILE_1, TEST_FILE_1)  # noqa: PTH118
+        result = yara_binary_search._scan_files([test_file, '/non/existing/file'])
+        assert result == ({'test_rule': [TEST_FILE_1]}, 2)
 
     def test_get_file_paths_of_files_included_in_fo(self):
         result = self.yara_binary_scanner._get_file_paths_of_files_included_in_fw('single_firmware')
@@ -28,6 +28,19 @@ class TestObjectsFile:
         ), 'correct sha256'
         assert test_object.file_name is None, 'correct file name'
 
+    def test_unload_binary(self):
+        file_path = f'{get_test_data_dir()}/test_data_file.bin'
+        test_object = FileObject(file_path=file_path)
+        test_object.unload_binary(file_path)
+        assert test_object._binary is None
+        assert test_object.size == 19, 'metadata should not be affected'  # noqa: PLR2004
+        with test_object.open_binary() as binary:
+            assert binary[:4] == b'test'
+        assert test_object._binary is None, 'open_binary should not load the binary'
+        assert test_object.binary == b'test string in file', 'binary should be loaded lazily'
+        with test_object.open_binary() as binary:
+            assert binary == b'test string in file'
+
     def test_add_included_file(self):
         parent = FileObject(binary=b'parent_file')
         parent.scheduled_analysis = ['test']
@@ -1,13 +1,23 @@
 import os
-from multiprocessing import Queue
+from multiprocessing import Queue, Value
+from threading import Thread
 from time import sleep
 from unittest import mock
 
 import pytest
 
 from analysis.PluginBase import AnalysisBasePlugin
+from objects.file import FileObject
 from objects.firmware import Firmware
 from scheduler.analysis import AnalysisScheduler
+from scheduler.analysis.scheduler import (
+    ANALYSIS_METADATA_KEY,
+    LAST_RESULT_TIME_KEY,
+    TASK_HANDLE_KEY,
+    _update_analysis_metadata,
+)
+from scheduler.analysis.result_buffer import AnalysisResultBuffer
+from scheduler.analysis.task_store import TaskStateStore
 from scheduler.task_scheduler import MANDATORY_PLUGINS
 from test.common_helper import MockFileObject, get_test_data_dir
 from test.mock import mock_patch, mock_spy
@@ -276,8 +286,8 @@ class TestAnalysisSkipping:
         def __init__(self, analysis_result):
             self.analysis_entry = analysis_result
 
-        def get_analysis(self, *_):
-            return self.analysis_entry
+        def get_analysis_metadata_for_uid_list(self, uid_list):
+            return {uid: {self.analysis_entry['plugin']: self.analysis_entry} for uid in uid_list}
 
     @classmethod
     def setup_class(cls):
@@ -318,13 +328,14 @@ class TestAnalysisSkipping:
             'plugin': plugin,
             'plugin_version': analysis_plugin_version,
             'system_version': analysis_system_version,
-            'result': {},
+            'failed': False,
         }
         self.scheduler.db_backend_service = self.BackendMock(analysis_entry)
         self.scheduler.analysis_plugins[plugin] = self.PluginMock(
             version=plugin_version, system_version=plugin_system_version
         )
-        assert self.scheduler._analysis_is_already_in_db_and_up_to_date(plugin, '') == expected_output
+        fo = FileObject(binary=b'test')
+        assert self.scheduler._analysis_is_already_in_db_and_up_to_date(plugin, fo) == expected_output
 
     @pytest.mark.parametrize(
         'db_entry',
@@ -332,11 +343,11 @@ class TestAnalysisSkipping:
             {
                 'plugin': 'plugin',
                 'plugin_version': '1.0',
-                'result': {},
+                'failed': False,
             },  # 'system_version' missing
             {
                 'plugin': 'plugin',
-                'result': {'failed': 'reason'},
+                'failed': True,
                 'plugin_version': '1.0',
                 'system_version': '1.0',
             },  # failed
@@ -345,7 +356,22 @@ class TestAnalysisSkipping:
     def test_analysis_is_already_in_db_and_up_to_date__incomplete(self, db_entry):
         self.scheduler.db_backend_service = self.BackendMock(db_entry)
         self.scheduler.analysis_plugins['plugin'] = self.PluginMock(version='1.0', system_version='1.0')
-        assert self.scheduler._analysis_is_already_in_db_and_up_to_date('plugin', '') is False
+        fo = FileObject(binary=b'test')
+        assert self.scheduler._analysis_is_already_in_db_and_up_to_date('plugin', fo) is False
+
+    def test_analysis_metadata_is_cached(self):
+        self.scheduler.db_backend_service = None  # the DB must not be used if the metadata is already cached
+        self.scheduler.analysis_plugins['plugin'] = self.PluginMock(version='1.0', system_version=None)
+        fo = FileObject(binary=b'test')
+        fo.temporary_data[ANALYSIS_METADATA_KEY] = {
+            'plugin': {'plugin_version': '1.0', 'system_version': None, 'analysis_date': 1.0, 'failed': False}
+        }
+        assert self.scheduler._analysis_is_already_in_db_and_up_to_date('plugin', fo) is True
+
+        # a new (failed) result should update the cached metadata
+        fo.processed_analysis['plugin'] = {'plugin_version': '1.0', 'analysis_date': 2.0, 'result': {'failed': 'x'}}
+        _update_analysis_metadata(fo, 'plugin')
+        assert self.scheduler._analysis_is_already_in_db_and_up_to_date('plugin', fo) is False
 
     def test_is_forced_update(self):
         fo = MockFileObject()
@@ -370,8 +396,11 @@ class TestAnalysisShouldReanalyse:
             self.date = dependency_analysis_date
             self.system_version = system_version
 
-        def get_analysis(self, *_):
-            return {'analysis_date': self.date, 'system_version': None}
+        def get_analysis_metadata_for_uid_list(self, uid_list):
+            return {
+                uid: {'plugin_dep': {'analysis_date': self.date, 'system_version': None, 'failed': False}}
+                for uid in uid_list
+            }
 
     @classmethod
     def setup_class(cls):
@@ -420,7 +449,8 @@ class TestAnalysisShouldReanalyse:
         }
         self.scheduler.db_backend_service = self.BackendMock(dependency_date)
         plugin = self.PluginMock(plugin_version, system_version)
-        assert self.scheduler._analysis_is_up_to_date(analysis_db_entry, plugin, 'uid') == expected_result
+        fo = FileObject(binary=b'test')
+        assert self.scheduler._analysis_is_up_to_date(analysis_db_entry, plugin, fo) == expected_result
 
 
 class PluginMock(AnalysisBasePlugin):
@@ -447,3 +477,142 @@ def test_combined_analysis_workload(monkeypatch):
         sleep(0.1)  # let the queue finish internally to not cause "Broken pipe"
         scheduler.process_queue.close()
         dummy_plugin.in_queue.close()
+
+
+@pytest.mark.backend_config_overwrite({'block_delay': 10})
+def test_result_collector_wakes_up_on_result(monkeypatch):
+    monkeypatch.setattr(AnalysisScheduler, '__init__', lambda *_: None)
+    scheduler = AnalysisScheduler()
+    scheduler._plugin_runners = {}
+    scheduler.analysis_plugins = {'plugin_1': PluginMock([]), 'plugin_2': PluginMock([])}
+    for plugin in scheduler.analysis_plugins.values():
+        plugin.out_queue = Queue()
+    scheduler.stop_condition = Value('i', 0)
+    scheduler._result_queues = []
+    collected = []
+
+    def _return_result(result, plugin_name):
+        collected.append((result, plugin_name))
+        scheduler.stop_condition.value = 1
+
+    monkeypatch.setattr(scheduler, '_return_result', _return_result)
+    collector = Thread(target=scheduler._result_collector)
+    collector.start()
+    try:
+        scheduler.analysis_plugins['plugin_2'].out_queue.put('foo')
+        # the block delay is much longer than this timeout => the collector must not wait for it to pass
+        collector.join(timeout=2)
+        assert not collector.is_alive()
+        assert collected == [('foo', 'plugin_2')]
+    finally:
+        scheduler.stop_condition.value = 1
+        for plugin in scheduler.analysis_plugins.values():
+            plugin.out_queue.close()
+
+
+def test_legacy_plugin_task_round_trip(monkeypatch):
+    monkeypatch.setattr(AnalysisScheduler, '__init__', lambda *_: None)
+    scheduler = AnalysisScheduler()
+    scheduler._task_store = TaskStateStore()
+    scheduler._result_queues = [Queue()]
+    plugin = PluginMock(['dependency'])
+    plugin.NAME = 'plugin'
+    fo = FileObject(binary=b'test')
+    fo.processed_analysis = {'dependency': {'result': 1}, 'unrelated': {'result': 2}, 'file_type': {'result': 3}}
+    try:
+        task = scheduler._create_legacy_plugin_task(fo, plugin)
+        assert set(task.processed_analysis) == {'dependency', 'file_type'}
+        assert TASK_HANDLE_KEY in task.temporary_data
+        assert len(scheduler._task_store) == 1
+
+        task.processed_analysis['plugin'] = {'result': 4}
+        scheduler._return_result(task, 'plugin')
+        handle, plugin_name, result = scheduler._result_queues[0].get(timeout=5)
+        assert result == ({'result': 4}, None), 'only the result of the plugin should be sent back'
+
+        restored = scheduler._restore_file_object(handle, plugin_name, result)
+        assert set(restored.processed_analysis) == {'dependency', 'unrelated', 'file_type', 'plugin'}
+        assert restored.processed_analysis['plugin'] == {'result': 4}
+        assert len(scheduler._task_store) == 0
+    finally:
+        scheduler._result_queues[0].close()
+
+
+class StatusMock:
+    def __init__(self):
+        self.removed = []
+
+    def remove_object(self, fo):
+        self.removed.append(fo.uid)
+
+
+def test_complete_analysis_after_results_are_stored(monkeypatch):
+    monkeypatch.setattr(AnalysisScheduler, '__init__', lambda *_: None)
+    scheduler = AnalysisScheduler()
+    scheduler.status = StatusMock()
+    scheduler._pending_completions = []
+    stored = []
+    scheduler._result_buffer = AnalysisResultBuffer(stored.extend, batch_size=10, max_delay=100, process_count=2)
+    scheduler._result_buffer.register_process(0)
+    scheduler.post_analysis = scheduler._result_buffer.add
+    # the other process (index 1) still has a result in its buffer
+    scheduler._result_buffer._shared_oldest_result_times[1] = 0
+
+    fo = FileObject(binary=b'test')
+    fo.scheduled_analysis = []
+    fo.processed_analysis = {'plugin': {'result': 1}}
+    scheduler._add_analysis_result(fo, 'plugin')
+    scheduler._check_further_process_or_complete(fo)
+    assert stored == [(fo.uid, 'plugin', {'result': 1})], 'the results of this process should be stored right away'
+    assert scheduler.status.removed == [], 'the results of the other process are not stored yet'
+
+    scheduler._result_buffer._shared_oldest_result_times[1] = fo.temporary_data[LAST_RESULT_TIME_KEY] + 1
+    scheduler._complete_pending_analyses()
+    assert scheduler.status.removed == [fo.uid]
+    assert scheduler._pending_completions == []
+
+
+def test_add_completed_analysis_results_from_buffer(monkeypatch):
+    monkeypatch.setattr(AnalysisScheduler, '__init__', lambda *_: None)
+    scheduler = AnalysisScheduler()
+    scheduler.db_backend_service = BackendDbInterface()
+    scheduler._result_buffer = AnalysisResultBuffer(lambda _: None, batch_size=10, max_delay=100)
+    scheduler._result_buffer.add('uid', 'plugin', {'result': 'buffered'})
+    fo = FileObject(binary=b'test')
+    fo.uid = 'uid'
+    scheduler._add_completed_analysis_results_to_file_object('plugin', fo)
+    assert fo.processed_analysis['plugin'] == {'result': 'buffered'}
+
+
+def test_task_runner_handles_returned_results(monkeypatch):
+    monkeypatch.setattr(AnalysisScheduler, '__init__', lambda *_: None)
+    scheduler = AnalysisScheduler()
+    scheduler.stop_condition = Value('i', 0)
+    scheduler.process_queue = Queue()
+    scheduler._result_queues = [Queue()]
+    scheduler._task_store = TaskStateStore()
+    scheduler._result_buffer = AnalysisResultBuffer(lambda _: None, batch_size=10, max_delay=1)
+    scheduler._pending_completions = []
+    handled = []
+
+    def _handle_collected_result(fo, plugin_name):
+        handled.append((fo, plugin_name))
+        scheduler.stop_condition.value = 1
+
+    monkeypatch.setattr(scheduler, '_handle_collected_result', _handle_collected_result)
+    fo = FileObject(binary=b'test')
+    handle = scheduler._task_store.put(fo)
+    runner = Thread(target=scheduler._task_runner)
+    runner.start()
+    try:
+        scheduler._result_queues[0].put((handle, 'plugin', ({'result': 1}, None)))
+        runner.join(timeout=5)
+        assert not runner.is_alive()
+        assert len(handled) == 1
+        restored, plugin_name = handled[0]
+        assert plugin_name == 'plugin'
+        assert restored.processed_analysis['plugin'] == {'result': 1}
+    finally:
+        scheduler.stop_condition.value = 1
+        scheduler.process_queue.close()
+        scheduler._result_queues[0].close()
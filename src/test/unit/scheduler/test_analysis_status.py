@@ -139,6 +139,30 @@ class TestAnalysisStatus:
         assert ROOT_UID in self.status._worker.recently_finished
         assert self.status._worker.recently_finished[ROOT_UID]['total_files_count'] == 2  # noqa: PLR2004
 
+    def test_callback_on_firmware_completed(self):
+        completed = []
+        status = AnalysisStatus(on_firmware_completed=completed.append)
+        status._worker.currently_running = {
+            ROOT_UID: FwAnalysisStatus(
+                files_to_unpack=set(),
+                files_to_analyze={'foo', 'bar'},
+                analysis_plugins={},
+                hid='',
+                total_files_count=3,
+            )
+        }
+        fo = FileObject(binary=b'foo')
+        fo.root_uid = ROOT_UID
+        fo.uid = 'foo'
+        status.remove_object(fo)
+        status._worker._update_status()
+        assert completed == [], 'the analysis is not completed yet'
+
+        fo.uid = 'bar'
+        status.remove_object(fo)
+        status._worker._update_status()
+        assert completed == [ROOT_UID]
+
     def test_remove_but_still_unpacking(self):
         self.status._worker.currently_running = {
             ROOT_UID: FwAnalysisStatus(
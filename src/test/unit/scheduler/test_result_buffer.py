@@ -0,0 +1,67 @@
+from time import sleep, time
+
+from scheduler.analysis.result_buffer import AnalysisResultBuffer
+
+
+class StoreMock:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch):
+        self.batches.append(batch)
+
+
+def test_flush_on_batch_size():
+    store = StoreMock()
+    buffer = AnalysisResultBuffer(store, batch_size=2, max_delay=100)
+    buffer.add('uid_1', 'plugin', {'result': 1})
+    assert store.batches == []
+    assert len(buffer) == 1
+
+    buffer.add('uid_2', 'plugin', {'result': 2})
+    assert store.batches == [[('uid_1', 'plugin', {'result': 1}), ('uid_2', 'plugin', {'result': 2})]]
+    assert len(buffer) == 0
+
+
+def test_flush_if_due():
+    store = StoreMock()
+    buffer = AnalysisResultBuffer(store, batch_size=100, max_delay=0.1)
+    buffer.flush_if_due()
+    buffer.add('uid', 'plugin', {})
+    buffer.flush_if_due()
+    assert store.batches == []
+
+    sleep(0.15)
+    buffer.flush_if_due()
+    assert store.batches == [[('uid', 'plugin', {})]]
+
+
+def test_newest_result_wins():
+    store = StoreMock()
+    buffer = AnalysisResultBuffer(store, batch_size=100, max_delay=100)
+    buffer.add('uid', 'plugin', {'result': 'old'})
+    buffer.add('uid', 'plugin', {'result': 'new'})
+    buffer.flush()
+    buffer.flush()  # flushing an empty buffer should not store anything
+    assert store.batches == [[('uid', 'plugin', {'result': 'new'})]]
+
+
+def test_get():
+    buffer = AnalysisResultBuffer(StoreMock(), batch_size=100, max_delay=100)
+    buffer.add('uid', 'plugin', {'result': 1})
+    assert buffer.get('uid', 'plugin') == {'result': 1}
+    assert buffer.get('uid', 'other_plugin') is None
+
+
+def test_results_are_stored():
+    buffer = AnalysisResultBuffer(StoreMock(), batch_size=100, max_delay=100, process_count=2)
+    buffer.register_process(0)
+    buffer.add('uid', 'plugin', {})
+    added = time()
+    assert not buffer.results_are_stored(added)
+    buffer.flush()
+    assert buffer.results_are_stored(added)
+
+    buffer._shared_oldest_result_times[1] = added  # a result in the buffer of another process
+    assert not buffer.results_are_stored(added)
+    assert buffer.results_are_stored(added - 1), 'older results should be stored'
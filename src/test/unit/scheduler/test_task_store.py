@@ -0,0 +1,34 @@
+import pytest
+
+from objects.file import FileObject
+from scheduler.analysis.task_store import TaskStateStore
+
+
+@pytest.fixture
+def task_store():
+    store = TaskStateStore()
+    yield store
+    store.shutdown()
+
+
+def test_put_and_pop(task_store):
+    fo = FileObject(binary=b'test')
+    fo.processed_analysis = {'plugin': {'result': 'foo'}}
+    handle = task_store.put(fo)
+    other_handle = task_store.put(fo)
+    assert handle != other_handle, 'handles of the same file must be unique'
+    assert len(task_store) == 2  # noqa: PLR2004
+
+    restored = task_store.pop(handle)
+    assert restored.uid == fo.uid
+    assert restored.processed_analysis == fo.processed_analysis
+    assert len(task_store) == 1
+
+    with pytest.raises(KeyError):
+        task_store.pop(handle)
+
+
+def test_get_owner(task_store):
+    task_store.register_process(3)
+    handle = task_store.put(FileObject(binary=b'test'))
+    assert TaskStateStore.get_owner(handle) == 3  # noqa: PLR2004
@@ -1,8 +1,13 @@
 from multiprocessing import Event, Manager
+from queue import Empty, Queue
+from tempfile import TemporaryDirectory
+from threading import Lock, Thread
 
 import pytest
 
+from objects.file import FileObject
 from objects.firmware import Firmware
+from scheduler.unpacking_scheduler import PREFETCH_SIZE, UnpackingScheduler
 from test.common_helper import get_test_data_dir
 
 
@@ -71,3 +76,74 @@ class TestUnpackScheduler:
         assert unpacking_scheduler.throttle_condition.value == 1, 'unpack load throttle not functional'
 
         unpacking_scheduler.shutdown()
+
+
+class ContainerMock:
+    def __init__(self, tmp_dir):
+        self.tmp_dir = tmp_dir
+
+    def restart(self):
+        pass
+
+
+class PipelineDbMock:
+    def add_analyses(self, analyses):
+        pass
+
+    def add_child_entries(self, child_entries, new_objects=None):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+@pytest.fixture
+def pipeline_scheduler(tmp_path, monkeypatch):
+    """An unpacking scheduler whose pipeline runs in threads of the test process without any extraction containers"""
+    finished = Queue()
+    scheduler = UnpackingScheduler(post_unpack=finished.put, fs_organizer=object(), db_interface=PipelineDbMock())
+    scheduler.workers = [ContainerMock(TemporaryDirectory(dir=tmp_path))]
+    scheduler.currently_extracted = {}
+    scheduler.sync_lock = Lock()
+    scheduler.finished = finished
+    monkeypatch.setattr(scheduler.unpacker, 'collect_extracted_files', lambda *_: [])
+    thread = Thread(target=scheduler.extraction_loop)
+    thread.start()
+    yield scheduler
+    scheduler.stop_condition.value = 1
+    thread.join()
+
+
+@pytest.mark.backend_config_overwrite({'unpacking': {'delay': 0, 'max_depth': 3}})
+class TestUnpackingPipeline:
+    def test_exception_during_staging(self, pipeline_scheduler, monkeypatch):
+        def _stage(task, _):
+            if task.uid == failing_task.uid:
+                raise RuntimeError('staging failed')
+            return True
+
+        monkeypatch.setattr(pipeline_scheduler.unpacker, 'stage', _stage)
+        monkeypatch.setattr(pipeline_scheduler.unpacker, 'extract', lambda *_: None)
+        failing_task, task = FileObject(binary=b'foo'), FileObject(binary=b'bar')
+        pipeline_scheduler.in_queue.put(failing_task)
+        pipeline_scheduler.in_queue.put(task)
+
+        finished = {fo.uid: fo for fo in (pipeline_scheduler.finished.get(timeout=5) for _ in range(2))}
+        assert set(finished) == {failing_task.uid, task.uid}, 'the staging should continue after an exception'
+        assert 'extractor error' in finished[failing_task.uid].processed_analysis['unpacker']['tags']
+
+    def test_prefetch_size(self, pipeline_scheduler, monkeypatch):
+        staged, extraction_may_finish = Queue(), Event()
+        monkeypatch.setattr(pipeline_scheduler.unpacker, 'stage', lambda task, _: staged.put(task.uid) or True)
+        monkeypatch.setattr(pipeline_scheduler.unpacker, 'extract', lambda *_: extraction_may_finish.wait())
+        for index in range(5):
+            pipeline_scheduler.in_queue.put(FileObject(binary=f'file {index}'.encode()))
+
+        for _ in range(PREFETCH_SIZE + 1):  # the task that is extracted + the tasks that are staged in advance
+            staged.get(timeout=5)
+        with pytest.raises(Empty):
+            staged.get(timeout=0.5)
+
+        extraction_may_finish.set()
+        for _ in range(5):
+            pipeline_scheduler.finished.get(timeout=5)
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 
 import pytest
 from common_helper_files import get_binary_from_file
@@ -44,3 +45,30 @@ def test_store_and_delete_file(fsorganizer):
 
     fsorganizer.delete_file(file_object.uid)
     assert not os.path.exists(file_object.file_path), 'file not deleted'  # noqa: PTH110
+
+
+def test_store_file_move(fsorganizer, tmp_path):
+    source_path = tmp_path / 'extracted_file'
+    source_path.write_bytes(b'abcdef')
+    source_path.chmod(0o600)
+    file_object = FileObject(file_path=str(source_path))
+
+    fsorganizer.store_file(file_object, move=True)
+    assert not source_path.exists(), 'file should have been moved'
+    _check_file_presence_and_content(file_object.file_path, b'abcdef')
+    assert Path(file_object.file_path).stat().st_mode & 0o777 == 0o644  # noqa: PLR2004
+    assert file_object.file_name == 'extracted_file'
+    fsorganizer.delete_file(file_object.uid)
+
+
+def test_store_file_move_symlink(fsorganizer, tmp_path):
+    (tmp_path / 'target').write_bytes(b'symlink target')
+    source_path = tmp_path / 'link'
+    source_path.symlink_to(tmp_path / 'target')
+    file_object = FileObject(file_path=str(source_path))
+
+    fsorganizer.store_file(file_object, move=True)
+    assert source_path.is_symlink(), 'symlinks should not be moved'
+    assert not Path(file_object.file_path).is_symlink()
+    _check_file_presence_and_content(file_object.file_path, b'symlink target')
+    fsorganizer.delete_file(file_object.uid)
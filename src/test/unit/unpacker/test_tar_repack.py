@@ -1,9 +1,14 @@
 import os
+import tarfile
+from pathlib import Path
 
 import magic
+import pytest
 
+from storage.fsorganizer import get_tar_repack_cache_dir
 from test.common_helper import get_test_data_dir
-from unpacker.tar_repack import TarRepack
+from unpacker.tar_repack import TarRepack, _evict_least_recently_used
+from unpacker.unpack_base import ExtractionError
 
 
 def test_tar_repack():
@@ -13,3 +18,64 @@ def test_tar_repack():
     result = repack_service.tar_repack(file_path)
     file_type = magic.from_buffer(result, mime=False)
     assert 'gzip compressed data' in file_type, 'Result is not an tar.gz file'
+
+
+def test_repack_extracted_files(tmp_path):
+    extraction_dir = tmp_path / 'files'
+    (extraction_dir / 'dir').mkdir(parents=True)
+    (extraction_dir / 'dir' / 'file').write_bytes(b'foobar')
+    archive_path = tmp_path / 'out.tar.gz'
+    TarRepack._repack_extracted_files(extraction_dir, archive_path)
+    with tarfile.open(archive_path) as archive:
+        assert './dir/file' in archive.getnames()
+        assert archive.extractfile('./dir/file').read() == b'foobar'
+
+
+def test_tar_repack_cached(monkeypatch):
+    extraction_calls = []
+
+    def _extract(_, file_path, tmp_dir):
+        extraction_calls.append(file_path)
+        Path(tmp_dir, 'files').mkdir()
+        Path(tmp_dir, 'files', 'file').write_bytes(b'foobar')
+
+    monkeypatch.setattr(TarRepack, 'extract_files_from_file', _extract)
+    repack_service = TarRepack()
+    archive_path = repack_service.get_repacked_archive('/some/dir/cached_uid')
+    try:
+        assert archive_path.name == 'cached_uid.tar.gz'
+        assert repack_service.tar_repack('/some/dir/cached_uid') == archive_path.read_bytes()
+        assert len(extraction_calls) == 1, 'second call should be served from the cache'
+    finally:
+        archive_path.unlink()
+
+
+def test_tar_repack_error(monkeypatch):
+    def _extract(*_):
+        raise ExtractionError('extraction failed')
+
+    monkeypatch.setattr(TarRepack, 'extract_files_from_file', _extract)
+    with pytest.raises(ExtractionError):
+        TarRepack().get_repacked_archive('/some/dir/failing_uid')
+    assert not list(get_tar_repack_cache_dir().glob('failing_uid*')), 'temporary archive should be removed'
+
+
+def test_evict_least_recently_used(tmp_path):
+    for index in range(4):
+        archive = tmp_path / f'{index}.tar.gz'
+        archive.write_bytes(b'x' * 10)
+        os.utime(archive, (index, index))
+    _evict_least_recently_used(tmp_path, max_size=25, keep=tmp_path / '0.tar.gz')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['0.tar.gz', '3.tar.gz']
+
+
+def test_evict_removed_archive(tmp_path, monkeypatch):
+    for index in range(3):
+        archive = tmp_path / f'{index}.tar.gz'
+        archive.write_bytes(b'x' * 10)
+        os.utime(archive, (index, index))
+    removed_archive = tmp_path / 'removed_by_other_process.tar.gz'
+    glob = Path.glob
+    monkeypatch.setattr(Path, 'glob', lambda self, pattern: [removed_archive, *glob(self, pattern)])
+    _evict_least_recently_used(tmp_path, max_size=15, keep=tmp_path / '2.tar.gz')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['2.tar.gz']
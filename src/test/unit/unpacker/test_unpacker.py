@@ -51,6 +51,33 @@ class TestUnpackerCore:
         unpacker.generate_objects_and_store_files(file_paths, EXTRACTION_DIR, test_fo)
         assert unpacker.unpacking_locks.unpacking_lock_is_set(test_fo.uid)
 
+    def test_stage(self, unpacker):
+        test_file = FileObject(file_path=str(TEST_DATA_DIR / 'container/test.zip'))
+        with TemporaryDirectory() as tmp_dir:
+            assert unpacker.stage(test_file, tmp_dir) is True
+            assert Path(tmp_dir, 'input', 'test.zip').read_bytes() == test_file.binary
+            assert Path(tmp_dir, 'files').is_dir()
+
+    def test_stage_no_hard_link(self, unpacker, tmp_path):
+        file_path = tmp_path / 'test_file'
+        file_path.write_bytes(b'foobar')
+        test_file = FileObject(file_path=str(file_path))
+        staging_dir = tmp_path / 'staging'
+        assert unpacker.stage(test_file, str(staging_dir)) is True
+        staged_file = staging_dir / 'input' / 'test_file'
+        assert staged_file.read_bytes() == b'foobar'
+        assert staged_file.stat().st_ino != file_path.stat().st_ino, 'the stored file must not be linked'
+        staged_file.write_bytes(b'changed')
+        assert file_path.read_bytes() == b'foobar', 'changes of the staged file must not affect the original'
+
+    def test_stage_depth_reached(self, unpacker):
+        test_file = FileObject(file_path=str(TEST_DATA_DIR / 'container/test.zip'))
+        test_file.depth = 10
+        with TemporaryDirectory() as tmp_dir:
+            assert unpacker.stage(test_file, tmp_dir) is False
+            assert not Path(tmp_dir, 'input').exists()
+        assert 'maximum unpacking depth was reached' in test_file.processed_analysis['unpacker']['result']['info']
+
 
 @pytest.mark.backend_config_overwrite(
     {
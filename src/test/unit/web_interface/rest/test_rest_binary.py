@@ -1,6 +1,41 @@
 from base64 import standard_b64decode
+from pathlib import Path
 
-from test.common_helper import TEST_FW
+import pytest
+
+import config
+from storage.fsorganizer import get_readable_repacked_archive_path, get_tar_repack_cache_dir
+from test.common_helper import TEST_FW, CommonDatabaseMock
+from test.unit.conftest import CommonIntercomMock
+
+
+class DbMock(CommonDatabaseMock):
+    def get_file_name(self, uid):
+        return TEST_FW.file_name if uid == TEST_FW.uid else None
+
+
+@pytest.fixture
+def stored_test_fw():
+    file_path = Path(config.backend.firmware_file_storage_directory) / TEST_FW.uid[:2] / TEST_FW.uid
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(TEST_FW.binary)
+    yield file_path
+    file_path.unlink()
+
+
+@pytest.fixture
+def cached_test_archive():
+    archive_path = get_tar_repack_cache_dir() / f'{TEST_FW.uid}.tar.gz'
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    archive_path.write_bytes(b'archive')
+    yield archive_path
+    archive_path.unlink()
+
+
+class CachedArchiveIntercomMock(CommonIntercomMock):
+    @staticmethod
+    def get_readable_repacked_archive(uid):
+        return get_readable_repacked_archive_path(uid), f'{TEST_FW.file_name}.tar.gz'
 
 
 def test_bad_requests(test_client):
@@ -30,3 +65,37 @@ def test_bad_tar_flag(test_client):
     result = test_client.get(f'/rest/binary/{TEST_FW.uid}?tar=True').json
     assert result['status'] == 1
     assert 'tar must be true or false' in result['error_message']
+
+
+def test_raw_download(test_client):
+    result = test_client.get(f'/rest/binary/{TEST_FW.uid}?raw=true')
+    assert result.data == TEST_FW.binary
+    assert 'attachment; filename=test.zip' in result.headers['Content-Disposition']
+
+
+@pytest.mark.WebInterfaceUnitTestConfig(database_mock_class=DbMock)
+@pytest.mark.usefixtures('stored_test_fw')
+def test_download_from_storage(test_client):
+    result = test_client.get(f'/rest/binary/{TEST_FW.uid}').json
+    assert standard_b64decode(result['binary']) == TEST_FW.binary
+    assert result['file_name'] == 'test.zip'
+
+
+@pytest.mark.WebInterfaceUnitTestConfig(database_mock_class=DbMock)
+@pytest.mark.usefixtures('stored_test_fw')
+def test_raw_download_from_storage_range(test_client):
+    result = test_client.get(f'/rest/binary/{TEST_FW.uid}?raw=true', headers={'Range': 'bytes=0-3'})
+    assert result.status_code == 206  # noqa: PLR2004
+    assert result.data == TEST_FW.binary[:4]
+
+
+@pytest.mark.WebInterfaceUnitTestConfig(intercom_mock_class=CachedArchiveIntercomMock)
+@pytest.mark.usefixtures('cached_test_archive')
+def test_tar_download_from_cache(test_client):
+    result = test_client.get(f'/rest/binary/{TEST_FW.uid}?tar=true').json
+    assert standard_b64decode(result['binary']) == b'archive'
+    assert result['file_name'] == 'test.zip.tar.gz'
+
+    result = test_client.get(f'/rest/binary/{TEST_FW.uid}?tar=true&raw=true')
+    assert result.data == b'archive'
+    assert result.headers['Content-Type'] == 'application/gzip'
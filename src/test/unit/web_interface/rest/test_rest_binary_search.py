@@ -45,3 +45,39 @@ def test_get_result_without_search_id(test_client):
 def test_get_result_non_existent_id(test_client):
     result = test_client.get('/rest/binary_search/foobar').json
     assert 'result is not ready yet' in result['error_message']
+
+
+def test_get_result(test_client):
+    result = test_client.get('/rest/binary_search/binary_search_id').json
+    assert result['binary_search_results'] == {'test_rule': ['test_uid']}
+    assert result['finished'] is True
+
+
+def test_get_partial_result(test_client):
+    result = test_client.get('/rest/binary_search/running_search_id?partial=true').json
+    assert result['binary_search_results'] == {'test_rule': ['test_uid']}
+    assert result['finished'] is False
+    assert result['scanned_files'] == 100  # noqa: PLR2004
+    assert result['total_files'] == 400  # noqa: PLR2004
+
+
+def test_get_result_of_running_search(test_client):
+    result = test_client.get('/rest/binary_search/running_search_id').json
+    assert 'scanned 100 of 400 files' in result['error_message']
+
+
+def test_get_result_bad_partial_flag(test_client):
+    result = test_client.get('/rest/binary_search/binary_search_id?partial=foo').json
+    assert 'partial must be true or false' in result['error_message']
+
+
+def test_cancel_search(test_client, intercom_task_list):
+    result = test_client.delete('/rest/binary_search/running_search_id').json
+    assert 'Cancelled binary search' in result['message']
+    assert intercom_task_list == ['running_search_id']
+
+
+def test_cancel_unknown_search(test_client, intercom_task_list):
+    result = test_client.delete('/rest/binary_search/foobar').json
+    assert 'No running binary search' in result['error_message']
+    assert intercom_task_list == []
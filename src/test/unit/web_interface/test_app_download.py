@@ -1,6 +1,11 @@
+from pathlib import Path
+
 import pytest
 
+import config
+from storage.fsorganizer import get_readable_repacked_archive_path, get_tar_repack_cache_dir
 from test.common_helper import TEST_FW, CommonDatabaseMock
+from test.unit.conftest import CommonIntercomMock
 
 
 def test_app_download_raw_invalid(test_client):
@@ -17,6 +22,33 @@ class DbMock(CommonDatabaseMock):
     def get_analysis(self, uid, plugin):
         return {'mime': 'application/x-foobar'}
 
+    def get_file_name(self, uid):
+        return TEST_FW.file_name if uid == TEST_FW.uid else None
+
+
+@pytest.fixture
+def stored_test_fw():
+    file_path = Path(config.backend.firmware_file_storage_directory) / TEST_FW.uid[:2] / TEST_FW.uid
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(TEST_FW.binary)
+    yield file_path
+    file_path.unlink()
+
+
+@pytest.fixture
+def cached_test_archive():
+    archive_path = get_tar_repack_cache_dir() / f'{TEST_FW.uid}.tar.gz'
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    archive_path.write_bytes(b'archive')
+    yield archive_path
+    archive_path.unlink()
+
+
+class CachedArchiveIntercomMock(CommonIntercomMock):
+    @staticmethod
+    def get_readable_repacked_archive(uid):
+        return get_readable_repacked_archive_path(uid), f'{TEST_FW.file_name}.tar.gz'
+
 
 @pytest.mark.WebInterfaceUnitTestConfig(database_mock_class=DbMock)
 def test_app_download_raw(test_client):
@@ -39,3 +71,29 @@ def test_app_tar_download(test_client):
     assert TEST_FW.binary in rv.data
     assert 'attachment; filename=test.zip' in rv.headers['Content-Disposition']
     assert rv.headers['Content-Type'] == 'application/gzip'
+
+
+@pytest.mark.WebInterfaceUnitTestConfig(intercom_mock_class=CachedArchiveIntercomMock)
+@pytest.mark.usefixtures('cached_test_archive')
+def test_app_tar_download_from_cache(test_client):
+    rv = test_client.get(f'/tar-download/{TEST_FW.uid}')
+    assert rv.data == b'archive'
+    assert 'attachment; filename=test.zip.tar.gz' in rv.headers['Content-Disposition']
+    assert rv.headers['Content-Type'] == 'application/gzip'
+
+
+@pytest.mark.WebInterfaceUnitTestConfig(database_mock_class=DbMock)
+@pytest.mark.usefixtures('stored_test_fw')
+def test_app_download_from_storage(test_client):
+    rv = test_client.get(f'/download/{TEST_FW.uid}')
+    assert rv.data == TEST_FW.binary
+    assert 'attachment; filename=test.zip' in rv.headers['Content-Disposition']
+    assert rv.headers['Content-Type'] == 'application/x-foobar'
+
+
+@pytest.mark.WebInterfaceUnitTestConfig(database_mock_class=DbMock)
+@pytest.mark.usefixtures('stored_test_fw')
+def test_app_download_range(test_client):
+    rv = test_client.get(f'/download/{TEST_FW.uid}', headers={'Range': 'bytes=2-5'})
+    assert rv.status_code == 206  # noqa: PLR2004
+    assert rv.data == TEST_FW.binary[2:6]
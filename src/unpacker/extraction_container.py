@@ -19,19 +19,17 @@ if TYPE_CHECKING:
     from docker.models.containers import Container
     from requests.adapters import Response
     from tempfile import TemporaryDirectory
-    import multiprocessing
 
 DOCKER_CLIENT = docker.from_env()
 EXTRACTOR_DOCKER_IMAGE = 'fkiecad/fact_extractor'
 
 
 class ExtractionContainer:
-    def __init__(self, id_: int, tmp_dir: TemporaryDirectory, value: multiprocessing.managers.ValueProxy):
+    def __init__(self, id_: int, tmp_dir: TemporaryDirectory):
         self.id_ = id_
         self.tmp_dir = tmp_dir
         self.port = config.backend.unpacking.base_port + id_
         self.container_id = None
-        self.exception = value
         self._adapter = HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.1))
 
     def start(self):
@@ -68,12 +66,6 @@ class ExtractionContainer:
         logging.info(f'Stopping unpack worker {self.id_}')
         self._remove_container()
 
-    def set_exception(self):
-        return self.exception.set(1)
-
-    def exception_occurred(self) -> bool:
-        return self.exception.get() == 1
-
     def _remove_container(self, container: Container | None = None):
         if not container:
             container = self._get_container()
@@ -88,7 +80,6 @@ class ExtractionContainer:
 
     def restart(self):
         self.stop()
-        self.exception.set(0)
         self.container_id = None
         self.start()
 
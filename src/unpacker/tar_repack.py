@@ -1,34 +1,83 @@
+from __future__ import annotations
+
 import logging
 import os
-import subprocess
+import tarfile
+from contextlib import suppress
 from pathlib import Path
-from subprocess import PIPE, STDOUT
-from tempfile import TemporaryDirectory
-
-from common_helper_files import get_binary_from_file
+from tempfile import TemporaryDirectory, mkstemp
 
 import config
+from storage.fsorganizer import STORED_FILE_MODE, get_tar_repack_cache_dir
 from unpacker.unpack_base import UnpackBase
 
 
 class TarRepack(UnpackBase):
-    def tar_repack(self, file_path):
-        extraction_directory = TemporaryDirectory(prefix='FACT_tar_repack', dir=config.backend.docker_mount_base_dir)
-        self.extract_files_from_file(file_path, extraction_directory.name)
+    """
+    Repacks the contents of a file (e.g. a firmware image) into a .tar.gz archive. Archives are cached on disk (keyed
+    by the name of the file, i.e. the UID for files in the file storage) so that repeated downloads don't need to
+    extract the file again. If the cache grows larger than ``tar-repack-cache-size``, the least recently used
+    archives are removed.
+    """
 
-        archive_directory = TemporaryDirectory(prefix='FACT_tar_repack', dir=config.backend.temp_dir_path)
-        archive_path = os.path.join(archive_directory.name, 'download.tar.gz')  # noqa: PTH118
-        tar_binary = self._repack_extracted_files(Path(extraction_directory.name, 'files'), archive_path)
+    def tar_repack(self, file_path: str) -> bytes:
+        return self.get_repacked_archive(file_path).read_bytes()
 
-        extraction_directory.cleanup()
-        archive_directory.cleanup()
+    def get_repacked_archive(self, file_path: str) -> Path:
+        """
+        Get the path of the repacked archive of ``file_path`` (from the cache if it was already repacked).
 
-        return tar_binary
+        :param file_path: The path of the file that should be repacked.
+        :return: The path of the .tar.gz archive in the cache.
+        """
+        cache_dir = _get_cache_dir()
+        archive_path = cache_dir / f'{Path(file_path).name}.tar.gz'
+        # the archive may be removed by another process at any time (in that case, the file is repacked again)
+        with suppress(FileNotFoundError):
+            os.utime(archive_path)  # the modification time is used to find the least recently used archives
+            return archive_path
+
+        # the temporary archive needs a unique name because the same file can be repacked by multiple processes
+        file_descriptor, tmp_file = mkstemp(prefix=f'{archive_path.name}.', suffix='.tmp', dir=cache_dir)
+        os.close(file_descriptor)
+        tmp_archive_path = Path(tmp_file)
+        try:
+            with TemporaryDirectory(prefix='FACT_tar_repack', dir=config.backend.docker_mount_base_dir) as tmp_dir:
+                self.extract_files_from_file(file_path, tmp_dir)
+                self._repack_extracted_files(Path(tmp_dir, 'files'), tmp_archive_path)
+            tmp_archive_path.chmod(STORED_FILE_MODE)  # the frontend may read the archive directly from the cache
+            tmp_archive_path.replace(archive_path)  # the archive only appears in the cache when it is complete
+        finally:
+            tmp_archive_path.unlink(missing_ok=True)  # not removed by the eviction (which only considers archives)
+        _evict_least_recently_used(cache_dir, config.backend.tar_repack_cache_size * 1024**2, keep=archive_path)
+        return archive_path
 
     @staticmethod
-    def _repack_extracted_files(extraction_dir: Path, out_file_path: str) -> bytes:
-        tar_process = subprocess.run(
-            f'tar -C {extraction_dir} -cvzf {out_file_path} .', shell=True, stdout=PIPE, stderr=STDOUT
-        )
-        logging.debug(f'tar -cvzf:\n {tar_process.stdout}')
-        return get_binary_from_file(out_file_path)
+    def _repack_extracted_files(extraction_dir: Path, out_file_path: Path):
+        with tarfile.open(out_file_path, 'w:gz') as archive:
+            archive.add(extraction_dir, arcname='.')
+        logging.debug(f'Repacked {extraction_dir} to {out_file_path}')
+
+
+def _get_cache_dir() -> Path:
+    cache_dir = get_tar_repack_cache_dir()
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir
+
+
+def _evict_least_recently_used(cache_dir: Path, max_size: int, keep: Path):
+    # the cache is shared by multiple processes -> archives can disappear at any time (e.g. by another eviction)
+    archives: list[tuple[Path, os.stat_result]] = []
+    for path in cache_dir.glob('*.tar.gz'):
+        with suppress(FileNotFoundError):
+            archives.append((path, path.stat()))
+    archives.sort(key=lambda item: item[1].st_mtime)
+    cache_size = sum(stat.st_size for _, stat in archives)
+    for archive, stat in archives:
+        if cache_size <= max_size:
+            break
+        if archive == keep:
+            continue
+        cache_size -= stat.st_size
+        archive.unlink(missing_ok=True)
+        logging.debug(f'Removed {archive.name} from the tar repack cache')
@@ -32,22 +32,46 @@ class Unpacker(UnpackBase):
         """
         Recursively extract all objects included in current_fo and add them to current_fo.files_included
         """
+        if not self.stage(current_fo, tmp_dir):
+            return []
+        self.extract(current_fo, tmp_dir, container)
+        return self.collect_extracted_files(current_fo, tmp_dir)
+
+    def stage(self, current_fo: FileObject, tmp_dir: str) -> bool:
+        """
+        First step of the extraction: Copy the file into the extraction directory ``tmp_dir``.
+
+        :return: ``False`` if the file should not be extracted (because the depth limit is reached) and ``True``
+            otherwise.
+        """
         if current_fo.depth >= config.backend.unpacking.max_depth:
             logging.warning(
                 f'{current_fo.uid} is not extracted since depth limit ({config.backend.unpacking.max_depth}) is reached'
             )
             self._store_unpacking_depth_skip_info(current_fo)
-            return []
+            return False
 
         self._check_path(current_fo)
+        self.stage_input_file(current_fo.file_path, tmp_dir)
+        return True
+
+    def extract(self, current_fo: FileObject, tmp_dir: str, container: ExtractionContainer | None = None):
+        """
+        Second step of the extraction: Extract the file staged in ``tmp_dir`` (with the extraction container).
+        """
         try:
-            extracted_files = self.extract_files_from_file(current_fo.file_path, tmp_dir, container)
+            self.extract_staged_file(current_fo.file_path, tmp_dir, container)
         except ExtractionError as error:
-            self._store_unpacking_error_skip_info(current_fo, error=error)
+            self.store_unpacking_error_skip_info(current_fo, error=error)
             raise
 
+    def collect_extracted_files(self, current_fo: FileObject, tmp_dir: str) -> list[FileObject]:
+        """
+        Last step of the extraction: Store the files extracted to ``tmp_dir`` and add them to
+        ``current_fo.files_included``.
+        """
         extracted_file_objects = self.generate_objects_and_store_files(
-            extracted_files, Path(tmp_dir) / 'files', current_fo
+            self.get_extracted_files(tmp_dir), Path(tmp_dir) / 'files', current_fo, move_files=True
         )
         for item in extracted_file_objects:
             current_fo.add_included_file(item)
@@ -59,7 +83,7 @@ class Unpacker(UnpackBase):
         )
         return extracted_file_objects
 
-    def _store_unpacking_error_skip_info(self, file_object: FileObject, error: Optional[Exception] = None):
+    def store_unpacking_error_skip_info(self, file_object: FileObject, error: Optional[Exception] = None):
         file_object.processed_analysis['unpacker'] = self._init_skipped_analysis(
             'Unpacking stopped because extractor raised a exception (possible timeout)',
             'extractor error',
@@ -87,8 +111,13 @@ class Unpacker(UnpackBase):
         }
 
     def generate_objects_and_store_files(
-        self, file_paths: list[Path], extraction_dir: Path, parent: FileObject
+        self, file_paths: list[Path], extraction_dir: Path, parent: FileObject, move_files: bool = False
     ) -> list[FileObject]:
+        """
+        Create file objects for the extracted files and store them in the file storage.
+
+        :param move_files: If ``True``, the extracted files are moved into the file storage instead of being copied.
+        """
         extracted_files = {}
         for path in file_paths:
             if file_is_empty(path):
@@ -99,7 +128,7 @@ class Unpacker(UnpackBase):
             if current_file.uid not in extracted_files:
                 # the same file can be contained multiple times in one archive -> only the VFP needs an update
                 self.unpacking_locks.set_unpacking_lock(current_file.uid)
-                self.file_storage_system.store_file(current_file)
+                self.file_storage_system.store_file(current_file, move=move_files)
                 current_file.parent_firmware_uids.add(parent.root_uid)
                 extracted_files[current_file.uid] = current_file
             extracted_files[current_file.uid].virtual_file_path.setdefault(parent.uid, []).append(current_virtual_path)
@@ -110,5 +139,5 @@ class Unpacker(UnpackBase):
         if not Path(file_object.file_path).exists():
             logging.error(f'File with path "{file_object.file_path}" not found ({file_object.uid}).')
             error = ExtractionError('File not found')
-            self._store_unpacking_error_skip_info(file_object, error=error)
+            self.store_unpacking_error_skip_info(file_object, error=error)
             raise error
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import fcntl
 import logging
 import shutil
 from os import getgid, getuid, makedirs
@@ -16,6 +17,7 @@ from helperFunctions.docker import run_docker_container
 from unpacker.extraction_container import EXTRACTOR_DOCKER_IMAGE, ExtractionContainer
 
 WORKER_TIMEOUT = 600  # in seconds
+FICLONE = 0x40049409  # ioctl request for creating a reflink (copy-on-write clone) of a file on Linux
 
 
 class ExtractionError(Exception):
@@ -30,18 +32,35 @@ class UnpackBase:
     def extract_files_from_file(
         self, file_path: str, tmp_dir: str, container: ExtractionContainer | None = None
     ) -> list[Path]:
+        self.stage_input_file(file_path, tmp_dir)
+        self.extract_staged_file(file_path, tmp_dir, container)
+        return self.get_extracted_files(tmp_dir)
+
+    def stage_input_file(self, file_path: str, tmp_dir: str):
+        """
+        Prepare the extraction directory ``tmp_dir`` and copy the file that should be extracted into it. The file is
+        cloned (reflink) if the file system supports it. It must not be hard linked: The extractor changes the owner of
+        the files in the (writable) extraction directory, which would also change the stored file.
+        """
         self._initialize_shared_folder(tmp_dir)
         try:
-            shutil.copy2(file_path, str(Path(tmp_dir, 'input', Path(file_path).name)))
+            _clone_or_copy(file_path, Path(tmp_dir, 'input', Path(file_path).name))
         except FileNotFoundError:
             logging.exception(f'Error during extraction of {file_path}')
             raise
 
+    def extract_staged_file(self, file_path: str, tmp_dir: str, container: ExtractionContainer | None = None):
+        """
+        Extract the file that was staged in ``tmp_dir`` with :py:func:`stage_input_file` (with the extraction
+        container ``container`` or with a new container if none is given).
+        """
         if container:
             self._extract_with_worker(file_path, container, tmp_dir)
         else:  # start new container
             self._extract_with_new_container(tmp_dir)
 
+    @staticmethod
+    def get_extracted_files(tmp_dir: str) -> list[Path]:
         return [item for item in safe_rglob(Path(tmp_dir, 'files')) if not item.is_dir()]
 
     @staticmethod
@@ -85,3 +104,13 @@ class UnpackBase:
             error = f'Failed to execute docker extractor with code {err.returncode}:\n{err.stdout}'
             logging.error(error)
             raise RuntimeError(error) from err
+
+
+def _clone_or_copy(source: str, target: Path):
+    with open(source, 'rb') as source_file:  # noqa: PTH123
+        try:
+            with target.open('wb') as target_file:
+                fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+        except OSError:  # e.g. the file system does not support reflinks or the files are on different file systems
+            shutil.copyfile(source, target)
+    shutil.copystat(source, target)
@@ -34,6 +34,7 @@ def main(command_line_options=None):
 
     updater = StatsUpdater()
     updater.update_all_stats()
+    updater.precompute_filtered_stats()
 
     return 0
 
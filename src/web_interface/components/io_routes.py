@@ -6,13 +6,14 @@ from tempfile import TemporaryDirectory
 from time import sleep
 
 import requests
-from fact_helper_file import get_file_type_from_binary
-from flask import make_response, redirect, render_template, request, Response
+from fact_helper_file import get_file_type_from_binary, get_file_type_from_path
+from flask import make_response, redirect, render_template, request, Response, send_file
 
 import config
 from helperFunctions.database import get_shared_session
 from helperFunctions.pdf import build_pdf_report
 from helperFunctions.task_conversion import check_for_errors, convert_analysis_task_to_fw_obj, create_analysis_task
+from storage.fsorganizer import get_readable_file_path
 from web_interface.components.component_base import AppRoute, ComponentBase, GET, POST
 from web_interface.security.decorator import roles_accepted
 from web_interface.security.privileges import PRIVILEGES
@@ -67,6 +68,15 @@ class IORoutes(ComponentBase):
     def _prepare_file_download(self, uid: str, packed: bool = False) -> str | Response:
         if not self.db.frontend.exists(uid):
             return render_template('uid_not_found.html', uid=uid)
+        if packed:
+            file_path, file_name = self.intercom.get_readable_repacked_archive(uid)
+            mime = 'application/gzip'
+        elif (file_path := get_readable_file_path(uid)) is not None:
+            file_name = self.db.frontend.get_file_name(uid)
+            mime = self._get_file_download_mime(uid, file_path=file_path)
+        if file_path is not None:
+            # stream the file directly from the storage (or archive cache) directory (with support for range requests)
+            return send_file(file_path, mimetype=mime, as_attachment=True, download_name=file_name, conditional=True)
         if packed:
             result = self.intercom.get_repacked_binary_and_file_name(uid)
         else:
@@ -76,13 +86,17 @@ class IORoutes(ComponentBase):
         binary, file_name = result
         response = make_response(binary)
         response.headers['Content-Disposition'] = f'attachment; filename={file_name}'
-        response.headers['Content-Type'] = 'application/gzip' if packed else self._get_file_download_mime(binary, uid)
+        response.headers['Content-Type'] = 'application/gzip' if packed else self._get_file_download_mime(uid, binary)
         return response
 
-    def _get_file_download_mime(self, binary: bytes, uid: str) -> str:
+    def _get_file_download_mime(self, uid: str, binary: bytes | None = None, file_path: Path | None = None) -> str:
         type_analysis = self.db.frontend.get_analysis(uid, 'file_type')
         mime = type_analysis.get('mime') if type_analysis is not None else None
-        return mime or get_file_type_from_binary(binary)['mime']
+        if mime:
+            return mime
+        if binary is not None:
+            return get_file_type_from_binary(binary)['mime']
+        return get_file_type_from_path(str(file_path))['mime']
 
     @roles_accepted(*PRIVILEGES['download'])
     @AppRoute('/ida-download/<compare_id>', GET)
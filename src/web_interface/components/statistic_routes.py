@@ -50,20 +50,4 @@ class StatisticRoutes(ComponentBase):
             }
 
     def _get_live_stats(self, filter_query):
-        stats_updater = StatsUpdater(stats_db=self.db.stats_updater)
-        stats_updater.set_match(filter_query)
-        with stats_updater.db.get_read_only_session():
-            return {
-                'firmware_meta_stats': stats_updater.get_firmware_meta_stats(),
-                'file_type_stats': stats_updater.get_file_type_stats(),
-                'crypto_material_stats': stats_updater.get_crypto_material_stats(),
-                'unpacker_stats': stats_updater.get_unpacking_stats(),
-                'ip_and_uri_stats': stats_updater.get_ip_stats(),
-                'architecture_stats': stats_updater.get_architecture_stats(),
-                'release_date_stats': stats_updater.get_time_stats(),
-                'general_stats': stats_updater.get_general_stats(),
-                'exploit_mitigations_stats': stats_updater.get_exploit_mitigations_stats(),
-                'known_vulnerabilities_stats': stats_updater.get_known_vulnerabilities_stats(),
-                'software_stats': stats_updater.get_software_components_stats(),
-                'elf_executable_stats': stats_updater.get_executable_stats(),
-            }
+        return StatsUpdater(stats_db=self.db.stats_updater).get_filtered_stats(filter_query)
@@ -1,9 +1,10 @@
 from base64 import standard_b64encode
 
-from flask import request
+from flask import make_response, request, send_file
 from flask_restx import Namespace
 
 from helperFunctions.hash import get_sha256
+from storage.fsorganizer import get_readable_file_path
 from web_interface.rest.helper import error_message, get_boolean_from_request, success_message
 from web_interface.rest.rest_resource_base import RestResourceBase
 from web_interface.security.decorator import roles_accepted
@@ -24,6 +25,12 @@ api = Namespace('rest/binary', description='Request the binary of a given firmwa
                 'type': 'boolean',
                 'default': 'false',
             },
+            'raw': {
+                'description': 'Get the raw binary as file download (with support for range requests) instead of JSON',
+                'in': 'query',
+                'type': 'boolean',
+                'default': 'false',
+            },
         },
     },
 )
@@ -38,6 +45,7 @@ class RestBinary(RestResourceBase):
         The uid of the file_object in question has to be given in the url
         Alternatively the tar parameter can be used to get the target archive as its content repacked into a .tar.gz.
         The return format will be {"binary": b64_encoded_binary_or_tar_gz, "file_name": file_name}
+        With the raw parameter, the binary is returned directly as file download instead
         '''
         if not self.db.frontend.exists(uid):
             return error_message(
@@ -46,13 +54,38 @@ class RestBinary(RestResourceBase):
 
         try:
             tar_flag = get_boolean_from_request(request.args, 'tar')
+            raw_flag = get_boolean_from_request(request.args, 'raw')
         except ValueError as value_error:
-            return error_message(str(value_error), self.URL, request_data={'uid': uid, 'tar': request.args.get('tar')})
+            request_data = {'uid': uid, 'tar': request.args.get('tar'), 'raw': request.args.get('raw')}
+            return error_message(str(value_error), self.URL, request_data=request_data)
 
-        if not tar_flag:
+        if tar_flag:
+            file_path, file_name = self.intercom.get_readable_repacked_archive(uid)
+        elif (file_path := get_readable_file_path(uid)) is not None:
+            file_name = self.db.frontend.get_file_name(uid)
+        if raw_flag and file_path is not None:
+            # stream the file directly from the storage (or archive cache) directory instead of passing it through the
+            # backend
+            return send_file(
+                file_path,
+                mimetype='application/gzip' if tar_flag else 'application/octet-stream',
+                as_attachment=True,
+                download_name=file_name,
+                conditional=True,
+            )
+
+        if file_path is not None:
+            binary = file_path.read_bytes()
+        elif not tar_flag:
             binary, file_name = self.intercom.get_binary_and_filename(uid)
         else:
             binary, file_name = self.intercom.get_repacked_binary_and_file_name(uid)
 
+        if raw_flag:
+            response = make_response(binary)
+            response.headers['Content-Disposition'] = f'attachment; filename={file_name}'
+            response.headers['Content-Type'] = 'application/gzip' if tar_flag else 'application/octet-stream'
+            return response
+
         response = {'binary': standard_b64encode(binary).decode(), 'file_name': file_name, 'SHA256': get_sha256(binary)}
         return success_message(response, self.URL, request_data={'uid': uid, 'tar': tar_flag})
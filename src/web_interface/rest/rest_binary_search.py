@@ -2,7 +2,7 @@ from flask import request
 from flask_restx import fields, Namespace
 
 from helperFunctions.yara_binary_search import is_valid_yara_rule_file
-from web_interface.rest.helper import error_message, success_message
+from web_interface.rest.helper import error_message, get_boolean_from_request, success_message
 from web_interface.rest.rest_resource_base import RestResourceBase
 from web_interface.security.decorator import roles_accepted
 from web_interface.security.privileges import PRIVILEGES
@@ -54,7 +54,15 @@ class RestBinarySearchPost(RestResourceBase):
     '/<string:search_id>',
     doc={
         'description': 'Get the results of a previously initiated binary search',
-        'params': {'search_id': 'Search ID'},
+        'params': {
+            'search_id': 'Search ID',
+            'partial': {
+                'description': 'Get the partial results and the progress of a search that is still running',
+                'in': 'query',
+                'type': 'boolean',
+                'default': 'false',
+            },
+        },
     },
 )
 class RestBinarySearchGet(RestResourceBase):
@@ -68,10 +76,45 @@ class RestBinarySearchGet(RestResourceBase):
         The `search_id` is needed to fetch the corresponding search result
         The result of the search request can only be fetched once
         After this the search needs to be started again.
+        Alternatively the partial parameter can be used to get the results found so far while the search is running.
         """
+        try:
+            partial_flag = get_boolean_from_request(request.args, 'partial')
+        except ValueError as value_error:
+            request_data = {'search_id': search_id, 'partial': request.args.get('partial')}
+            return error_message(str(value_error), self.URL, request_data=request_data)
+
+        progress = self.intercom.get_binary_search_progress(search_id)
+        if partial_flag and progress is not None:
+            return success_message(
+                {
+                    'binary_search_results': progress['partial_result'],
+                    'finished': False,
+                    'scanned_files': progress['scanned'],
+                    'total_files': progress['total'],
+                },
+                self.URL,
+                request_data={'search_id': search_id, 'partial': partial_flag},
+            )
+
         result, _ = self.intercom.get_binary_search_result(search_id)
 
         if result is None:
-            return error_message('The result is not ready yet or it has already been fetched', self.URL)
+            message = 'The result is not ready yet or it has already been fetched'
+            if progress is not None and progress['total'] is not None:
+                message += f' (scanned {progress["scanned"]} of {progress["total"]} files)'
+            return error_message(message, self.URL)
+
+        return success_message({'binary_search_results': result, 'finished': True}, self.URL)
 
-        return success_message({'binary_search_results': result}, self.URL)
+    @roles_accepted(*PRIVILEGES['pattern_search'])
+    @api.doc(responses={200: 'Success', 400: 'Unknown or finished search ID'})
+    def delete(self, search_id=None):
+        """
+        Cancel a running binary search
+        The results found so far are discarded.
+        """
+        if not self.intercom.cancel_binary_search(search_id):
+            message = 'No running binary search with this ID (unknown or already finished)'
+            return error_message(message, self.URL, request_data={'search_id': search_id})
+        return success_message({'message': f'Cancelled binary search {search_id}'}, self.URL)